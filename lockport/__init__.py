@@ -9,4 +9,22 @@ __all__ = [
     "device_state",
     "pin_prompt",
     "service",
+    "async_service",
+    "latency",
+    "metrics",
+    "ipc",
+    "election",
+    "simulation",
+    "timers",
+    "circuit_breaker",
+    "planner",
+    "attachments",
+    "reconciler",
+    "audit",
+    "action_executor",
+    "device_list",
+    "activity_log",
+    "wakeups",
+    "relock",
+    "tray_badge",
 ]
@@ -0,0 +1,155 @@
+"""Background executor for device actions started from the Tk thread."""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Sequence, Tuple, TypeVar, Union
+
+logger = logging.getLogger("lockport.action_executor")
+
+T = TypeVar("T")
+Dispatch = Callable[[Callable[[], None]], None]
+_Action = Tuple[Callable[[], object], Callable[["Future[object]"], None]]
+
+
+class _Batch:
+    """One action that needs every device in ``instance_ids`` to itself."""
+
+    __slots__ = ("instance_ids", "action", "on_done", "waiting")
+
+    def __init__(
+        self,
+        instance_ids: List[str],
+        action: Callable[[], object],
+        on_done: Callable[["Future[object]"], None],
+    ) -> None:
+        self.instance_ids = instance_ids
+        self.action = action
+        self.on_done = on_done
+        self.waiting = len(instance_ids)
+
+
+_Job = Union[_Action, _Batch]
+
+
+class DeviceActionExecutor:
+    """Runs blocking device actions on a small pool.
+
+    Actions for the same instance ID run one at a time, in submission order.
+    Different devices run in parallel, up to ``max_workers`` at once.
+    submit_many() runs one action that holds several devices at once.
+    ``dispatch`` delivers each completion back to the UI thread, for example
+    ``lambda fn: root.after(0, fn)``.
+    """
+
+    def __init__(self, dispatch: Dispatch, *, max_workers: int = 4) -> None:
+        self._dispatch = dispatch
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="LockPortAction")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._closed = False
+
+    def submit(
+        self,
+        instance_id: str,
+        action: Callable[[], T],
+        on_done: Callable[["Future[T]"], None],
+    ) -> None:
+        """Queue ``action`` for ``instance_id``; ``on_done(future)`` runs via ``dispatch``."""
+        job: _Job = (action, on_done)  # type: ignore[assignment]
+        with self._lock:
+            if self._closed:
+                return
+            pending = self._queues.get(instance_id)
+            if pending is not None:
+                pending.append(job)
+                return
+            self._queues[instance_id] = deque()
+        self._start(instance_id, job)
+
+    def submit_many(
+        self,
+        instance_ids: Sequence[str],
+        action: Callable[[], T],
+        on_done: Callable[["Future[T]"], None],
+    ) -> None:
+        """Queue one ``action`` that holds every device in ``instance_ids``.
+
+        It starts once earlier actions for all of those devices have finished,
+        and later actions for any of them wait for it, so a batch cannot race
+        a single lock or unlock of the same device. Every device is queued
+        under one lock acquisition, so overlapping batches cannot deadlock.
+        """
+        ids = list(dict.fromkeys(instance_ids))
+        batch = _Batch(ids, action, on_done)  # type: ignore[arg-type]
+        ready: List[str] = []
+        with self._lock:
+            if self._closed or not ids:
+                return
+            for instance_id in ids:
+                pending = self._queues.get(instance_id)
+                if pending is not None:
+                    pending.append(batch)
+                else:
+                    self._queues[instance_id] = deque()
+                    ready.append(instance_id)
+        for instance_id in ready:
+            self._start(instance_id, batch)
+
+    def busy(self, instance_id: str) -> bool:
+        with self._lock:
+            return instance_id in self._queues
+
+    def shutdown(self) -> None:
+        """Drop queued work and stop accepting more; running actions finish in the background."""
+        with self._lock:
+            self._closed = True
+            self._queues.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, instance_id: str, job: _Job) -> None:
+        if isinstance(job, _Batch):
+            # The batch now holds this device; run it once it holds them all.
+            with self._lock:
+                job.waiting -= 1
+                if job.waiting:
+                    return
+            self._run(job.instance_ids, job.action, job.on_done)
+            return
+        action, on_done = job
+        self._run([instance_id], action, on_done)
+
+    def _run(
+        self,
+        instance_ids: List[str],
+        action: Callable[[], object],
+        on_done: Callable[["Future[object]"], None],
+    ) -> None:
+        try:
+            future = self._pool.submit(action)
+        except RuntimeError:  # pool shut down while we were queueing
+            return
+        future.add_done_callback(lambda done: self._finished(instance_ids, done, on_done))
+
+    def _finished(
+        self,
+        instance_ids: List[str],
+        future: "Future[object]",
+        on_done: Callable[["Future[object]"], None],
+    ) -> None:
+        next_jobs: List[Tuple[str, _Job]] = []
+        with self._lock:
+            for instance_id in instance_ids:
+                pending = self._queues.get(instance_id)
+                if pending:
+                    next_jobs.append((instance_id, pending.popleft()))
+                else:
+                    self._queues.pop(instance_id, None)
+        try:
+            self._dispatch(lambda: on_done(future))
+        except Exception:  # pragma: no cover - UI already gone
+            logger.debug("Dropping completion for %s; dispatcher unavailable", instance_ids)
+        for instance_id, next_job in next_jobs:
+            self._start(instance_id, next_job)
@@ -0,0 +1,63 @@
+"""Fixed-capacity buffer behind the device window's activity pane."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+
+class ActivityLog:
+    """Ring buffer of timestamped lines plus the pending batch for the widget.
+
+    append() is cheap and may be called from any thread. The UI drains
+    pending lines once per tick with take_pending(). That call also says
+    how many old lines to delete from the widget. The widget may grow
+    ``trim_batch`` lines past ``capacity`` before it is cut back, so
+    deletes happen in blocks rather than on every append.
+    """
+
+    def __init__(self, capacity: int = 1000, *, trim_batch: Optional[int] = None) -> None:
+        self.capacity = max(1, capacity)
+        self.trim_batch = max(1, trim_batch if trim_batch is not None else self.capacity // 10)
+        self._lines: Deque[str] = deque(maxlen=self.capacity)
+        self._pending: List[str] = []
+        self._widget_lines = 0
+        self._lock = threading.Lock()
+
+    def append(self, message: str, *, now: Optional[float] = None) -> bool:
+        """Record ``message``; returns True when it starts a new pending batch."""
+        stamp = time.strftime("%H:%M:%S", time.localtime(now))
+        line = f"[{stamp}] {message}\n"
+        with self._lock:
+            self._lines.append(line)
+            self._pending.append(line)
+            return len(self._pending) == 1
+
+    def take_pending(self) -> Tuple[List[str], int]:
+        """Return (lines to append, number of leading widget lines to delete)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            shown = self._widget_lines
+            total = shown + len(pending)
+            trim = 0
+            if total > self.capacity + self.trim_batch:
+                trim = total - self.capacity
+                if trim > shown:
+                    # The batch alone overflows: never insert lines that would be cut at once.
+                    pending = pending[trim - shown :]
+                    trim = shown
+                total = self.capacity
+            self._widget_lines = total
+            return pending, trim
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            return list(self._lines)
+
+    def export(self, path: Path) -> int:
+        """Write the buffered history to ``path`` and return the number of lines."""
+        lines = self.lines()
+        Path(path).write_text("".join(lines), encoding="utf-8")
+        return len(lines)
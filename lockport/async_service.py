@@ -0,0 +1,224 @@
+"""asyncio-based variant of the LockPort background service."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Set
+
+from .config import LockPortConfig
+from .device_locker import DeviceLocker
+from .metrics import EVENTS_DROPPED, QUEUE_DEPTH, WORKER_BUSY_SECONDS
+from .service import LockPortService
+from .usb_monitor import MonitorFactory, USBEvent
+
+
+class AsyncLockPortService(LockPortService):
+    """LockPortService driven by a single asyncio event loop.
+
+    The WMI watcher keeps its one thread and hands events to the loop via
+    ``call_soon_threadsafe``. Device actions run as asyncio subprocesses with
+    at most ``config.worker_count`` in flight, so nothing wakes up while idle.
+    """
+
+    def __init__(
+        self,
+        config: LockPortConfig | None = None,
+        *,
+        console_log: bool | None = None,
+        role: str = "service",
+        device_locker: DeviceLocker | None = None,
+        monitor_factory: MonitorFactory | None = None,
+    ) -> None:
+        super().__init__(
+            config,
+            console_log=console_log,
+            role=role,
+            device_locker=device_locker,
+            monitor_factory=monitor_factory,
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._loop_ready = threading.Event()
+        self._async_queue: "asyncio.Queue[USBEvent] | None" = None
+        self._shutdown: asyncio.Event | None = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        # Set while run() drives the loop on its caller's thread.
+        self._run_thread: threading.Thread | None = None
+        self._run_done = threading.Event()
+        QUEUE_DEPTH.set_function(
+            lambda: self._async_queue.qsize() if self._async_queue is not None else 0
+        )
+
+    def start(self) -> None:
+        """Run the event loop on a background thread and return once it is ready."""
+        if self._loop_thread and self._loop_thread.is_alive():
+            return
+        self._ensure_monitor()
+        self._started_at = self._started_at or time.time()
+        self._start_metrics_server()
+        self._reconciler.start()
+        self._loop_ready.clear()
+        self._loop_thread = threading.Thread(
+            target=asyncio.run,
+            args=(self._serve(None),),
+            name="LockPortLoop",
+            daemon=True,
+        )
+        self._loop_thread.start()
+        self._loop_ready.wait()
+
+    def run(self, *, duration_seconds: float | None = None) -> None:
+        """Run the event loop on the calling thread until stop() or timeout."""
+        self._ensure_monitor()
+        self._started_at = self._started_at or time.time()
+        self._start_metrics_server()
+        self._reconciler.start()
+        self._run_thread = threading.current_thread()
+        self._run_done.clear()
+        try:
+            try:
+                elapsed = asyncio.run(self._serve(duration_seconds))
+            finally:
+                self._run_thread = None
+            if elapsed:
+                # Duration elapsed: release everything an explicit stop() would.
+                self.stop()
+            else:
+                # stop() left the release to us, now that in-flight locks are done.
+                self._release_resources()
+        finally:
+            self._run_done.set()
+
+    def stop(self) -> None:
+        if self._stop_event.is_set():
+            return  # e.g. main()'s finally after a signal already stopped us
+        self.logger.info("Stopping LockPort service")
+        self._stop_event.set()
+        on_loop = self._run_thread is threading.current_thread()
+        if not on_loop:
+            self._quiesce()
+        loop, shutdown = self._loop, self._shutdown
+        if loop is not None and shutdown is not None:
+            try:
+                loop.call_soon_threadsafe(shutdown.set)
+            except RuntimeError:  # loop already closed
+                pass
+        if self._run_thread is not None:
+            # run() drains in-flight locks, then releases the lease and the
+            # servers; a signal handler on the loop thread must not wait for it.
+            if not on_loop:
+                self._run_done.wait(timeout=5.0)
+            return
+        thread = self._loop_thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+            self._loop_thread = None
+        self._release_resources()
+
+    def status(self) -> Dict[str, Any]:
+        summary = super().status()
+        summary["core"] = "asyncio"
+        summary["queue_depth"] = self._async_queue.qsize() if self._async_queue else 0
+        return summary
+
+    def _quiesce(self) -> None:
+        # Retries and relocks submit into the loop; stop them before it goes away.
+        if self._monitor:
+            self._monitor.stop()
+        self._reconciler.stop()
+        self._timers.stop()
+
+    def _ensure_monitor(self) -> None:
+        if self._monitor is None:
+            self._monitor = self._monitor_factory(
+                self._handle_usb_event, self.config.monitor_wait_seconds
+            )
+
+    async def _serve(self, duration_seconds: float | None) -> bool:
+        """Process events until shutdown; True when ``duration_seconds`` elapsed."""
+        self._loop = asyncio.get_running_loop()
+        self._async_queue = asyncio.Queue(maxsize=self.config.event_queue_size)
+        self._shutdown = asyncio.Event()
+        slots = asyncio.Semaphore(self._worker_count)
+        dispatcher = asyncio.create_task(self._dispatch(slots))
+        try:
+            # Acquire the lease once the loop can take events: becoming the
+            # owner restores unlock sessions, and overdue ones submit at once.
+            self._lease.start()
+            assert self._monitor is not None
+            self._monitor.start()
+            self.logger.info(
+                "LockPort service started (asyncio, %s concurrent actions)",
+                self._worker_count,
+            )
+            self._loop_ready.set()
+            elapsed = False
+            try:
+                await asyncio.wait_for(self._shutdown.wait(), timeout=duration_seconds)
+            except asyncio.TimeoutError:
+                self.logger.info(
+                    "LockPort service duration (%.1fs) elapsed; stopping",
+                    duration_seconds,
+                )
+                elapsed = True
+            # Quiesce event sources while the loop can still take their events.
+            await asyncio.to_thread(self._quiesce)
+            return elapsed
+        finally:
+            dispatcher.cancel()
+            if self._tasks:
+                _, pending = await asyncio.wait(set(self._tasks), timeout=2.0)
+                for task in pending:
+                    task.cancel()
+            self._loop = None
+            self._shutdown = None
+            self._loop_ready.set()
+
+    def _submit(self, event: USBEvent) -> None:
+        loop = self._loop
+        if loop is None:
+            self.logger.warning("Event loop not running; dropping event: %s", event)
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, event)
+        except RuntimeError:
+            self.logger.warning("Event loop closed; dropping event: %s", event)
+
+    def _enqueue(self, event: USBEvent) -> None:
+        assert self._async_queue is not None
+        try:
+            self._async_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            EVENTS_DROPPED.inc()
+            self.logger.warning("USB event queue full; dropping event: %s", event)
+
+    async def _dispatch(self, slots: asyncio.Semaphore) -> None:
+        assert self._async_queue is not None
+        while True:
+            event = await self._async_queue.get()
+            await slots.acquire()
+            event.dequeued_at = time.monotonic()
+            task = asyncio.create_task(self._run_event(event, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_event(self, event: USBEvent, slots: asyncio.Semaphore) -> None:
+        try:
+            await self._process_event_async(event)
+        except Exception:
+            self.logger.exception("USB event handling failure: %s", event)
+        finally:
+            if event.dequeued_at is not None:
+                WORKER_BUSY_SECONDS.inc(time.monotonic() - event.dequeued_at)
+            slots.release()
+
+    async def _process_event_async(self, event: USBEvent) -> None:
+        if not self._admit(event):
+            return
+        try:
+            self.logger.info("Locking device %s", event.instance_id)
+            result = await self.device_locker.disable_async(event.instance_id)
+            self._finish_lock(event, result)
+        finally:
+            self._release_device(event.instance_id)
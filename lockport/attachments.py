@@ -0,0 +1,106 @@
+"""Persisted drive-letter to instance-ID map used for warm starts."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+logger = logging.getLogger("lockport.attachments")
+
+
+@dataclass(slots=True)
+class AttachedDrive:
+    instance_id: str
+    serial: str = ""
+    volume: str = ""
+
+
+@dataclass(slots=True)
+class AttachmentSnapshot:
+    generation: int = 0
+    saved_at: float = 0.0
+    drives: Dict[str, AttachedDrive] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class AttachmentDiff:
+    unchanged: Dict[str, AttachedDrive] = field(default_factory=dict)
+    added: List[str] = field(default_factory=list)
+    removed: Dict[str, AttachedDrive] = field(default_factory=dict)
+
+
+def diff_attachments(
+    previous: Mapping[str, AttachedDrive], current: Mapping[str, str]
+) -> AttachmentDiff:
+    """Compare the persisted map with ``current`` (drive letter -> volume serial).
+
+    A drive is unchanged only if its letter and a non-empty volume serial
+    both match. Otherwise it is re-resolved, because Windows may have given
+    the letter to a different stick while LockPort was not running.
+    """
+    diff = AttachmentDiff()
+    for drive, serial in current.items():
+        known = previous.get(drive)
+        if known is not None and serial and known.serial == serial:
+            diff.unchanged[drive] = known
+        else:
+            diff.added.append(drive)
+    for drive, known in previous.items():
+        if drive not in current or drive in diff.added:
+            diff.removed[drive] = known
+    return diff
+
+
+class AttachmentStore:
+    """Reads and writes the attachment snapshot; every save bumps the generation."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def load(self) -> AttachmentSnapshot:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return AttachmentSnapshot()
+        if not isinstance(data, dict):
+            return AttachmentSnapshot()
+        drives: Dict[str, AttachedDrive] = {}
+        raw_drives = data.get("drives")
+        if isinstance(raw_drives, dict):
+            for drive, value in raw_drives.items():
+                if isinstance(value, dict) and value.get("instance_id"):
+                    drives[str(drive).upper()] = AttachedDrive(
+                        instance_id=str(value["instance_id"]),
+                        serial=str(value.get("serial", "") or ""),
+                        volume=str(value.get("volume", "") or ""),
+                    )
+        try:
+            generation = int(data.get("generation", 0))
+            saved_at = float(data.get("saved_at", 0.0))
+        except (TypeError, ValueError):
+            generation, saved_at = 0, 0.0
+        with self._lock:
+            self._generation = max(self._generation, generation)
+        return AttachmentSnapshot(generation=generation, saved_at=saved_at, drives=drives)
+
+    def save(self, drives: Mapping[str, AttachedDrive]) -> int:
+        """Persist ``drives`` and return the new generation number."""
+        with self._lock:
+            self._generation += 1
+            payload = {
+                "generation": self._generation,
+                "saved_at": time.time(),
+                "drives": {drive: asdict(info) for drive, info in sorted(drives.items())},
+            }
+            try:
+                self.path.write_text(json.dumps(payload, indent=2))
+            except OSError as exc:
+                # The map only speeds up the next start; a cold start still works.
+                logger.warning("Could not persist attachment map: %s", exc)
+            return self._generation
@@ -0,0 +1,351 @@
+"""Structured JSON-lines audit trail with per-segment sidecar indexes.
+
+Call audit() from anywhere to record a device event, device action or
+PIN attempt. configure_logging() routes these records through the logging
+queue to an AuditHandler, so writing never happens on the caller's thread.
+Each ``audit-NNNNNN-pPID.jsonl`` segment has an ``.idx.json`` sidecar. The
+sidecar maps instance IDs to time bounds and byte ranges, so query_audit()
+only reads the parts of the trail that can match.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_audit_logger = logging.getLogger("lockport.audit")
+_audit_logger.propagate = False
+
+# Segments carry the writer's PID: the tray and the service write side by side.
+_SEGMENT_PATTERN = re.compile(r"^audit-(\d+)(?:-p(\d+))?\.jsonl$")
+_RELATIVE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def audit(event: str, *, instance_id: str | None = None, **fields: Any) -> None:
+    """Emit one audit record; a no-op until configure_logging() attaches the handler."""
+    payload: Dict[str, Any] = {"event": event}
+    if instance_id:
+        payload["instance_id"] = instance_id
+    payload.update(fields)
+    _audit_logger.info(event, extra={"audit": payload})
+
+
+def is_audit_record(record: logging.LogRecord) -> bool:
+    return hasattr(record, "audit")
+
+
+def parse_time_bound(text: str, *, now: float | None = None) -> float:
+    """Parse ``30m``/``2h``/``1d`` (ago), an ISO 8601 timestamp, or epoch seconds."""
+    value = text.strip()
+    match = _RELATIVE_PATTERN.match(value.lower())
+    if match:
+        return (time.time() if now is None else now) - float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return datetime.fromisoformat(value).timestamp()
+
+
+@dataclass(slots=True)
+class DeviceSpan:
+    first_ts: float
+    last_ts: float
+    ranges: List[List[int]] = field(default_factory=list)  # [offset, length] pairs
+
+    def add(self, ts: float, offset: int, length: int) -> None:
+        self.first_ts = min(self.first_ts, ts)
+        self.last_ts = max(self.last_ts, ts)
+        if self.ranges and sum(self.ranges[-1]) == offset:
+            self.ranges[-1][1] += length
+        else:
+            self.ranges.append([offset, length])
+
+
+@dataclass(slots=True)
+class SegmentIndex:
+    size: int = 0  # bytes of the segment covered by this index
+    first_ts: float | None = None
+    last_ts: float | None = None
+    devices: Dict[str, DeviceSpan] = field(default_factory=dict)
+
+    def add(self, instance_id: str | None, ts: float, offset: int, length: int) -> None:
+        self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        self.size = offset + length
+        if instance_id:
+            span = self.devices.setdefault(instance_id, DeviceSpan(ts, ts))
+            span.add(ts, offset, length)
+
+    def overlaps(self, since: float | None, until: float | None) -> bool:
+        if self.first_ts is None or self.last_ts is None:
+            return False
+        return _overlaps(self.first_ts, self.last_ts, since, until)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "devices": {
+                key: {"first_ts": span.first_ts, "last_ts": span.last_ts, "ranges": span.ranges}
+                for key, span in self.devices.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, value: Dict[str, Any]) -> "SegmentIndex":
+        devices = {
+            str(key): DeviceSpan(
+                float(span["first_ts"]),
+                float(span["last_ts"]),
+                [[int(offset), int(length)] for offset, length in span.get("ranges", [])],
+            )
+            for key, span in dict(value.get("devices", {})).items()
+        }
+        first_ts = value.get("first_ts")
+        last_ts = value.get("last_ts")
+        return cls(
+            size=int(value.get("size", 0)),
+            first_ts=float(first_ts) if first_ts is not None else None,
+            last_ts=float(last_ts) if last_ts is not None else None,
+            devices=devices,
+        )
+
+
+def _overlaps(first: float, last: float, since: float | None, until: float | None) -> bool:
+    return (since is None or last >= since) and (until is None or first <= until)
+
+
+def _index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name[: -len(".jsonl")] + ".idx.json")
+
+
+def _segments(directory: Path) -> List[Tuple[int, Path]]:
+    found = []
+    for path in directory.glob("audit-*.jsonl"):
+        match = _SEGMENT_PATTERN.match(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def _segment_pid(segment: Path) -> int | None:
+    match = _SEGMENT_PATTERN.match(segment.name)
+    return int(match.group(2)) if match and match.group(2) else None
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _open_segments(segments: List[Tuple[int, Path]]) -> set[Path]:
+    """The newest segment of every other live process, which may still be written."""
+    newest: Dict[int, Path] = {}
+    for _, path in segments:
+        pid = _segment_pid(path)
+        if pid is not None and pid != os.getpid():
+            newest[pid] = path
+    return {path for pid, path in newest.items() if _pid_alive(pid)}
+
+
+class AuditHandler(logging.Handler):
+    """Appends audit records to size-bounded segments and maintains their indexes.
+
+    Runs on the logging listener thread, which calls flush() after each
+    batch of records; the segment and the index of the active segment are
+    written then and on rotation. Readers scan any bytes past the indexed
+    size, so a stale sidecar only costs a short tail scan.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int, backup_count: int) -> None:
+        super().__init__(logging.INFO)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.addFilter(is_audit_record)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = _segments(directory)
+        self._sequence = existing[-1][0] + 1 if existing else 1
+        self._open_segment()
+
+    def _open_segment(self) -> None:
+        while True:
+            self._path = self.directory / f"audit-{self._sequence:06d}-p{os.getpid()}.jsonl"
+            try:
+                self._stream = open(self._path, "xb")
+                break
+            except FileExistsError:
+                self._sequence += 1
+        self._index = SegmentIndex()
+        self._index_dirty = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            payload = {"ts": round(record.created, 6), **getattr(record, "audit")}
+            data = (json.dumps(payload, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            if self._index.size and self._index.size + len(data) > self.max_bytes:
+                self._rotate()
+            offset = self._index.size
+            self._stream.write(data)
+            self._index.add(payload.get("instance_id"), payload["ts"], offset, len(data))
+            self._index_dirty = True
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            if self._stream.closed:
+                return
+            try:
+                self._stream.flush()
+            except OSError:
+                self.handleError(self._failure_record("flush"))
+            self._write_index()
+
+    def close(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            if not self._stream.closed:
+                try:
+                    self._stream.flush()
+                except OSError:
+                    self.handleError(self._failure_record("flush"))
+                self._write_index()
+                self._stream.close()
+        super().close()
+
+    def _write_index(self) -> None:
+        if not self._index_dirty:
+            return
+        try:
+            _index_path(self._path).write_text(json.dumps(self._index.to_dict()))
+        except OSError:
+            # The directory may be gone (e.g. a deleted temp dir); readers
+            # fall back to scanning the unindexed tail.
+            self.handleError(self._failure_record("index"))
+            return
+        self._index_dirty = False
+
+    def _failure_record(self, step: str) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {"name": _audit_logger.name, "msg": "Audit %s failed for %s", "args": (step, self._path)}
+        )
+
+    def _rotate(self) -> None:
+        self._stream.flush()
+        self._write_index()
+        self._stream.close()
+        self._sequence += 1
+        self._open_segment()
+        segments = _segments(self.directory)
+        in_use = _open_segments(segments)
+        for _, old in segments[: -(self.backup_count + 1)]:
+            if old in in_use:
+                continue  # another process is still appending to it
+            try:
+                old.unlink(missing_ok=True)
+                _index_path(old).unlink(missing_ok=True)
+            except OSError:
+                continue
+
+
+def _load_index(segment: Path) -> Optional[SegmentIndex]:
+    try:
+        return SegmentIndex.from_dict(json.loads(_index_path(segment).read_text()))
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def _ranges_for(
+    index: Optional[SegmentIndex],
+    size: int,
+    device: str | None,
+    since: float | None,
+    until: float | None,
+) -> List[Tuple[int, int]]:
+    covered = min(index.size, size) if index else 0
+    ranges: List[Tuple[int, int]] = []
+    if index and index.overlaps(since, until):
+        if device is None:
+            ranges.append((0, covered))
+        else:
+            span = index.devices.get(device)
+            if span and _overlaps(span.first_ts, span.last_ts, since, until):
+                ranges.extend((offset, length) for offset, length in span.ranges if offset < covered)
+    if size > covered:
+        ranges.append((covered, size - covered))
+    return ranges
+
+
+def query_audit(
+    directory: Path,
+    *,
+    device: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield audit records in time order, reading only indexed byte ranges that can match.
+
+    Each process writes its own run of segments; the runs are merged by ``ts``.
+    """
+    writers: Dict[int | None, List[Path]] = {}
+    for _, segment in _segments(directory):
+        writers.setdefault(_segment_pid(segment), []).append(segment)
+    streams = [_read_segments(paths, device, since, until) for paths in writers.values()]
+    yield from heapq.merge(*streams, key=lambda record: float(record.get("ts", 0.0)))
+
+
+def _read_segments(
+    segments: List[Path],
+    device: str | None,
+    since: float | None,
+    until: float | None,
+) -> Iterator[Dict[str, Any]]:
+    for segment in segments:
+        try:
+            size = segment.stat().st_size
+        except OSError:
+            continue
+        ranges = _ranges_for(_load_index(segment), size, device, since, until)
+        if not ranges:
+            continue
+        with open(segment, "rb") as handle:
+            for offset, length in ranges:
+                handle.seek(offset)
+                for line in handle.read(length).splitlines():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # partially written tail line
+                    ts = float(record.get("ts", 0.0))
+                    if device is not None and record.get("instance_id") != device:
+                        continue
+                    if (since is not None and ts < since) or (until is not None and ts > until):
+                        continue
+                    yield record
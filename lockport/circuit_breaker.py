@@ -0,0 +1,77 @@
+"""Per-device circuit breaker with jittered exponential backoff."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+
+@dataclass(slots=True)
+class BreakerState:
+    failures: int = 0
+    open_until: float = 0.0
+
+
+class DeviceCircuitBreaker:
+    """Tracks consecutive action failures per device instance.
+
+    Every failure opens the breaker for ``base * 2**(failures - 1)`` seconds
+    (capped at ``max_seconds`` and spread by +/- ``jitter``). While open,
+    events for the device are skipped instead of spawning PowerShell again;
+    a success or reset() closes it.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_seconds: float = 2.0,
+        max_seconds: float = 300.0,
+        jitter: float = 0.2,
+        rng: random.Random | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._states: Dict[str, BreakerState] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, instance_id: str) -> bool:
+        """True when the breaker is closed or its backoff window has expired."""
+        with self._lock:
+            state = self._states.get(instance_id)
+            return state is None or self._clock() >= state.open_until
+
+    def retry_in(self, instance_id: str) -> float:
+        with self._lock:
+            state = self._states.get(instance_id)
+            if state is None:
+                return 0.0
+            return max(0.0, state.open_until - self._clock())
+
+    def failures(self, instance_id: str) -> int:
+        with self._lock:
+            state = self._states.get(instance_id)
+            return state.failures if state else 0
+
+    def record_success(self, instance_id: str) -> None:
+        with self._lock:
+            self._states.pop(instance_id, None)
+
+    def reset(self, instance_id: str) -> None:
+        self.record_success(instance_id)
+
+    def record_failure(self, instance_id: str) -> float:
+        """Open the breaker and return the backoff delay in seconds."""
+        with self._lock:
+            state = self._states.setdefault(instance_id, BreakerState())
+            state.failures += 1
+            delay = min(self.max_seconds, self.base_seconds * (2 ** min(state.failures - 1, 30)))
+            if self.jitter:
+                delay *= 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+            state.open_until = self._clock() + delay
+            return delay
@@ -20,19 +20,61 @@ class LockPortConfig:
     pin_store_file: str = "pin_store.json"
     log_path: Path = field(default_factory=_default_data_dir)
     log_file: str = "lockport.log"
+    log_max_bytes: int = 1_000_000
+    log_backup_count: int = 3
+    log_queue_size: int = 10_000
+    log_rate_per_second: float = 5.0  # per message template; 0 disables rate limiting
+    log_rate_burst: int = 20
+    audit_dir: str = "audit"
+    audit_max_bytes: int = 1_000_000
+    audit_backup_count: int = 10
     pin_attempt_limit: int = 5
     pin_lockout_seconds: int = 300
     pin_hash_iterations: int = 100_000
     monitor_poll_seconds: int = 0.5
+    # Idle mode: loops block on real events or stop signals instead of polling.
+    idle_mode: bool = True
+    monitor_idle_poll_seconds: float = 30.0  # WMI waits cannot be interrupted; bounds stop latency
+    worker_count: int = 2
+    event_queue_size: int = 64
     ui_timeout_seconds: int = 120
     device_state_file: str = "device_states.json"
     pin_cache_file: str = "pin_cache.json"
+    latency_stats_file: str = "latency_stats.json"
+    attachment_state_file: str = "attachments.json"
+    latency_window_seconds: int = 3600
+    latency_persist_seconds: int = 60
+    metrics_port: int | None = None
+    metrics_socket_file: str | None = None
+    ipc_enabled: bool = True
+    ipc_pipe_name: str = "LockPort"
+    ipc_socket_file: str = "lockport.sock"
+    owner_lock_file: str = "owner.lock"
+    owner_info_file: str = "owner.json"
+    election_retry_seconds: float = 2.0
+    breaker_base_seconds: float = 2.0
+    breaker_max_seconds: float = 300.0
+    breaker_jitter: float = 0.2
+    reconcile_interval_seconds: float = 300.0  # 0 disables the sweep
+    reconcile_batch_size: int = 100  # devices per PowerShell status query
+    window_action_workers: int = 4  # parallel lock/unlock actions from the device window
+    activity_log_lines: int = 1000  # lines kept in the device window's activity pane
+    relock_state_file: str = "relock.json"
+    default_relock_minutes: float = 0.0  # 0 keeps unlocked devices enabled until unplugged
+    tray_badge_min_interval_seconds: float = 0.5  # at most two tray icon redraws per second
+    tray_badge_poll_seconds: float = 5.0  # observer tray with no IPC re-reads device states this often
+    asset_cache_dir: str = "cache"  # resized icons and badge images, keyed by content hash
 
     def ensure_directories(self) -> None:
         """Create directories for application data if they do not exist."""
         self.pin_store_path.mkdir(parents=True, exist_ok=True)
         self.log_path.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def monitor_wait_seconds(self) -> float:
+        """How long one WMI wait may block before re-checking for stop."""
+        return self.monitor_idle_poll_seconds if self.idle_mode else self.monitor_poll_seconds
+
     @property
     def pin_store_location(self) -> Path:
         return self.pin_store_path / self.pin_store_file
@@ -41,6 +83,18 @@ class LockPortConfig:
     def log_location(self) -> Path:
         return self.log_path / self.log_file
 
+    @property
+    def audit_location(self) -> Path:
+        return self.log_path / self.audit_dir
+
+    @property
+    def asset_cache_location(self) -> Path:
+        return self.pin_store_path / self.asset_cache_dir
+
+    @property
+    def relock_state_location(self) -> Path:
+        return self.pin_store_path / self.relock_state_file
+
     @property
     def device_state_location(self) -> Path:
         return self.pin_store_path / self.device_state_file
@@ -49,6 +103,29 @@ class LockPortConfig:
     def pin_cache_location(self) -> Path:
         return self.pin_store_path / self.pin_cache_file
 
+    @property
+    def latency_stats_location(self) -> Path:
+        return self.pin_store_path / self.latency_stats_file
+
+    @property
+    def attachment_state_location(self) -> Path:
+        return self.pin_store_path / self.attachment_state_file
+
+    @property
+    def owner_lock_location(self) -> Path:
+        return self.pin_store_path / self.owner_lock_file
+
+    @property
+    def owner_info_location(self) -> Path:
+        return self.pin_store_path / self.owner_info_file
+
+    @property
+    def metrics_socket_location(self) -> Path | None:
+        if not self.metrics_socket_file:
+            return None
+        return self.pin_store_path / self.metrics_socket_file
+
 
+# Directories are created by the stores that write into them (PinManager,
+# DeviceStateStore, OwnershipLease, ...), not as a side effect of importing this module.
 DEFAULT_CONFIG = LockPortConfig()
-DEFAULT_CONFIG.ensure_directories()
@@ -0,0 +1,141 @@
+"""Filterable, sortable model behind the device window's virtualized list."""
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .device_state import DeviceState
+
+SORT_KEYS: Dict[str, Callable[[DeviceState], object]] = {
+    "Device": lambda state: state.instance_id.lower(),
+    "Status": lambda state: state.status,
+    "Port": lambda state: state.drive.upper(),
+    "Label": lambda state: state.volume.lower(),
+    "Updated": lambda state: state.updated_at,
+}
+ALL_STATUSES = "all"
+
+
+def search_key(state: DeviceState) -> str:
+    """Lower-cased text a filter query is matched against."""
+    return "\0".join((state.instance_id, state.drive, state.volume, state.status)).lower()
+
+
+class DeviceListModel:
+    """Keeps every known state but hands the view only the rows it shows.
+
+    update() re-indexes only states that changed. Narrowing a text query
+    (typing more characters) filters the previous matches instead of
+    rescanning everything. Sorted orders are cached per column until the
+    data changes, so flipping the sort never touches the store.
+    """
+
+    def __init__(self, *, sort_column: str = "Updated", descending: bool = True) -> None:
+        self._states: Dict[str, DeviceState] = {}
+        self._index: Dict[str, str] = {}
+        self._orders: Dict[str, List[str]] = {}
+        self._query = ""
+        self._status = ALL_STATUSES
+        self._matches: Optional[List[str]] = None
+        self._visible: Optional[List[str]] = None
+        self.sort_column = sort_column
+        self.descending = descending
+
+    def __len__(self) -> int:
+        return len(self._rows())
+
+    @property
+    def total(self) -> int:
+        return len(self._states)
+
+    def get(self, instance_id: str) -> Optional[DeviceState]:
+        return self._states.get(instance_id)
+
+    def update(self, states: Iterable[DeviceState]) -> bool:
+        """Replace the data set; returns False when nothing changed."""
+        incoming = {state.instance_id: state for state in states}
+        changed = incoming.keys() != self._states.keys()
+        for instance_id, state in incoming.items():
+            if self._states.get(instance_id) != state:
+                self._index[instance_id] = search_key(state)
+                changed = True
+        if not changed:
+            return False
+        for instance_id in self._states.keys() - incoming.keys():
+            self._index.pop(instance_id, None)
+        self._states = incoming
+        self._orders.clear()
+        self._matches = None
+        self._visible = None
+        return True
+
+    def set_filter(self, query: str = "", status: str = ALL_STATUSES) -> None:
+        query = query.strip().lower()
+        status = status or ALL_STATUSES
+        if query == self._query and status == self._status:
+            return
+        narrowing = (
+            self._matches is not None and status == self._status and query.startswith(self._query)
+        )
+        self._query, self._status = query, status
+        if narrowing and self._matches is not None:
+            self._matches = [iid for iid in self._matches if query in self._index[iid]]
+        else:
+            self._matches = None
+        self._visible = None
+
+    def sort_by(self, column: str, descending: Optional[bool] = None) -> None:
+        """Sort by ``column``; without ``descending`` a repeated column flips direction."""
+        if column not in SORT_KEYS:
+            raise ValueError(f"Unknown column: {column}")
+        if descending is None:
+            descending = not self.descending if column == self.sort_column else False
+        self.sort_column, self.descending = column, descending
+        self._visible = None
+
+    def rows(self, start: int = 0, count: Optional[int] = None) -> List[DeviceState]:
+        """Return the visible rows in ``[start, start + count)`` after filtering and sorting."""
+        ids = self._rows()
+        end = len(ids) if count is None else start + count
+        return [self._states[iid] for iid in ids[max(0, start) : end]]
+
+    def position(self, instance_id: str) -> int:
+        """Index of ``instance_id`` among visible rows, or -1 when filtered out."""
+        try:
+            return self._rows().index(instance_id)
+        except ValueError:
+            return -1
+
+    def _filtered(self) -> List[str]:
+        if self._matches is None:
+            self._matches = [
+                iid
+                for iid, state in self._states.items()
+                if (self._status == ALL_STATUSES or state.status == self._status)
+                and self._query in self._index[iid]
+            ]
+        return self._matches
+
+    def _order(self, column: str) -> List[str]:
+        order = self._orders.get(column)
+        if order is None:
+            key = SORT_KEYS[column]
+            order = sorted(self._states, key=lambda iid: (key(self._states[iid]), iid))
+            self._orders[column] = order
+        return order
+
+    def _rows(self) -> List[str]:
+        if self._visible is None:
+            matches = set(self._filtered())
+            order = self._order(self.sort_column)
+            if self.descending:
+                order = order[::-1]
+            self._visible = [iid for iid in order if iid in matches]
+        return self._visible
+
+
+def viewport(first: float, total: int, page: int) -> Tuple[int, float, float]:
+    """Map a scrollbar fraction to (start row, first fraction, last fraction)."""
+    if total <= page:
+        return 0, 0.0, 1.0
+    start = min(max(0, round(first * total)), total - page)
+    return start, start / total, (start + page) / total
@@ -1,13 +1,25 @@
 """Helpers to disable/enable USB storage devices via PowerShell."""
 from __future__ import annotations
 
+import json
 import logging
 import subprocess
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .audit import audit
+from .metrics import DEVICE_ACTIONS
 
 logger = logging.getLogger("lockport.device_locker")
 
+DEVICE_ENABLED = "enabled"
+DEVICE_DISABLED = "disabled"
+DEVICE_ABSENT = "absent"
+# ConfigManagerErrorCode reported for a device disabled by the user/admin.
+_CM_PROB_DISABLED = 22
+
 
 @dataclass(slots=True)
 class DeviceActionResult:
@@ -20,6 +32,56 @@ class DeviceActionResult:
         return any(keyword in text for keyword in ("devicenotfound", "not connected", "device is not connected"))
 
 
+def _pnp_script(instance_id: str, cmdlet: str) -> str:
+    return textwrap.dedent(
+        f"""
+        $device = Get-PnpDevice -InstanceId '{instance_id}' -ErrorAction SilentlyContinue
+        if ($null -eq $device) {{
+          Write-Output 'DeviceNotFound'
+          exit 1
+        }}
+        {cmdlet} -InstanceId '{instance_id}' -Confirm:$false -ErrorAction Stop
+        Write-Output 'Success'
+        """
+    )
+
+
+def _status_script(instance_ids: Sequence[str]) -> str:
+    quoted = ", ".join("'{}'".format(instance_id.replace("'", "''")) for instance_id in instance_ids)
+    return textwrap.dedent(
+        f"""
+        $ids = @({quoted})
+        Get-PnpDevice -InstanceId $ids -ErrorAction SilentlyContinue |
+          Select-Object InstanceId, Present, ConfigManagerErrorCode |
+          ConvertTo-Json -Compress
+        """
+    )
+
+
+def _parse_status(output: str, instance_ids: Sequence[str]) -> Dict[str, str]:
+    statuses = {instance_id: DEVICE_ABSENT for instance_id in instance_ids}
+    text = output.strip()
+    if not text:
+        return statuses
+    data = json.loads(text)
+    # ConvertTo-Json emits a bare object when there is a single result.
+    rows = data if isinstance(data, list) else [data]
+    by_upper = {instance_id.upper(): instance_id for instance_id in instance_ids}
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        key = by_upper.get(str(row.get("InstanceId", "")).upper())
+        if key is None:
+            continue
+        if not row.get("Present", True):
+            statuses[key] = DEVICE_ABSENT
+        elif row.get("ConfigManagerErrorCode") == _CM_PROB_DISABLED:
+            statuses[key] = DEVICE_DISABLED
+        else:
+            statuses[key] = DEVICE_ENABLED
+    return statuses
+
+
 class DeviceLocker:
     """Wraps PowerShell commands (with pnputil fallback) to toggle USB devices."""
 
@@ -30,18 +92,9 @@ class DeviceLocker:
     def disable(self, instance_id: str) -> DeviceActionResult:
         if not instance_id:
             return DeviceActionResult(instance_id, False, "Empty instance id")
-        command = textwrap.dedent(
-            f"""
-            $device = Get-PnpDevice -InstanceId '{instance_id}' -ErrorAction SilentlyContinue
-            if ($null -eq $device) {{
-              Write-Output 'DeviceNotFound'
-              exit 1
-            }}
-            Disable-PnpDevice -InstanceId '{instance_id}' -Confirm:$false -ErrorAction Stop
-            Write-Output 'Success'
-            """
+        result = self._run_command(
+            instance_id, _pnp_script(instance_id, "Disable-PnpDevice"), action="disable"
         )
-        result = self._run_command(instance_id, command)
         if not result.success:
             logger.info("PowerShell disable failed for %s, trying pnputil", instance_id)
             return self._pnputil_action(instance_id, disable=True)
@@ -50,34 +103,129 @@ class DeviceLocker:
     def enable(self, instance_id: str) -> DeviceActionResult:
         if not instance_id:
             return DeviceActionResult(instance_id, False, "Empty instance id")
-        command = textwrap.dedent(
-            f"""
-            $device = Get-PnpDevice -InstanceId '{instance_id}' -ErrorAction SilentlyContinue
-            if ($null -eq $device) {{
-              Write-Output 'DeviceNotFound'
-              exit 1
-            }}
-            Enable-PnpDevice -InstanceId '{instance_id}' -Confirm:$false -ErrorAction Stop
-            Write-Output 'Success'
-            """
+        result = self._run_command(
+            instance_id, _pnp_script(instance_id, "Enable-PnpDevice"), action="enable"
         )
-        result = self._run_command(instance_id, command)
         if not result.success:
             logger.info("PowerShell enable failed for %s, trying pnputil", instance_id)
             return self._pnputil_action(instance_id, disable=False)
         return result
 
-    def _run_command(self, instance_id: str, command: str) -> DeviceActionResult:
+    def enable_many(
+        self, instance_ids: Sequence[str], *, max_workers: int = 4
+    ) -> List[DeviceActionResult]:
+        """Enable several devices in parallel; results follow the input order."""
+        unique = list(dict.fromkeys(instance_ids))
+        if len(unique) <= 1:
+            results = {iid: self.enable(iid) for iid in unique}
+        else:
+            workers = max(1, min(max_workers, len(unique)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="LockPortEnable") as pool:
+                results = dict(zip(unique, pool.map(self.enable, unique)))
+        return [results[iid] for iid in instance_ids]
+
+    def query_status(self, instance_ids: Sequence[str]) -> Optional[Dict[str, str]]:
+        """Return enabled/disabled/absent for every id using one PowerShell call.
+
+        Returns None when the query itself fails, so callers can tell
+        "unknown" apart from "absent".
+        """
+        if not instance_ids:
+            return {}
         try:
             completed = subprocess.run(
-                [self.shell, "-NoProfile", "-Command", command],
+                self._powershell_argv(_status_script(instance_ids)),
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError as err:
+            logger.error("PowerShell status query failed: %s", err)
+            DEVICE_ACTIONS.labels("query", "powershell", "failure").inc()
+            return None
+        try:
+            if completed.returncode != 0:
+                raise ValueError(completed.stderr.strip() or f"exit code {completed.returncode}")
+            statuses = _parse_status(completed.stdout, instance_ids)
+        except ValueError as err:  # includes json.JSONDecodeError
+            logger.warning("Device status query failed: %s", err)
+            DEVICE_ACTIONS.labels("query", "powershell", "failure").inc()
+            return None
+        DEVICE_ACTIONS.labels("query", "powershell", "success").inc()
+        return statuses
+
+    async def disable_async(self, instance_id: str) -> DeviceActionResult:
+        """Coroutine variant of disable() that runs as asyncio subprocesses."""
+        if not instance_id:
+            return DeviceActionResult(instance_id, False, "Empty instance id")
+        result = await self._exec_async(
+            instance_id,
+            self._powershell_argv(_pnp_script(instance_id, "Disable-PnpDevice")),
+            tool="PowerShell",
+            action="disable",
+        )
+        if not result.success:
+            logger.info("PowerShell disable failed for %s, trying pnputil", instance_id)
+            return await self._exec_async(
+                instance_id,
+                self._pnputil_argv(instance_id, disable=True),
+                tool="pnputil",
+                action="disable",
+            )
+        return result
+
+    async def enable_async(self, instance_id: str) -> DeviceActionResult:
+        """Coroutine variant of enable() that runs as asyncio subprocesses."""
+        if not instance_id:
+            return DeviceActionResult(instance_id, False, "Empty instance id")
+        result = await self._exec_async(
+            instance_id,
+            self._powershell_argv(_pnp_script(instance_id, "Enable-PnpDevice")),
+            tool="PowerShell",
+            action="enable",
+        )
+        if not result.success:
+            logger.info("PowerShell enable failed for %s, trying pnputil", instance_id)
+            return await self._exec_async(
+                instance_id,
+                self._pnputil_argv(instance_id, disable=False),
+                tool="pnputil",
+                action="enable",
+            )
+        return result
+
+    def _powershell_argv(self, command: str) -> List[str]:
+        return [self.shell, "-NoProfile", "-Command", command]
+
+    def _pnputil_argv(self, instance_id: str, *, disable: bool) -> List[str]:
+        verb = "/disable-device" if disable else "/enable-device"
+        return [self.pnputil, verb, instance_id, "/force"]
+
+    @staticmethod
+    def _count(action: str, backend: str, result: DeviceActionResult) -> DeviceActionResult:
+        outcome = "success" if result.success else "failure"
+        DEVICE_ACTIONS.labels(action, backend, outcome).inc()
+        audit(
+            "device_action",
+            instance_id=result.instance_id,
+            action=action,
+            backend=backend,
+            outcome=outcome,
+            message=result.message,
+        )
+        return result
+
+    def _run_command(self, instance_id: str, command: str, *, action: str) -> DeviceActionResult:
+        try:
+            completed = subprocess.run(
+                self._powershell_argv(command),
                 capture_output=True,
                 text=True,
                 check=False,
             )
         except OSError as err:
             logger.error("PowerShell invocation failed: %s", err)
-            return DeviceActionResult(instance_id, False, str(err))
+            return self._count(action, "powershell", DeviceActionResult(instance_id, False, str(err)))
 
         success = completed.returncode == 0 and "Success" in completed.stdout
         message = completed.stdout.strip() or completed.stderr.strip()
@@ -88,20 +236,20 @@ class DeviceLocker:
                 completed.returncode,
                 message,
             )
-        return DeviceActionResult(instance_id, success, message)
+        return self._count(action, "powershell", DeviceActionResult(instance_id, success, message))
 
     def _pnputil_action(self, instance_id: str, *, disable: bool) -> DeviceActionResult:
-        verb = "/disable-device" if disable else "/enable-device"
+        action = "disable" if disable else "enable"
         try:
             completed = subprocess.run(
-                [self.pnputil, verb, instance_id, "/force"],
+                self._pnputil_argv(instance_id, disable=disable),
                 capture_output=True,
                 text=True,
                 check=False,
             )
         except OSError as err:
             logger.error("pnputil invocation failed: %s", err)
-            return DeviceActionResult(instance_id, False, str(err))
+            return self._count(action, "pnputil", DeviceActionResult(instance_id, False, str(err)))
 
         success = completed.returncode == 0
         message = completed.stdout.strip() or completed.stderr.strip()
@@ -112,4 +260,37 @@ class DeviceLocker:
                 completed.returncode,
                 message,
             )
-        return DeviceActionResult(instance_id, success, message)
+        return self._count(action, "pnputil", DeviceActionResult(instance_id, success, message))
+
+    async def _exec_async(
+        self, instance_id: str, argv: List[str], *, tool: str, action: str
+    ) -> DeviceActionResult:
+        import asyncio  # already loaded inside a running loop; kept off the CLI import path
+
+        backend = tool.lower()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            raw_out, raw_err = await process.communicate()
+        except OSError as err:
+            logger.error("%s invocation failed: %s", tool, err)
+            return self._count(action, backend, DeviceActionResult(instance_id, False, str(err)))
+
+        stdout = raw_out.decode(errors="replace")
+        stderr = raw_err.decode(errors="replace")
+        success = process.returncode == 0
+        if tool == "PowerShell":
+            success = success and "Success" in stdout
+        message = stdout.strip() or stderr.strip()
+        if not success:
+            logger.warning(
+                "%s action failed (instance_id=%s, code=%s, output=%s)",
+                tool,
+                instance_id,
+                process.returncode,
+                message,
+            )
+        return self._count(action, backend, DeviceActionResult(instance_id, success, message))
@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import json
+import logging
 import threading
 import time
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, cast
+from typing import Callable, Dict, List, Mapping, cast
 
 from .config import DEFAULT_CONFIG, LockPortConfig
 
+logger = logging.getLogger("lockport.device_state")
+
 
 @dataclass(slots=True)
 class DeviceState:
@@ -22,6 +25,21 @@ class DeviceState:
     def to_dict(self) -> Dict[str, object]:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, value: Mapping[str, object], *, key: str = "") -> "DeviceState":
+        raw_updated = value.get("updated_at", 0.0)
+        updated_at = float(raw_updated) if isinstance(raw_updated, (int, float, str)) else 0.0
+        return cls(
+            instance_id=str(value.get("instance_id", key)),
+            drive=str(value.get("drive", "") or ""),
+            volume=str(value.get("volume", "") or ""),
+            status=str(value.get("status", "unknown") or "unknown"),
+            updated_at=updated_at,
+        )
+
+
+StateListener = Callable[[DeviceState], None]
+
 
 class DeviceStateStore:
     """Thread-safe helper to persist device states to disk."""
@@ -32,10 +50,22 @@ class DeviceStateStore:
         self.path: Path = self.config.device_state_location
         self._lock = threading.RLock()
         self._cache: Dict[str, DeviceState] = {}
+        self._listeners: List[StateListener] = []
+        # Bumped on every change so observers can skip redundant refreshes.
+        self.version = 0
+        self._signature: tuple[int, int] | None = None
         self._load()
 
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def _load(self) -> None:
-        if not self.path.exists():
+        self._signature = self._file_signature()
+        if self._signature is None:
             return
         try:
             data = json.loads(self.path.read_text())
@@ -46,28 +76,25 @@ class DeviceStateStore:
         data_dict = cast(Dict[str, Dict[str, object]], data)
         for raw_key, value in data_dict.items():
             try:
-                raw_updated = value.get("updated_at", 0.0)
-                updated_at = float(raw_updated) if isinstance(raw_updated, (int, float, str)) else 0.0
-                self._cache[raw_key] = DeviceState(
-                    instance_id=str(value.get("instance_id", raw_key)),
-                    drive=str(value.get("drive", "") or ""),
-                    volume=str(value.get("volume", "") or ""),
-                    status=str(value.get("status", "unknown") or "unknown"),
-                    updated_at=updated_at,
-                )
-            except (TypeError, ValueError):
+                self._cache[raw_key] = DeviceState.from_dict(value, key=raw_key)
+            except (TypeError, ValueError, AttributeError):
                 continue
 
-    def reload(self) -> None:
-        """Force a fresh read from disk for observers."""
+    def reload(self) -> bool:
+        """Re-read the file if another process changed it; returns True when it did."""
         with self._lock:
+            if self._file_signature() == self._signature:
+                return False
             self._cache.clear()
             self._load()
+            self.version += 1
+            return True
 
     def _persist(self) -> None:
         with self._lock:
             serializable = {key: state.to_dict() for key, state in self._cache.items()}
             self.path.write_text(json.dumps(serializable, indent=2))
+            self._signature = self._file_signature()
 
     def upsert(
         self,
@@ -78,14 +105,34 @@ class DeviceStateStore:
         status: str,
     ) -> None:
         with self._lock:
-            self._cache[instance_id] = DeviceState(
+            state = DeviceState(
                 instance_id=instance_id,
                 drive=drive or "",
                 volume=volume or "",
                 status=status,
                 updated_at=time.time(),
             )
+            self._cache[instance_id] = state
+            self.version += 1
             self._persist()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(state)
+            except Exception:  # pragma: no cover - listeners must not break persistence
+                logger.exception("Device state listener failed")
+
+    def subscribe(self, listener: StateListener) -> Callable[[], None]:
+        """Call ``listener`` after every upsert; returns an unsubscribe callable."""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
 
     def list_states(self) -> List[DeviceState]:
         with self._lock:
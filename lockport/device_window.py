@@ -1,23 +1,49 @@
 """Tkinter window for viewing + controlling USB/Type-C device states."""
 from __future__ import annotations
 
-import base64
 import queue
 import threading
 import time
 import tkinter as tk
-from tkinter import ttk
-from typing import Any, Dict, Optional
+from concurrent.futures import Future
+from pathlib import Path
+from tkinter import filedialog, ttk
+from typing import Any, Callable, Dict, List, Optional
 
+from .action_executor import DeviceActionExecutor
+from .activity_log import ActivityLog
 from .autostart import autostart_status, disable_autostart, enable_autostart
-from .device_locker import DeviceLocker
+from .device_list import ALL_STATUSES, DeviceListModel, viewport
+from .device_locker import DeviceActionResult, DeviceLocker
 from .device_state import DeviceState, DeviceStateStore
+from .election import OwnershipLease, describe_owner
+from .ipc import ServiceClient
+from .logging_setup import configure_logging
+from .pin_prompt import PinPrompt
 from .pin_store import PinLockedError, PinManager, PinValidationError
+from .planner import ActionPlanner
+from .relock import RelockScheduler
+from .resources import asset_cache
+from .timers import TimerQueue
 from .usb_monitor import USBEvent, USBMonitor
-from .resources import asset_path, load_asset_bytes
+from .wakeups import WAKEUPS
 
 REFRESH_SECONDS = 1.0
+WINDOW_ICON_SIZE = 64
+# Upper bound on events handled per pump tick so a storm cannot freeze the UI.
+MAX_EVENTS_PER_TICK = 256
 RECENT_UNLOCK_SECONDS = 10.0
+# "Unlock for N minutes" choices; 0 keeps the device unlocked until unplugged.
+RELOCK_CHOICES = {"never": 0.0, "5 minutes": 5.0, "15 minutes": 15.0, "1 hour": 60.0, "4 hours": 240.0}
+# Activity-pane appends are batched and written at most this often.
+LOG_FLUSH_MS = 100
+
+
+def _default_relock_choice(minutes: float) -> str:
+    for label, value in RELOCK_CHOICES.items():
+        if value == minutes:
+            return label
+    return "never"
 
 
 def launch_device_window(pin_manager: PinManager) -> None:
@@ -26,18 +52,73 @@ def launch_device_window(pin_manager: PinManager) -> None:
     store = DeviceStateStore(pin_manager.config)
     locker = DeviceLocker()
     latest_states: Dict[str, DeviceState] = {}
+    # Every known state lives in the model; the Treeview only holds the rows
+    # scrolled into view, diffed in place on each render.
+    model = DeviceListModel()
+    scroll_offset = 0
+    rendered_rows: Dict[str, tuple[tuple[str, ...], str]] = {}
+    rendered_order: List[str] = []
+    rendered_version: tuple[str, int, int] | None = None
+    batch_depth = 0
+    refresh_deferred = False
+    # instance id -> "locking…"/"unlocking…" while an action runs in the background
+    busy_rows: Dict[str, str] = {}
+    busy_version = 0
+    remote_version = 0
     usb_events: "queue.Queue[USBEvent]" = queue.Queue()
+    pump_lock = threading.Lock()
+    pump_scheduled = False
+    pump_wakeup: Optional[Callable[[], None]] = None
+    planner = ActionPlanner()
+    relock_timers = TimerQueue(name="LockPortWindowTimers")
+    idle_mode = pin_manager.config.idle_mode
     processing_devices: set[str] = set()
     refresh_job: str | None = None
     external_sync_job: str | None = None
-    try:
-        usb_monitor = USBMonitor(usb_events.put, pin_manager.config.monitor_poll_seconds)
-        usb_monitor.start()
-    except RuntimeError as exc:
-        usb_monitor = None
-        monitor_error = str(exc)
-    else:
-        monitor_error = ""
+    # When the background service is running, mirror its state over IPC and
+    # let it own the USB monitor instead of starting a second watcher here.
+    client = ServiceClient.connect(pin_manager.config)
+    remote_states: Dict[str, DeviceState] = {}
+    unsubscribe_service: Optional[Callable[[], None]] = None
+    usb_monitor: USBMonitor | None = None
+    lease: OwnershipLease | None = None
+    # Replaced once the relock scheduler exists; ownership gained before then
+    # is picked up when the window finishes building.
+    on_ownership_change: Callable[[bool], None] = lambda _owner: None
+    monitor_error = ""
+
+    def _on_monitor_event(event: USBEvent) -> None:
+        nonlocal pump_scheduled
+        # Track presence in monitor order, before the event waits in the queue.
+        planner.observe(event)
+        usb_events.put(event)
+        # Wake the Tk thread once per batch instead of waiting for the next poll.
+        with pump_lock:
+            if pump_scheduled or pump_wakeup is None:
+                return
+            pump_scheduled = True
+        try:
+            pump_wakeup()
+        except (RuntimeError, tk.TclError):
+            with pump_lock:
+                pump_scheduled = False  # the fallback poll will pick it up
+
+    if client is None:
+        # Standalone: this window acts on devices and checks PINs itself, so it
+        # writes the log and audit trail (a no-op when the tray already did).
+        configure_logging(config=pin_manager.config)
+        lease = OwnershipLease(
+            pin_manager.config,
+            role="device-window",
+            on_change=lambda owner: on_ownership_change(owner),
+        )
+        lease.start()
+        try:
+            usb_monitor = USBMonitor(_on_monitor_event, pin_manager.config.monitor_wait_seconds)
+            usb_monitor.start()
+        except RuntimeError as exc:
+            usb_monitor = None
+            monitor_error = str(exc)
 
     root = tk.Tk()
     root.title("LockPort – Connected Devices")
@@ -46,32 +127,64 @@ def launch_device_window(pin_manager: PinManager) -> None:
     root.resizable(True, True)
 
     def _apply_branding_icon(widget: tk.Tk) -> None:
+        assets = asset_cache(pin_manager.config.asset_cache_location)
         try:
-            encoded = base64.b64encode(load_asset_bytes("app-logo-256.png")).decode(
-                "ascii"
-            )
-            icon_photo = tk.PhotoImage(data=encoded)
+            icon_photo = tk.PhotoImage(data=assets.tk_photo_data("app-logo-256.png", WINDOW_ICON_SIZE))
             widget.iconphoto(True, icon_photo)
             widget._lockport_icon = icon_photo  # type: ignore[attr-defined]
-            with asset_path("app-icon.ico") as ico_path:
-                widget.iconbitmap(default=str(ico_path))
+            widget.iconbitmap(default=str(assets.file("app-icon.ico")))
         except Exception:
             pass
 
     _apply_branding_icon(root)
 
+    filter_var = tk.StringVar()
+    status_filter_var = tk.StringVar(value=ALL_STATUSES)
+    count_var = tk.StringVar(value="")
+    filter_bar = tk.Frame(root)
+    filter_bar.pack(fill=tk.X, padx=8, pady=(8, 0))
+    tk.Label(filter_bar, text="Filter:").pack(side=tk.LEFT, padx=(0, 4))
+    filter_entry = tk.Entry(filter_bar, textvariable=filter_var, width=28)
+    filter_entry.pack(side=tk.LEFT, padx=(0, 8))
+    status_filter = ttk.Combobox(
+        filter_bar,
+        textvariable=status_filter_var,
+        values=(ALL_STATUSES, "locked", "unlocked", "failed", "removed"),
+        state="readonly",
+        width=10,
+    )
+    status_filter.pack(side=tk.LEFT)
+    tk.Label(filter_bar, textvariable=count_var, fg="#607d8b").pack(side=tk.RIGHT)
+
+    list_frame = tk.Frame(root)
+    list_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=(4, 4))
     columns = ("Device", "Status", "Port", "Label", "Updated")
-    tree = ttk.Treeview(root, columns=columns, show="headings", height=10)
+    tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=10)
     widths = (300, 90, 80, 180, 120)
     for col, width in zip(columns, widths):
-        tree.heading(col, text=col)
+        heading = col + (" ▼" if col == model.sort_column else "")
+        tree.heading(col, text=heading, command=lambda col=col: _sort_by(col))  # type: ignore[misc]
         tree.column(col, width=width, anchor="w")
-    tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=(8, 4))
+    tree.tag_configure("locked", foreground="#c62828")
+    tree.tag_configure("unlocked", foreground="#2e7d32")
+    tree.tag_configure("failed", foreground="#ef6c00")
+    tree.tag_configure("busy", foreground="#607d8b")
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    # The scrollbar tracks the model, not the Treeview, which never holds
+    # more than one page of items.
+    list_scroll = tk.Scrollbar(list_frame, command=lambda *args: _scroll_list(*args))
+    list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
     pin_var = tk.StringVar()
     initial_status = "Select a device to manage it."
-    if monitor_error:
+    if client is not None:
+        initial_status = "Connected to the running LockPort service."
+    elif monitor_error:
         initial_status = f"USB monitor unavailable: {monitor_error}"
+    elif lease is not None and not lease.is_owner:
+        initial_status = (
+            f"Observing only; device actions owned by {describe_owner(lease.owner_info())}."
+        )
     status_var = tk.StringVar(value=initial_status)
 
     controls = tk.Frame(root)
@@ -83,6 +196,14 @@ def launch_device_window(pin_manager: PinManager) -> None:
     lock_btn.grid(row=0, column=2, padx=(0, 8))
     unlock_btn = tk.Button(controls, text="Unlock selected", width=16)
     unlock_btn.grid(row=0, column=3)
+    export_btn = tk.Button(controls, text="Export log…", width=12)
+    export_btn.grid(row=0, column=4, padx=(8, 0))
+    tk.Label(controls, text="Relock:").grid(row=1, column=0, sticky="e", padx=(0, 4), pady=(4, 0))
+    relock_var = tk.StringVar(value=_default_relock_choice(pin_manager.config.default_relock_minutes))
+    relock_choice = ttk.Combobox(
+        controls, textvariable=relock_var, values=tuple(RELOCK_CHOICES), state="readonly", width=12
+    )
+    relock_choice.grid(row=1, column=1, sticky="w", pady=(4, 0))
 
     status_label = tk.Label(root, textvariable=status_var, anchor="w", fg="#37474f")
     status_label.pack(fill=tk.X, padx=8, pady=(0, 4))
@@ -196,6 +317,7 @@ def launch_device_window(pin_manager: PinManager) -> None:
 
     threading.Thread(target=_initial_autostart_fetch, daemon=True).start()
 
+    activity = ActivityLog(pin_manager.config.activity_log_lines)
     log_frame = tk.LabelFrame(root, text="Event log")
     log_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
     log_text = tk.Text(log_frame, height=8, state="disabled", wrap="word")
@@ -218,36 +340,140 @@ def launch_device_window(pin_manager: PinManager) -> None:
         port = event.drive_letter or "Unknown port"
         return f"{label} ({port})"
 
+    def current_states() -> List[DeviceState]:
+        if client is not None:
+            return list(remote_states.values())
+        return store.list_states()
+
+    def current_version() -> tuple[str, int, int]:
+        if client is not None:
+            return ("service", remote_version, busy_version)
+        return ("store", store.version, busy_version)
+
+    def _row_for(state: DeviceState) -> tuple[tuple[str, ...], str]:
+        busy = busy_rows.get(state.instance_id)
+        values = (
+            state.instance_id[:32],
+            busy or state.status,
+            state.drive or "-",
+            state.volume or "-",
+            format_time(state.updated_at),
+        )
+        if busy:
+            return values, "busy"
+        return values, state.status if state.status in {"unlocked", "failed"} else "locked"
+
+    def _render_rows(states: List[DeviceState]) -> None:
+        """Apply only the inserts, updates, moves and deletes needed to show ``states``."""
+        nonlocal rendered_order
+        wanted = {state.instance_id for state in states}
+        gone = [iid for iid in rendered_order if iid not in wanted]
+        if gone:
+            tree.delete(*gone)
+            for iid in gone:
+                rendered_rows.pop(iid, None)
+        order = [iid for iid in rendered_order if iid in wanted]
+        for index, state in enumerate(states):
+            iid = state.instance_id
+            row = _row_for(state)
+            previous = rendered_rows.get(iid)
+            if previous is None:
+                tree.insert("", index, iid=iid, values=row[0], tags=(row[1],))
+                order.insert(index, iid)
+            else:
+                if previous != row:
+                    tree.item(iid, values=row[0], tags=(row[1],))
+                if order[index] != iid:
+                    tree.move(iid, "", index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            rendered_rows[iid] = row
+        rendered_order = order
+
+    def _page_rows() -> int:
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        # Leave room for the heading row.
+        return max(int(tree.cget("height")), tree.winfo_height() // max(1, row_height) - 1)
+
+    def render_view() -> None:
+        """Materialize only the filtered, sorted rows that fit in the viewport."""
+        nonlocal scroll_offset
+        total = len(model)
+        page = _page_rows()
+        start, first, last = viewport(scroll_offset / total if total else 0.0, total, page)
+        scroll_offset = start
+        list_scroll.set(first, last)
+        _render_rows(model.rows(start, page))
+        if total == model.total:
+            count_var.set(f"{total} devices")
+        else:
+            count_var.set(f"{total} of {model.total} devices")
+
+    def _scroll_list(*args: str) -> None:
+        nonlocal scroll_offset
+        page = _page_rows()
+        if args[0] == "moveto":
+            scroll_offset = round(float(args[1]) * len(model))
+        elif args[0] == "scroll":
+            step = page if args[2] == "pages" else 1
+            scroll_offset += int(args[1]) * step
+        scroll_offset = max(0, min(scroll_offset, len(model) - page))
+        render_view()
+
+    def _on_wheel(event: tk.Event) -> str:
+        if getattr(event, "num", None) in (4, 5):
+            units = -1 if event.num == 4 else 1
+        else:
+            units = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        _scroll_list("scroll", str(units * 3), "units")
+        return "break"
+
+    for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+        tree.bind(sequence, _on_wheel)
+    tree.bind("<Configure>", lambda _event: render_view())
+
+    def _apply_filter(*_args: object) -> None:
+        nonlocal scroll_offset
+        model.set_filter(filter_var.get(), status_filter_var.get())
+        scroll_offset = 0
+        render_view()
+
+    filter_var.trace_add("write", _apply_filter)
+    status_filter.bind("<<ComboboxSelected>>", _apply_filter)
+
+    def _sort_by(column: str) -> None:
+        model.sort_by(column)
+        arrow = " ▼" if model.descending else " ▲"
+        for col in columns:
+            tree.heading(col, text=col + (arrow if col == model.sort_column else ""))
+        render_view()
+
     def refresh() -> None:
-        nonlocal latest_states, refresh_job
-        states = sorted(store.list_states(), key=lambda s: s.updated_at, reverse=True)
-        latest_states = {state.instance_id: state for state in states}
-        selected = tree.focus()
-        tree.delete(*tree.get_children())
-        for state in states:
-            status_color = "unlocked" if state.status == "unlocked" else "locked"
-            tree.insert(
-                "",
-                "end",
-                iid=state.instance_id,
-                values=(
-                    state.instance_id[:32],
-                    state.status,
-                    state.drive or "-",
-                    state.volume or "-",
-                    format_time(state.updated_at),
-                ),
-                tags=(status_color,),
-            )
-        tree.tag_configure("locked", foreground="#c62828")
-        tree.tag_configure("unlocked", foreground="#2e7d32")
-        if selected and tree.exists(selected):
-            tree.selection_set(selected)
-            tree.focus(selected)
-        refresh_job = root.after(int(REFRESH_SECONDS * 1000), refresh)
+        nonlocal latest_states, refresh_job, rendered_version
+        version = current_version()
+        if version != rendered_version:
+            states = current_states()
+            latest_states = {state.instance_id: state for state in states}
+            model.update(states)
+            render_view()
+            rendered_version = version
+        # In idle mode every change already calls refresh_now(), so there is
+        # nothing to poll for.
+        if not idle_mode:
+            refresh_job = root.after(int(REFRESH_SECONDS * 1000), _refresh_tick)
+
+    def _refresh_tick() -> None:
+        WAKEUPS.record("window")
+        refresh()
 
     def refresh_now() -> None:
-        nonlocal refresh_job
+        nonlocal refresh_job, refresh_deferred
+        if batch_depth:
+            refresh_deferred = True
+            return
         if refresh_job is not None:
             try:
                 root.after_cancel(refresh_job)
@@ -256,12 +482,89 @@ def launch_device_window(pin_manager: PinManager) -> None:
             refresh_job = None
         refresh()
 
-    def append_log(message: str) -> None:
-        timestamp = time.strftime("%H:%M:%S")
+    def _flush_log() -> None:
+        lines, trim = activity.take_pending()
+        if not lines and not trim:
+            return
+        at_bottom = log_text.yview()[1] >= 0.999
         log_text.configure(state="normal")
-        log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        log_text.see(tk.END)
+        if trim:
+            log_text.delete("1.0", f"{trim + 1}.0")
+        if lines:
+            log_text.insert(tk.END, "".join(lines))
         log_text.configure(state="disabled")
+        if at_bottom:
+            log_text.see(tk.END)
+
+    def append_log(message: str) -> None:
+        if activity.append(message):
+            try:
+                root.after(LOG_FLUSH_MS, _flush_log)
+            except (RuntimeError, tk.TclError):
+                pass  # window already closed
+
+    def handle_export_log() -> None:
+        target = filedialog.asksaveasfilename(
+            parent=root,
+            title="Export activity log",
+            defaultextension=".log",
+            initialfile=time.strftime("lockport-activity-%Y%m%d-%H%M%S.log"),
+            filetypes=(("Log files", "*.log"), ("All files", "*.*")),
+        )
+        if not target:
+            return
+        try:
+            count = activity.export(Path(target))
+        except OSError as exc:
+            status_var.set(f"Could not export log: {exc}")
+            return
+        status_var.set(f"Exported {count} log lines to {target}.")
+
+    export_btn.configure(command=handle_export_log)
+
+    def _dispatch_to_tk(callback: Callable[[], None]) -> None:
+        try:
+            root.after(0, callback)
+        except (RuntimeError, tk.TclError):
+            pass  # window already closed
+
+    executor = DeviceActionExecutor(
+        _dispatch_to_tk, max_workers=pin_manager.config.window_action_workers
+    )
+
+    def _set_busy(instance_id: str, label: Optional[str]) -> None:
+        nonlocal busy_version
+        if label is None:
+            busy_rows.pop(instance_id, None)
+        else:
+            busy_rows[instance_id] = label
+        busy_version += 1
+        refresh_now()
+
+    def _run_action(
+        instance_id: str,
+        label: str,
+        action: Callable[[], DeviceActionResult],
+        on_done: Callable[["Future[DeviceActionResult]"], None],
+    ) -> None:
+        """Run ``action`` off the Tk thread; the row shows ``label`` until ``on_done`` runs."""
+        _set_busy(instance_id, label)
+
+        def finish(future: "Future[DeviceActionResult]") -> None:
+            if not executor.busy(instance_id):
+                busy_rows.pop(instance_id, None)
+            try:
+                on_done(future)
+            finally:
+                _set_busy(instance_id, busy_rows.get(instance_id))
+
+        executor.submit(instance_id, action, finish)
+
+    def _selected_states() -> List[DeviceState]:
+        states = [latest_states[iid] for iid in tree.selection() if iid in latest_states]
+        if not states:
+            status_var.set("Select a device row first.")
+        return states
 
     def _require_selection() -> Optional[DeviceState]:
         instance_id = tree.focus()
@@ -275,6 +578,10 @@ def launch_device_window(pin_manager: PinManager) -> None:
         return state
 
     def _update_state(instance_id: str, status: str) -> None:
+        if client is not None:
+            # The service records the change and pushes it back to us.
+            refresh_now()
+            return
         state = latest_states.get(instance_id)
         store.upsert(
             instance_id=instance_id,
@@ -288,6 +595,11 @@ def launch_device_window(pin_manager: PinManager) -> None:
         if not event.instance_id:
             status_var.set("Ignoring USB device without instance ID.")
             return
+        if lease is not None and not lease.is_owner:
+            append_log(
+                f"Observed {event.event_type} of {device_label(event)}; another process owns device actions."
+            )
+            return
         if event.event_type == "arrival":
             _handle_arrival(event)
         else:
@@ -298,8 +610,14 @@ def launch_device_window(pin_manager: PinManager) -> None:
             return
         processing_devices.add(event.instance_id)
         display_name = device_label(event)
+        if planner.is_absent(event.instance_id):
+            planner.defer_lock(event.instance_id)
+            append_log(f"{display_name} left before it could be locked; locking on next arrival.")
+            processing_devices.discard(event.instance_id)
+            return
+        deferred_lock = planner.take_lock_intent(event.instance_id)
         existing_state = store.get(event.instance_id)
-        if existing_state and existing_state.status == "unlocked":
+        if existing_state and existing_state.status == "unlocked" and not deferred_lock:
             elapsed = time.time() - existing_state.updated_at
             if elapsed < RECENT_UNLOCK_SECONDS:
                 status_var.set(
@@ -312,7 +630,7 @@ def launch_device_window(pin_manager: PinManager) -> None:
                 processing_devices.discard(event.instance_id)
                 return
 
-        if event.synthetic:
+        if event.synthetic and not deferred_lock:
             current_status = existing_state.status if existing_state else "unknown"
             status_var.set(
                 f"Existing device detected: {display_name} (status {current_status})."
@@ -326,31 +644,46 @@ def launch_device_window(pin_manager: PinManager) -> None:
 
         status_var.set(f"USB {display_name} detected; locking...")
         append_log(f"Arrival detected: {display_name}")
-        lock_result = locker.disable(event.instance_id)
-        store.upsert(
-            instance_id=event.instance_id,
-            drive=event.drive_letter,
-            volume=event.volume_name,
-            status="locked",
-        )
-        refresh_now()
-        if not lock_result.success:
-            status_var.set(f"Failed to lock {display_name}: {lock_result.message}")
-            append_log(f"Failed to lock {display_name}: {lock_result.message}")
+
+        def finish_arrival(future: "Future[DeviceActionResult]") -> None:
             processing_devices.discard(event.instance_id)
-            return
+            try:
+                lock_result = future.result()
+            except Exception as exc:  # pragma: no cover - locker never raises today
+                lock_result = DeviceActionResult(event.instance_id, False, str(exc))
+            planner.note_result(lock_result)
+            if lock_result.success:
+                status = "locked"
+            else:
+                status = "removed" if lock_result.is_device_missing() else "failed"
+            store.upsert(
+                instance_id=event.instance_id,
+                drive=event.drive_letter,
+                volume=event.volume_name,
+                status=status,
+            )
+            if not lock_result.success:
+                status_var.set(f"Failed to lock {display_name}: {lock_result.message}")
+                append_log(f"Failed to lock {display_name}: {lock_result.message}")
+                return
+            status_var.set(
+                f"Device {display_name} locked. Enter PIN in this window to unlock."
+            )
+            append_log(
+                f"Awaiting PIN entry for {display_name}; use Unlock button after typing PIN."
+            )
 
-        status_var.set(
-            f"Device {display_name} locked. Enter PIN in this window to unlock."
-        )
-        append_log(
-            f"Awaiting PIN entry for {display_name}; use Unlock button after typing PIN."
+        _run_action(
+            event.instance_id,
+            "locking…",
+            lambda: locker.disable(event.instance_id),
+            finish_arrival,
         )
-        processing_devices.discard(event.instance_id)
 
     def _handle_removal(event: USBEvent) -> None:
+        # The planner already holds a lock intent; disabling a device that is
+        # gone would only spawn PowerShell and pnputil to report DeviceNotFound.
         processing_devices.discard(event.instance_id)
-        locker.disable(event.instance_id)
         store.upsert(
             instance_id=event.instance_id,
             drive=event.drive_letter,
@@ -359,36 +692,212 @@ def launch_device_window(pin_manager: PinManager) -> None:
         )
         refresh_now()
         status_var.set(
-            f"USB {device_label(event)} removed; port re-locked."
+            f"USB {device_label(event)} removed; it will be locked when it reconnects."
         )
         append_log(f"Removal detected: {device_label(event)}")
 
+    def _drain_usb_queue() -> None:
+        """Handle every pending event as one batch and refresh the view once."""
+        nonlocal pump_scheduled, batch_depth, refresh_deferred
+        with pump_lock:
+            pump_scheduled = False
+        handled = 0
+        batch_depth += 1
+        try:
+            while handled < MAX_EVENTS_PER_TICK:
+                try:
+                    event = usb_events.get_nowait()
+                except queue.Empty:
+                    break
+                handled += 1
+                _handle_usb_event(event)
+        finally:
+            batch_depth -= 1
+        if refresh_deferred:
+            refresh_deferred = False
+            refresh_now()
+        if handled == MAX_EVENTS_PER_TICK:
+            root.after(0, _drain_usb_queue)
+
     def _poll_usb_queue() -> None:
+        # Picks up events queued before pump_wakeup was installed. Outside
+        # idle mode it also keeps polling as a safety net.
         if usb_monitor is None:
             return
+        WAKEUPS.record("window")
         try:
-            event = usb_events.get_nowait()
-        except queue.Empty:
-            pass
-        else:
-            _handle_usb_event(event)
+            _drain_usb_queue()
         finally:
-            root.after(int(REFRESH_SECONDS * 1000), _poll_usb_queue)
+            if not idle_mode:
+                root.after(int(REFRESH_SECONDS * 1000), _poll_usb_queue)
+
+    def _lock_device(instance_id: str) -> DeviceActionResult:
+        if client is not None:
+            return client.lock(instance_id)
+        relock.cancel(instance_id)
+        if planner.is_absent(instance_id):
+            return planner.defer_lock(instance_id)
+        result = locker.disable(instance_id)
+        planner.note_result(result)
+        return result
+
+    def _note_unlock(result: DeviceActionResult, relock_minutes: float) -> None:
+        planner.note_result(result)
+        if result.success and relock_minutes > 0:
+            relock.schedule(result.instance_id, relock_minutes * 60.0)
+        else:
+            relock.cancel(result.instance_id)
+
+    def _unlock_device(instance_id: str, pin: str, relock_minutes: float) -> DeviceActionResult:
+        if client is not None:
+            return client.unlock(instance_id, pin, relock_minutes=relock_minutes)
+        pin_manager.verify_pin(pin)
+        result = locker.enable(instance_id)
+        _note_unlock(result, relock_minutes)
+        return result
+
+    def _unlock_devices(
+        instance_ids: List[str], pin: str, relock_minutes: float
+    ) -> List[DeviceActionResult]:
+        if client is not None:
+            return client.unlock_many(instance_ids, pin, relock_minutes=relock_minutes)
+        # One PBKDF2 check authorizes the whole batch.
+        pin_manager.verify_pin(pin)
+        results = locker.enable_many(
+            instance_ids, max_workers=pin_manager.config.window_action_workers
+        )
+        for result in results:
+            _note_unlock(result, relock_minutes)
+        return results
+
+    def _selected_relock_minutes() -> float:
+        return RELOCK_CHOICES.get(relock_var.get(), 0.0)
+
+    def _fire_relock(instance_id: str) -> None:
+        # Timer thread: hand the lock to the Tk thread, which runs it on the executor.
+        def relock_now() -> None:
+            append_log(f"Unlock session for {instance_id[:18]} expired; relocking")
+            _start_lock(instance_id)
+
+        _dispatch_to_tk(relock_now)
+
+    relock = RelockScheduler(
+        pin_manager.config.relock_state_location,
+        relock_timers,
+        _fire_relock,
+        should_run=lambda: lease is not None and lease.is_owner,
+    )
+
+    def _relock_on_ownership_change(owner: bool) -> None:
+        # Lease thread. As in the service, the owner restores unlock sessions
+        # and a window that loses the lease forgets them without persisting.
+        _dispatch_to_tk(relock.load if owner else relock.release)
+
+    on_ownership_change = _relock_on_ownership_change
+
+    def _start_lock(instance_id: str) -> None:
+        def finish_lock(future: "Future[DeviceActionResult]") -> None:
+            try:
+                result = future.result()
+            except (OSError, EOFError, ValueError) as exc:
+                result = DeviceActionResult(instance_id, False, str(exc))
+            if result.success:
+                _update_state(instance_id, "locked")
+                status_var.set(f"Device {instance_id[:18]} locked.")
+                append_log(f"Manually locked {instance_id[:18]}")
+            elif result.is_device_missing():
+                status_var.set("Device is disconnected; it will be locked when it reconnects.")
+                append_log(f"Deferred lock for disconnected {instance_id[:18]}")
+            else:
+                status_var.set(f"Failed to lock: {result.message}")
+                append_log(f"Failed to lock {instance_id[:18]}: {result.message}")
+
+        _run_action(instance_id, "locking…", lambda: _lock_device(instance_id), finish_lock)
 
     def handle_lock() -> None:
-        state = _require_selection()
-        if not state:
+        states = _selected_states()
+        for state in states:
+            _start_lock(state.instance_id)
+        if len(states) > 1:
+            status_var.set(f"Locking {len(states)} devices…")
+
+    def _state_label(state: DeviceState) -> str:
+        return f"{state.volume or 'Unnamed USB'} ({state.drive or 'Unknown port'})"
+
+    def handle_batch_unlock(states: List[DeviceState]) -> None:
+        targets = [state for state in states if state.status != "unlocked"]
+        if not targets:
+            status_var.set("The selected devices are already unlocked.")
             return
-        result = locker.disable(state.instance_id)
-        if result.success:
-            _update_state(state.instance_id, "locked")
-            status_var.set(f"Device {state.instance_id[:18]} locked.")
-            append_log(f"Manually locked {state.instance_id[:18]}")
-        else:
-            status_var.set(f"Failed to lock: {result.message}")
-            append_log(f"Failed to lock {state.instance_id[:18]}: {result.message}")
+        pin = pin_var.get().strip() or pin_manager.get_cached_pin() or ""
+        if not pin:
+            failed = int(pin_manager.get_status().get("failed_attempts", 0))
+            answer = PinPrompt().request_batch_pin(
+                devices=[_state_label(state) for state in targets],
+                attempts_remaining=max(0, pin_manager.config.pin_attempt_limit - failed),
+                parent=root,
+            )
+            if answer.cancelled or not answer.pin:
+                status_var.set("Batch unlock cancelled.")
+                return
+            pin = answer.pin
+        instance_ids = [state.instance_id for state in targets]
+        labels = {state.instance_id: _state_label(state) for state in targets}
+        for instance_id in instance_ids:
+            _set_busy(instance_id, "unlocking…")
+        status_var.set(f"Unlocking {len(instance_ids)} devices…")
+
+        def finish_batch(future: "Future[List[DeviceActionResult]]") -> None:
+            nonlocal busy_version
+            for instance_id in instance_ids:
+                if not executor.busy(instance_id):
+                    busy_rows.pop(instance_id, None)
+            try:
+                results = future.result()
+            except PinLockedError as exc:
+                status_var.set(f"PIN locked: {exc}")
+                return
+            except PinValidationError:
+                status_var.set("Invalid PIN.")
+                return
+            except (OSError, EOFError, ValueError) as exc:
+                results = [DeviceActionResult(iid, False, str(exc)) for iid in instance_ids]
+            finally:
+                busy_version += 1
+                refresh_now()
+
+            pin_var.set("")
+            unlocked = 0
+            for result in results:
+                label = labels.get(result.instance_id, result.instance_id[:18])
+                if result.success:
+                    unlocked += 1
+                    _update_state(result.instance_id, "unlocked")
+                    append_log(f"Batch unlocked {label}")
+                elif result.is_device_missing():
+                    _update_state(result.instance_id, "removed")
+                    append_log(f"{label} disconnected before it could be unlocked")
+                else:
+                    append_log(f"Failed to unlock {label}: {result.message}")
+            failed_count = len(results) - unlocked
+            summary = f"Unlocked {unlocked} of {len(results)} devices."
+            if failed_count:
+                summary += f" {failed_count} not unlocked; see the event log."
+            status_var.set(summary)
+
+        relock_minutes = _selected_relock_minutes()
+        # Holds every selected device, so it cannot race a pending single action.
+        executor.submit_many(
+            instance_ids,
+            lambda: _unlock_devices(instance_ids, pin, relock_minutes),
+            finish_batch,
+        )
 
     def handle_unlock() -> None:
+        selected = _selected_states()
+        if len(selected) > 1:
+            handle_batch_unlock(selected)
+            return
         state = _require_selection()
         if not state:
             return
@@ -401,42 +910,109 @@ def launch_device_window(pin_manager: PinManager) -> None:
         if not pin:
             status_var.set("Enter the admin PIN to unlock a device.")
             return
-        try:
-            pin_manager.verify_pin(pin)
-        except PinLockedError as exc:
-            status_var.set(f"PIN locked: {exc}")
-            return
-        except PinValidationError:
-            status_var.set("Invalid PIN.")
-            return
+        relock_minutes = _selected_relock_minutes()
 
-        result = locker.enable(state.instance_id)
-        if result.success:
-            _update_state(state.instance_id, "unlocked")
-            pin_var.set("")
-            status_var.set(f"Device {state.instance_id[:18]} unlocked.")
-            append_log(f"Manually unlocked {state.instance_id[:18]}")
-        else:
-            if result.is_device_missing():
-                _update_state(state.instance_id, "removed")
-                status_var.set("Device disconnected before it could be unlocked.")
-                append_log("Device disconnected before manual unlock completed")
+        def finish_unlock(future: "Future[DeviceActionResult]") -> None:
+            try:
+                result = future.result()
+            except PinLockedError as exc:
+                status_var.set(f"PIN locked: {exc}")
+                return
+            except PinValidationError:
+                status_var.set("Invalid PIN.")
+                return
+            except (OSError, EOFError, ValueError) as exc:
+                result = DeviceActionResult(state.instance_id, False, str(exc))
+
+            if result.success:
+                _update_state(state.instance_id, "unlocked")
+                pin_var.set("")
+                status_var.set(f"Device {state.instance_id[:18]} unlocked.")
+                append_log(f"Manually unlocked {state.instance_id[:18]}")
             else:
-                status_var.set(f"Failed to unlock: {result.message}")
-                append_log(f"Failed to unlock {state.instance_id[:18]}: {result.message}")
+                if result.is_device_missing():
+                    _update_state(state.instance_id, "removed")
+                    status_var.set("Device disconnected before it could be unlocked.")
+                    append_log("Device disconnected before manual unlock completed")
+                else:
+                    status_var.set(f"Failed to unlock: {result.message}")
+                    append_log(f"Failed to unlock {state.instance_id[:18]}: {result.message}")
+
+        _run_action(
+            state.instance_id,
+            "unlocking…",
+            lambda: _unlock_device(state.instance_id, pin, relock_minutes),
+            finish_unlock,
+        )
 
     lock_btn.configure(command=handle_lock)
     unlock_btn.configure(command=handle_unlock)
 
     def sync_external_store() -> None:
         nonlocal external_sync_job
+        WAKEUPS.record("window")
         store.reload()
         refresh_now()
-        external_sync_job = root.after(int(REFRESH_SECONDS * 1000), sync_external_store)
+        external_sync_job = None
+        # Only another process can change the file behind our back: keep
+        # watching while observing someone else's lease, or outside idle mode.
+        if not idle_mode or lease is None or not lease.is_owner:
+            external_sync_job = root.after(int(REFRESH_SECONDS * 1000), sync_external_store)
+
+    def _apply_service_message(message: Dict[str, Any]) -> None:
+        nonlocal remote_version
+        if client is None:
+            return
+        remote_version += 1
+        if message.get("event") == "snapshot":
+            remote_states.clear()
+            for raw in message.get("states", []):
+                state = DeviceState.from_dict(raw)
+                remote_states[state.instance_id] = state
+        elif message.get("event") == "state":
+            state = DeviceState.from_dict(message.get("state") or {})
+            remote_states[state.instance_id] = state
+        refresh_now()
+
+    def _fall_back_to_store() -> None:
+        nonlocal client, external_sync_job
+        if client is None:
+            return
+        client.close()
+        client = None
+        status_var.set("Lost connection to the LockPort service; showing saved device states.")
+        append_log("Service connection closed; falling back to device_states.json.")
+        external_sync_job = root.after(0, sync_external_store)
+
+    def _from_service_thread(callback: Callable[[], None]) -> None:
+        try:
+            root.after(0, callback)
+        except (RuntimeError, tk.TclError):
+            pass  # window already closed
+
+    def _subscribe_to_service() -> None:
+        nonlocal unsubscribe_service
+        if client is None:
+            return
+        try:
+            unsubscribe_service = client.subscribe(
+                lambda message: _from_service_thread(lambda: _apply_service_message(message)),
+                on_close=lambda: _from_service_thread(_fall_back_to_store),
+            )
+        except OSError:
+            _fall_back_to_store()
 
     def on_close() -> None:
+        executor.shutdown()
+        relock_timers.stop()
+        if unsubscribe_service is not None:
+            unsubscribe_service()
+        if client is not None:
+            client.close()
         if usb_monitor is not None:
             usb_monitor.stop()
+        if lease is not None:
+            lease.stop()
         if refresh_job is not None:
             try:
                 root.after_cancel(refresh_job)
@@ -451,7 +1027,19 @@ def launch_device_window(pin_manager: PinManager) -> None:
 
     root.protocol("WM_DELETE_WINDOW", on_close)
     if usb_monitor is not None:
-        root.after(int(REFRESH_SECONDS * 1000), _poll_usb_queue)
-    external_sync_job = root.after(int(REFRESH_SECONDS * 1000), sync_external_store)
+        with pump_lock:
+            pump_wakeup = lambda: root.after(0, _drain_usb_queue)  # noqa: E731
+        root.after(0, _poll_usb_queue)
+    if client is None and lease is not None and lease.is_owner:
+        # Without a service this window owns devices, so it also owns the
+        # unlock sessions a previous run left behind. Load once mainloop runs
+        # so overdue deadlines can reach the Tk thread; a lease gained later
+        # loads them through on_ownership_change.
+        root.after(0, relock.load)
+    if client is None:
+        external_sync_job = root.after(int(REFRESH_SECONDS * 1000), sync_external_store)
+    else:
+        # Subscribe once mainloop runs so pushed updates can use root.after.
+        root.after(0, _subscribe_to_service)
     refresh_now()
     root.mainloop()
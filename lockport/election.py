@@ -0,0 +1,160 @@
+"""Cross-process election of the single LockPort process that acts on devices."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import IO, Any, Callable, Dict
+
+from .config import DEFAULT_CONFIG, LockPortConfig
+from .wakeups import WAKEUPS
+
+logger = logging.getLogger("lockport.election")
+
+if os.name == "nt":  # pragma: no cover - exercised on Windows only
+    import msvcrt
+
+    def _try_lock(handle: IO[str]) -> bool:
+        handle.seek(0)
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(handle: IO[str]) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(handle: IO[str]) -> bool:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(handle: IO[str]) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def read_owner(config: LockPortConfig | None = None) -> Dict[str, Any] | None:
+    """Return details of the current owner, or None when nobody holds the lease."""
+    cfg = config or DEFAULT_CONFIG
+    lock_path = cfg.owner_lock_location
+    if not lock_path.exists():
+        return None
+    with open(lock_path, "a+") as probe:
+        if _try_lock(probe):
+            # Nobody holds the lease; whatever owner.json says is stale.
+            _unlock(probe)
+            return None
+    try:
+        data = json.loads(cfg.owner_info_location.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def describe_owner(owner: Dict[str, Any] | None) -> str:
+    if owner is None:
+        return "none"
+    if not owner:
+        return "unknown process"
+    since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(owner.get("acquired_at", 0))))
+    return f"{owner.get('role', 'process')} (PID {owner.get('pid')}, since {since})"
+
+
+class OwnershipLease:
+    """Lock-file lease; exactly one holder performs device actions.
+
+    The operating system drops the file lock when the holder exits or crashes,
+    so observers retrying every ``election_retry_seconds`` take over within
+    that bound.
+    """
+
+    def __init__(
+        self,
+        config: LockPortConfig | None = None,
+        *,
+        role: str = "service",
+        on_change: Callable[[bool], None] | None = None,
+    ) -> None:
+        self.config = config or DEFAULT_CONFIG
+        self.config.ensure_directories()
+        self.role = role
+        self.retry_seconds = self.config.election_retry_seconds
+        self._on_change = on_change
+        self._handle: IO[str] | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_owner(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        if self._try_acquire():
+            return
+        logger.info(
+            "Device actions owned by %s; running as read-only observer",
+            describe_owner(read_owner(self.config)),
+        )
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._watch, name="LockPortElection", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        with self._lock:
+            handle, self._handle = self._handle, None
+            if handle is None:
+                return
+            try:
+                self.config.owner_info_location.unlink()
+            except OSError:
+                pass
+            _unlock(handle)
+            handle.close()
+        logger.info("Released device ownership")
+        if self._on_change:
+            self._on_change(False)
+
+    def owner_info(self) -> Dict[str, Any] | None:
+        return read_owner(self.config)
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.retry_seconds):
+            WAKEUPS.record("election")
+            if self._try_acquire():
+                return
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._handle is not None:
+                return True
+            handle = open(self.config.owner_lock_location, "a+")
+            if not _try_lock(handle):
+                handle.close()
+                return False
+            self._handle = handle
+            info = {"pid": os.getpid(), "role": self.role, "acquired_at": time.time()}
+            try:
+                self.config.owner_info_location.write_text(json.dumps(info))
+            except OSError as err:
+                logger.warning("Failed to record owner details: %s", err)
+        logger.info("Acquired device ownership as %s (PID %s)", self.role, os.getpid())
+        if self._on_change:
+            self._on_change(True)
+        return True
@@ -0,0 +1,310 @@
+"""Local IPC channel between the running service and its clients.
+
+``multiprocessing.connection`` gives one API over Windows named pipes and
+Unix domain sockets. Messages are JSON documents sent with ``send_bytes`` so
+nothing received over the channel is ever unpickled.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Sequence
+
+from .config import DEFAULT_CONFIG, LockPortConfig
+from .device_locker import DeviceActionResult
+from .device_state import DeviceState
+from .pin_store import PinLockedError, PinValidationError
+
+logger = logging.getLogger("lockport.ipc")
+
+Message = Dict[str, Any]
+RequestHandler = Callable[[Message], Message]
+Unsubscribe = Callable[[], None]
+SubscribeHook = Callable[[Callable[[Message], None]], Unsubscribe]
+
+_SUBSCRIBER_BACKLOG = 256
+
+
+def service_address(config: LockPortConfig | None = None) -> str:
+    """Return the named pipe (Windows) or socket path the service listens on."""
+    cfg = config or DEFAULT_CONFIG
+    if os.name == "nt":
+        return rf"\\.\pipe\{cfg.ipc_pipe_name}"
+    return str(cfg.pin_store_path / cfg.ipc_socket_file)
+
+
+def _family() -> str:
+    return "AF_PIPE" if os.name == "nt" else "AF_UNIX"
+
+
+def _send(conn: Connection, message: Message) -> None:
+    conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+
+def _interrupt(conn: Connection) -> None:
+    """Unblock a thread waiting in recv() on ``conn``."""
+    if os.name == "nt":
+        conn.close()
+        return
+    try:
+        sock = socket.socket(fileno=os.dup(conn.fileno()))
+    except OSError:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def _recv(conn: Connection) -> Message:
+    data = json.loads(conn.recv_bytes().decode("utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("IPC message must be a JSON object")
+    return data
+
+
+class IPCServer:
+    """Accepts client connections and answers JSON requests on worker threads."""
+
+    def __init__(
+        self,
+        address: str,
+        handler: RequestHandler,
+        subscribe: SubscribeHook,
+    ) -> None:
+        self.address = address
+        self._handler = handler
+        self._subscribe = subscribe
+        self._listener: Listener | None = None
+        self._thread: threading.Thread | None = None
+        self._closing = threading.Event()
+        self._subscribers: List["queue.Queue[Message | None]"] = []
+        self._subscribers_lock = threading.Lock()
+
+    def start(self) -> None:
+        if _family() == "AF_UNIX":
+            self._clear_stale_socket()
+        self._listener = Listener(self.address, family=_family())
+        self._thread = threading.Thread(
+            target=self._accept_loop, name="LockPortIPC", daemon=True
+        )
+        self._thread.start()
+        logger.info("IPC channel listening on %s", self.address)
+
+    def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._closing.set()
+        try:
+            # Wake the blocking accept() so the loop can observe _closing.
+            Client(self.address, family=_family()).close()
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._listener.close()
+        self._listener = None
+        with self._subscribers_lock:
+            for backlog in self._subscribers:
+                backlog.put(None)
+            self._subscribers.clear()
+
+    def _clear_stale_socket(self) -> None:
+        if not os.path.exists(self.address):
+            return
+        try:
+            Client(self.address, family="AF_UNIX").close()
+        except OSError:
+            os.unlink(self.address)
+        else:
+            raise OSError(f"Another LockPort service is listening on {self.address}")
+
+    def _accept_loop(self) -> None:
+        assert self._listener is not None
+        while not self._closing.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closing.is_set():
+                    break
+                logger.exception("IPC accept failed")
+                continue
+            if self._closing.is_set():
+                conn.close()
+                break
+            threading.Thread(
+                target=self._serve_connection,
+                args=(conn,),
+                name="LockPortIPCClient",
+                daemon=True,
+            ).start()
+
+    def _serve_connection(self, conn: Connection) -> None:
+        try:
+            while not self._closing.is_set():
+                try:
+                    request = _recv(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError as exc:
+                    _send(conn, {"ok": False, "error": "bad_request", "message": str(exc)})
+                    continue
+                if request.get("cmd") == "subscribe":
+                    self._stream_updates(conn, request)
+                    return
+                try:
+                    response = self._handler(request)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.exception("IPC request failed: %s", request)
+                    response = {"ok": False, "error": "internal", "message": str(exc)}
+                _send(conn, response)
+        except OSError:
+            return
+        finally:
+            conn.close()
+
+    def _stream_updates(self, conn: Connection, request: Message) -> None:
+        backlog: "queue.Queue[Message | None]" = queue.Queue(maxsize=_SUBSCRIBER_BACKLOG)
+        overflowed = threading.Event()
+
+        def push(message: Message) -> None:
+            try:
+                backlog.put_nowait(message)
+            except queue.Full:
+                # A stalled client must never block the service; cut it loose.
+                overflowed.set()
+
+        with self._subscribers_lock:
+            self._subscribers.append(backlog)
+        unsubscribe = self._subscribe(push)
+        try:
+            _send(conn, self._handler({"cmd": "list"}) | {"event": "snapshot"})
+            while not overflowed.is_set():
+                message = backlog.get()
+                if message is None:
+                    return
+                _send(conn, message)
+            logger.warning("Dropping IPC subscriber that stopped reading updates")
+        except OSError:
+            return
+        finally:
+            unsubscribe()
+            with self._subscribers_lock:
+                if backlog in self._subscribers:
+                    self._subscribers.remove(backlog)
+
+
+class ServiceClient:
+    """Client side of the IPC channel used by the CLI, window, and tray."""
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self._conn: Connection = Client(address, family=_family())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, config: LockPortConfig | None = None) -> "ServiceClient | None":
+        """Return a client for the running service, or None if none is listening."""
+        address = service_address(config)
+        if _family() == "AF_UNIX" and not os.path.exists(address):
+            return None
+        try:
+            return cls(address)
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def request(self, cmd: str, **params: Any) -> Message:
+        with self._lock:
+            _send(self._conn, {"cmd": cmd, **params})
+            return _recv(self._conn)
+
+    def list_states(self) -> List[DeviceState]:
+        response = self.request("list")
+        return [DeviceState.from_dict(raw) for raw in response.get("states", [])]
+
+    def status(self) -> Message:
+        return self.request("status")
+
+    def lock(self, instance_id: str) -> DeviceActionResult:
+        return self._action_result(instance_id, self.request("lock", instance_id=instance_id))
+
+    def unlock(
+        self, instance_id: str, pin: str, *, relock_minutes: float | None = None
+    ) -> DeviceActionResult:
+        response = self.request(
+            "unlock", instance_id=instance_id, pin=pin, relock_minutes=relock_minutes
+        )
+        self._raise_pin_error(response)
+        return self._action_result(instance_id, response)
+
+    def unlock_many(
+        self, instance_ids: Sequence[str], pin: str, *, relock_minutes: float | None = None
+    ) -> List[DeviceActionResult]:
+        """Unlock several devices with one PIN check; results follow ``instance_ids``."""
+        response = self.request(
+            "unlock_many", instance_ids=list(instance_ids), pin=pin, relock_minutes=relock_minutes
+        )
+        self._raise_pin_error(response)
+        if not response.get("ok"):
+            message = str(response.get("message") or response.get("error") or "")
+            return [DeviceActionResult(iid, False, message) for iid in instance_ids]
+        return [
+            self._action_result(iid, payload)
+            for iid, payload in zip(instance_ids, response.get("results", []))
+        ]
+
+    @staticmethod
+    def _raise_pin_error(response: Message) -> None:
+        if response.get("error") == "pin_locked":
+            raise PinLockedError(response.get("message") or "PIN entry temporarily locked")
+        if response.get("error") == "invalid_pin":
+            raise PinValidationError(response.get("message") or "Invalid PIN")
+
+    @staticmethod
+    def _action_result(instance_id: str, response: Message) -> DeviceActionResult:
+        return DeviceActionResult(
+            instance_id,
+            bool(response.get("success")),
+            str(response.get("message") or response.get("error") or ""),
+        )
+
+    def subscribe(
+        self,
+        callback: Callable[[Message], None],
+        *,
+        on_close: Callable[[], None] | None = None,
+    ) -> Unsubscribe:
+        """Stream push messages to ``callback`` on a background thread."""
+        conn = Client(self.address, family=_family())
+        _send(conn, {"cmd": "subscribe"})
+
+        def reader() -> None:
+            try:
+                while True:
+                    callback(_recv(conn))
+            except (EOFError, OSError, ValueError):
+                pass
+            finally:
+                conn.close()
+                if on_close and not closed.is_set():
+                    on_close()
+
+        closed = threading.Event()
+
+        def unsubscribe() -> None:
+            closed.set()
+            _interrupt(conn)
+
+        threading.Thread(target=reader, name="LockPortIPCSubscriber", daemon=True).start()
+        return unsubscribe
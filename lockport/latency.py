@@ -0,0 +1,168 @@
+"""Rolling latency histograms for the arrival -> lock pipeline."""
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Tuple
+
+from .usb_monitor import USBEvent
+
+STAGES = ("queue_wait", "device_action", "state_persist", "end_to_end")
+PERCENTILES = (50.0, 95.0, 99.0)
+
+# Log-linear bucketing in the spirit of HdrHistogram: values below 32us are
+# exact, above that each power of two is split into 16 sub-buckets (~3% error).
+_SUB_BITS = 5
+_LINEAR_LIMIT = 1 << _SUB_BITS
+_HALF = _LINEAR_LIMIT >> 1
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < _LINEAR_LIMIT:
+        return value_us
+    shift = value_us.bit_length() - _SUB_BITS
+    return shift * _HALF + (value_us >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // _HALF - 1
+    top = index % _HALF + _HALF
+    return ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations with microsecond resolution."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value_us = max(0, int(seconds * 1_000_000))
+        index = _bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, hits in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + hits
+        self.count += other.count
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, pct: float) -> float:
+        """Return the value (in milliseconds) at or below which pct% of samples fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(_bucket_upper(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self) -> Dict[str, float]:
+        result: Dict[str, float] = {"count": self.count}
+        for pct in PERCENTILES:
+            result[f"p{int(pct)}_ms"] = self.percentile(pct)
+        result["max_ms"] = self.max_us / 1000.0
+        return result
+
+
+class RollingHistogram:
+    """Histogram covering the last ``window_seconds`` using fixed time slices."""
+
+    def __init__(self, window_seconds: float, *, slices: int = 6) -> None:
+        self.slice_seconds = max(1.0, window_seconds / slices)
+        self._slices: Deque[Tuple[float, LatencyHistogram]] = deque(maxlen=slices)
+
+    def record(self, seconds: float, *, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        if not self._slices or now - self._slices[-1][0] >= self.slice_seconds:
+            self._slices.append((now, LatencyHistogram()))
+        self._slices[-1][1].record(seconds)
+
+    def merged(self, *, now: float | None = None) -> LatencyHistogram:
+        now = time.monotonic() if now is None else now
+        horizon = self.slice_seconds * (self._slices.maxlen or 1)
+        combined = LatencyHistogram()
+        for started, histogram in self._slices:
+            if now - started < horizon:
+                combined.merge(histogram)
+        return combined
+
+
+class LatencyStats:
+    """Per-stage rolling histograms fed from timestamped USB events."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        window_seconds: float = 3600.0,
+        persist_seconds: float = 60.0,
+    ) -> None:
+        self.path = path
+        self.window_seconds = window_seconds
+        self.persist_seconds = persist_seconds
+        self._lock = threading.Lock()
+        self._stages: Dict[str, RollingHistogram] = {
+            stage: RollingHistogram(window_seconds) for stage in STAGES
+        }
+        self._last_persist = time.monotonic()
+
+    def record_event(self, event: USBEvent) -> None:
+        """Record stage durations for an event that has reached persistence."""
+        samples = list(self._stage_samples(event))
+        if not samples:
+            return
+        with self._lock:
+            for stage, seconds in samples:
+                self._stages[stage].record(seconds)
+        if time.monotonic() - self._last_persist >= self.persist_seconds:
+            self.persist()
+
+    @staticmethod
+    def _stage_samples(event: USBEvent) -> Iterable[Tuple[str, float]]:
+        marks = (event.created_at, event.dequeued_at, event.actioned_at, event.persisted_at)
+        for stage, start, end in zip(STAGES, marks, marks[1:]):
+            if start is not None and end is not None:
+                yield stage, end - start
+        if event.persisted_at is not None:
+            yield "end_to_end", event.persisted_at - event.created_at
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            stages = {stage: hist.merged().summary() for stage, hist in self._stages.items()}
+        return {
+            "updated_at": time.time(),
+            "window_seconds": self.window_seconds,
+            "stages": stages,
+        }
+
+    def persist(self) -> None:
+        self._last_persist = time.monotonic()
+        payload = self.snapshot()
+        try:
+            self.path.write_text(json.dumps(payload, indent=2))
+        except OSError:
+            # Stats are advisory; the next interval will try again.
+            pass
+
+
+def load_latency_snapshot(path: Path) -> Dict[str, object] | None:
+    """Read the last persisted snapshot written by LatencyStats."""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
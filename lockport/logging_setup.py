@@ -1,33 +1,270 @@
-"""Centralized logging configuration for LockPort."""
+"""Centralized logging configuration for LockPort.
+
+Records are handed to a bounded in-memory queue and written by a single
+listener thread, which flushes its writers each time the queue drains.
+Worker and monitor threads therefore never wait on file I/O or log
+rotation. When the queue is full, records are dropped and
+counted rather than blocking the caller. A token-bucket filter per message
+template keeps event storms from flooding the log.
+"""
 from __future__ import annotations
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from .audit import AuditHandler, is_audit_record
+from .config import DEFAULT_CONFIG, LockPortConfig
+from .metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+
+_listener: BatchFlushingListener | None = None
+_listener_lock = threading.Lock()
+# (log file, audit directory) the running listener writes to.
+_listener_targets: Tuple[Path, Path] | None = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when full."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._unreported:
+                notice = logging.LogRecord(
+                    record.name,
+                    logging.WARNING,
+                    __file__,
+                    0,
+                    "Log queue overflowed; dropped %s records",
+                    (self._unreported,),
+                    None,
+                )
+                self.queue.put_nowait(self.prepare(notice))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+class BatchFlushingListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue drains.
+
+    Buffered writers (the audit segments and their indexes) then reach disk
+    after each burst of records, and at least every ``flush_every`` records
+    during a storm that keeps the queue busy.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord]",
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+        flush_every: int = 256,
+    ) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.flush_every = flush_every
+        self._since_flush = 0
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        self._since_flush += 1
+        if self._since_flush >= self.flush_every or self.queue.empty():
+            self._since_flush = 0
+            for handler in self.handlers:
+                handler.flush()
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per (logger, level, message template).
+
+    Each key may log ``burst`` records at once and then ``rate_per_second``
+    on average. Extra records are dropped and counted. The next record that
+    gets through carries a "(suppressed N similar messages)" suffix.
+    ERROR and above, and audit records, always pass.
+    """
 
-from .config import DEFAULT_CONFIG
+    def __init__(
+        self,
+        *,
+        rate_per_second: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._buckets: Dict[Tuple[str, int, str], List[float]] = {}  # [tokens, stamp, suppressed]
+        self._lock = threading.Lock()
 
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate_per_second <= 0 or record.levelno >= logging.ERROR or is_audit_record(record):
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0.0]
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate_per_second)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                LOG_RECORDS_SUPPRESSED.inc()
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = int(bucket[2]), 0.0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (suppressed {suppressed} similar messages)"
+            record.args = None
+        return True
 
-def configure_logging(*, force_console: bool | None = None) -> logging.Logger:
-    """Configure root logger for the LockPort service."""
-    log_file = DEFAULT_CONFIG.log_location
-    handler = RotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=3)
-    formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(name)s %(threadName)s - %(message)s"
-    )
-    handler.setFormatter(formatter)
+    def drain_suppressed(self) -> List[Tuple[str, int, str, int]]:
+        """Return and reset pending (logger, level, template, count) suppressions."""
+        with self._lock:
+            pending = [(name, level, msg, int(bucket[2])) for (name, level, msg), bucket in self._buckets.items() if bucket[2]]
+            for bucket in self._buckets.values():
+                bucket[2] = 0.0
+        return pending
 
+
+def configure_logging(
+    *,
+    force_console: bool | None = None,
+    config: LockPortConfig | None = None,
+) -> logging.Logger:
+    """Configure the ``lockport`` logger with a queue-backed file (and console) writer.
+
+    The ``lockport.audit`` logger shares the queue; its records go only to
+    the JSONL audit segments, not to the text log. Logging is process-wide:
+    a later call with the same paths is a no-op, while a config that writes
+    elsewhere drains and replaces the current writers.
+    """
+    global _listener, _listener_targets
+    cfg = config or DEFAULT_CONFIG
     logger = logging.getLogger("lockport")
     logger.setLevel(logging.INFO)
-    if not any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
-        logger.addHandler(handler)
 
     console_pref = force_console
     if console_pref is None:
         console_pref = os.environ.get("LOCKPORT_CONSOLE_LOG", "0") not in {"0", ""}
-    if console_pref and not any(isinstance(h, logging.StreamHandler) and not isinstance(h, RotatingFileHandler) for h in logger.handlers):
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
 
+    targets = (cfg.log_location, cfg.audit_location)
+    with _listener_lock:
+        if any(isinstance(h, BoundedQueueHandler) for h in logger.handlers):
+            if _listener_targets == targets:
+                return logger
+            logger.info(
+                "Logging moves from %s to %s", _listener_targets[0] if _listener_targets else "?", targets[0]
+            )
+            _stop_listener()
+
+        cfg.log_path.mkdir(parents=True, exist_ok=True)
+        formatter = logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(name)s %(threadName)s - %(message)s"
+        )
+        handlers: List[logging.Handler] = []
+        file_handler = RotatingFileHandler(
+            cfg.log_location, maxBytes=cfg.log_max_bytes, backupCount=cfg.log_backup_count
+        )
+        handlers.append(file_handler)
+        if console_pref:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            handler.addFilter(lambda record: not is_audit_record(record))
+        handlers.append(
+            AuditHandler(
+                cfg.audit_location,
+                max_bytes=cfg.audit_max_bytes,
+                backup_count=cfg.audit_backup_count,
+            )
+        )
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=cfg.log_queue_size)
+        _listener = BatchFlushingListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        queue_handler = BoundedQueueHandler(log_queue)
+        # Filter before enqueueing so storms cost neither queue slots nor disk I/O.
+        queue_handler.addFilter(
+            RateLimitFilter(rate_per_second=cfg.log_rate_per_second, burst=cfg.log_rate_burst)
+        )
+        logger.addHandler(queue_handler)
+        audit_logger = logging.getLogger("lockport.audit")
+        audit_logger.setLevel(logging.INFO)
+        audit_logger.addHandler(queue_handler)
+        _listener_targets = targets
     return logger
+
+
+def flush_logging(timeout: float = 2.0) -> bool:
+    """Wait until queued records are written; returns False on timeout."""
+    listener = _listener
+    if listener is None:
+        return True
+    _report_suppressed()
+    log_queue = listener.queue
+    deadline = time.monotonic() + timeout
+    # QueueListener calls task_done() for each record it handles.
+    while getattr(log_queue, "unfinished_tasks", 0):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.005)
+    for handler in listener.handlers:
+        handler.flush()
+    return True
+
+
+def _report_suppressed() -> None:
+    for handler in logging.getLogger("lockport").handlers:
+        for flt in handler.filters:
+            if isinstance(flt, RateLimitFilter):
+                for name, level, template, count in flt.drain_suppressed():
+                    # Bypass the filter: the summary is the point of the exercise.
+                    summary = logging.LogRecord(
+                        name, level, __file__, 0,
+                        "Suppressed %s similar messages: %s", (count, template), None,
+                    )
+                    handler.acquire()
+                    try:
+                        handler.emit(summary)
+                    finally:
+                        handler.release()
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the writer thread (called at interpreter exit)."""
+    with _listener_lock:
+        _stop_listener()
+
+
+def _stop_listener() -> None:
+    # Caller holds _listener_lock.
+    global _listener, _listener_targets
+    if _listener is None:
+        return
+    _report_suppressed()
+    listener, _listener, _listener_targets = _listener, None, None
+    for name in ("lockport", "lockport.audit"):
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, BoundedQueueHandler):
+                logger.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
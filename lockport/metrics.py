@@ -0,0 +1,310 @@
+"""In-process counters and a Prometheus text-format endpoint."""
+from __future__ import annotations
+
+import functools
+import logging
+import socket
+import threading
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    import socketserver
+
+logger = logging.getLogger("lockport.metrics")
+
+
+class _CounterCell:
+    """Counter value split into per-thread cells.
+
+    Each thread only ever writes its own cell, so increments need no lock;
+    readers sum the cells when the endpoint is scraped. Cells of finished
+    threads are folded into a base value, so short-lived connection threads
+    do not grow the cell list.
+    """
+
+    __slots__ = ("_local", "_cells", "_base", "_register_lock")
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._cells: List[Tuple["weakref.ref[threading.Thread]", List[float]]] = []
+        self._base = 0.0
+        self._register_lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = [0.0]
+            with self._register_lock:
+                self._fold_finished()
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+            self._local.cell = cell
+        cell[0] += amount
+
+    def value(self) -> float:
+        with self._register_lock:
+            self._fold_finished()
+            return self._base + sum(cell[0] for _, cell in self._cells)
+
+    def _fold_finished(self) -> None:
+        # A finished thread never writes its cell again. Caller holds the lock.
+        live = []
+        for owner, cell in self._cells:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                live.append((owner, cell))
+            else:
+                self._base += cell[0]
+        self._cells = live
+
+
+class Counter:
+    """Monotonic counter with optional label dimensions."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _CounterCell] = {}
+        if not self.labelnames:
+            self._children[()] = _CounterCell()
+
+    def labels(self, *values: str) -> _CounterCell:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, _CounterCell())
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return [(key, child.value()) for key, child in list(self._children.items())]
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames: Tuple[str, ...] = ()
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._function = function
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        if self._function is not None:
+            try:
+                return [((), float(self._function()))]
+            except Exception:  # pragma: no cover - collector must not break scrapes
+                logger.debug("Gauge %s callback failed", self.name, exc_info=True)
+        return [((), self._value)]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Gauge] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        metric = Gauge(name, help_text)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in metric.samples():
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+EVENTS = REGISTRY.counter(
+    "lockport_usb_events_total", "USB events received from the monitor", ("type",)
+)
+EVENTS_DROPPED = REGISTRY.counter(
+    "lockport_usb_events_dropped_total", "USB events dropped because the queue was full"
+)
+QUEUE_DEPTH = REGISTRY.gauge("lockport_event_queue_depth", "USB events waiting for a worker")
+DEVICE_ACTIONS = REGISTRY.counter(
+    "lockport_device_actions_total",
+    "Device enable/disable/query attempts by backend and outcome",
+    ("action", "backend", "outcome"),
+)
+DEVICE_ACTIONS_SKIPPED = REGISTRY.counter(
+    "lockport_device_actions_skipped_total",
+    "Device actions not attempted because the device was known to be absent",
+    ("action",),
+)
+RECONCILE_CORRECTIONS = REGISTRY.counter(
+    "lockport_reconcile_corrections_total",
+    "Stored device states corrected by the reconciliation sweep",
+    ("action",),
+)
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "lockport_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+LOG_RECORDS_SUPPRESSED = REGISTRY.counter(
+    "lockport_log_records_suppressed_total", "Log records suppressed by the per-message rate limit"
+)
+PIN_FAILURES = REGISTRY.counter("lockport_pin_failures_total", "Rejected PIN attempts")
+PIN_LOCKOUTS = REGISTRY.counter("lockport_pin_lockouts_total", "PIN lockouts triggered")
+WORKERS = REGISTRY.gauge("lockport_workers", "Configured worker slots")
+WORKER_BUSY_SECONDS = REGISTRY.counter(
+    "lockport_worker_busy_seconds_total",
+    "Seconds workers spent handling events (divide the rate by lockport_workers for utilization)",
+)
+WAKEUPS_TOTAL = REGISTRY.counter(
+    "lockport_wakeups_total", "Times a blocking loop woke up, by source", ("source",)
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _http_types() -> Tuple[type, type, type | None]:
+    """Handler and server classes, built on first use.
+
+    http.server pulls in http.client, email and ssl; counters are imported
+    by every CLI command, so the endpoint's imports wait until one is served.
+    """
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        registry: MetricsRegistry = REGISTRY
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = self.registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    class _LocalHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    unix_server: type | None = None
+    if hasattr(socket, "AF_UNIX"):
+
+        class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+            def get_request(self):  # type: ignore[no-untyped-def]
+                request, _ = super().get_request()
+                # BaseHTTPRequestHandler expects a (host, port) style address.
+                return request, ("local", 0)
+
+        unix_server = _UnixHTTPServer
+    return _MetricsHandler, _LocalHTTPServer, unix_server
+
+
+class MetricsServer:
+    """Serves REGISTRY on a localhost TCP port or a Unix domain socket."""
+
+    def __init__(
+        self,
+        *,
+        port: int | None = None,
+        socket_path: Path | None = None,
+        registry: MetricsRegistry = REGISTRY,
+    ) -> None:
+        if port is None and socket_path is None:
+            raise ValueError("MetricsServer needs a port or a socket path")
+        self.port = port
+        self.socket_path = socket_path
+        base_handler, local_server, unix_server = _http_types()
+        handler = type("MetricsHandler", (base_handler,), {"registry": registry})
+        self._server: socketserver.BaseServer
+        if socket_path is not None:
+            if unix_server is None:
+                raise RuntimeError("Unix domain sockets are not available on this platform")
+            if socket_path.exists():
+                socket_path.unlink()
+            self._server = unix_server(str(socket_path), handler)
+        else:
+            self._server = local_server(("127.0.0.1", int(port or 0)), handler)
+            self.port = self._server.server_address[1]
+        self._thread: threading.Thread | None = None
+        self._closing = threading.Event()
+
+    def start(self) -> None:
+        self._closing.clear()
+        self._thread = threading.Thread(
+            target=self._serve, name="LockPortMetrics", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "Metrics endpoint listening on %s",
+            self.socket_path or f"http://127.0.0.1:{self.port}/metrics",
+        )
+
+    def _serve(self) -> None:
+        # handle_request() blocks until a client connects. serve_forever()
+        # would instead wake every 0.5 s to check for shutdown.
+        while not self._closing.is_set():
+            self._server.handle_request()
+
+    def _wake(self) -> None:
+        if self.socket_path is not None:
+            family, address = socket.AF_UNIX, str(self.socket_path)  # type: ignore[attr-defined]
+        else:
+            family, address = socket.AF_INET, ("127.0.0.1", int(self.port or 0))
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as poke:
+                poke.settimeout(1.0)
+                poke.connect(address)
+        except OSError:
+            pass
+
+    def stop(self) -> None:
+        if self._thread:
+            self._closing.set()
+            # Wake the blocking accept so the loop can observe _closing.
+            self._wake()
+            self._thread.join(timeout=2.0)
+        self._server.server_close()
+        if self.socket_path is not None:
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
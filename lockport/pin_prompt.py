@@ -5,10 +5,11 @@ import logging
 import queue
 import threading
 from dataclasses import dataclass
-from tkinter import BOTH, Button, Entry, Frame, Label, StringVar, Tk, Toplevel
-from typing import Callable
+from tkinter import BOTH, END, Button, Entry, Frame, Label, Listbox, StringVar, TclError, Tk, Toplevel
+from typing import Callable, Sequence
 
 from .config import DEFAULT_CONFIG
+from .wakeups import WAKEUPS
 
 
 LOGGER = logging.getLogger("lockport.pin_prompt")
@@ -21,11 +22,102 @@ class PinPromptResult:
     exit_requested: bool = False
 
 
+class PromptHost:
+    """Keeps one hidden Tk interpreter alive on a dedicated UI thread.
+
+    Standalone prompts are queued to it with call() instead of each paying
+    for a new thread and Tcl/Tk start-up. The withdrawn root has no timers,
+    so the thread sleeps in mainloop() until a prompt is queued.
+    """
+
+    _shared: "PromptHost | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str = "LockPortPromptHost") -> None:
+        self.name = name
+        self._root: Tk | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._error: BaseException | None = None
+
+    @classmethod
+    def shared(cls) -> "PromptHost":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def warm_up(self) -> None:
+        """Start the UI thread without waiting, so the first prompt skips Tk start-up."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._ready.clear()
+                self._error = None
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def start(self, timeout: float = 10.0) -> None:
+        """Start the UI thread and wait until mainloop runs."""
+        self.warm_up()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("PIN prompt host did not start in time")
+        if self._error is not None:
+            raise RuntimeError(f"PIN prompt host failed to start: {self._error}")
+
+    def call(self, callback: Callable[[Tk], None]) -> None:
+        """Run ``callback(root)`` on the UI thread; starts the host on first use."""
+        self.start()
+        root = self._root
+        if root is None:
+            raise RuntimeError("PIN prompt host is not running")
+        try:
+            root.after(0, lambda: callback(root))
+        except (RuntimeError, TclError) as exc:
+            raise RuntimeError(f"PIN prompt host is not running: {exc}") from exc
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            # A host stopped right after warm_up() has no root to quit yet.
+            self._ready.wait(timeout=2.0)
+        root = self._root
+        if root is not None:
+            try:
+                root.after(0, root.quit)
+            except (RuntimeError, TclError):
+                pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            root = Tk()
+        except Exception as exc:  # no display, Tk missing, ...
+            LOGGER.warning("PIN prompt host unavailable: %s", exc)
+            self._error = exc
+            self._ready.set()
+            return
+        root.withdraw()
+        self._root = root
+        # Set from inside mainloop so cross-thread after() calls are safe.
+        root.after(0, self._ready.set)
+        try:
+            root.mainloop()
+        finally:
+            self._root = None
+            try:
+                root.destroy()
+            except TclError:
+                pass
+
+
 class PinPrompt:
     """Blocking PIN prompt that always stays on top of other windows."""
 
-    def __init__(self, timeout_seconds: int | None = None) -> None:
+    def __init__(self, timeout_seconds: int | None = None, *, host: PromptHost | None = None) -> None:
         self.timeout_seconds = timeout_seconds or DEFAULT_CONFIG.ui_timeout_seconds
+        self.host = host
 
     def request_pin(
         self,
@@ -48,6 +140,29 @@ class PinPrompt:
             external_pin_provider=external_pin_provider,
         )
 
+    def request_batch_pin(
+        self,
+        *,
+        devices: Sequence[str],
+        attempts_remaining: int,
+        parent: Tk | None = None,
+    ) -> PinPromptResult:
+        """Ask once for the PIN that unlocks every drive in ``devices``."""
+        if parent:
+            return self._request_with_parent(
+                parent,
+                drive_label=None,
+                attempts_remaining=attempts_remaining,
+                external_pin_provider=None,
+                devices=devices,
+            )
+        return self._request_standalone(
+            drive_label=None,
+            attempts_remaining=attempts_remaining,
+            external_pin_provider=None,
+            devices=devices,
+        )
+
     def _build_dialog(
         self,
         window: Tk | Toplevel,
@@ -56,6 +171,7 @@ class PinPrompt:
         attempts_remaining: int,
         external_pin_provider: Callable[[], str | None] | None,
         finish: Callable[[PinPromptResult], None],
+        devices: Sequence[str] = (),
     ) -> None:
         window.title("LockPort - USB Unlock")
         try:
@@ -65,8 +181,16 @@ class PinPrompt:
             pass
         window.resizable(False, False)
 
-        message = f"USB drive {drive_label or ''} locked. Enter PIN.".strip()
-        Label(window, text=message, padx=16, pady=12).pack(fill=BOTH)
+        if devices:
+            message = f"{len(devices)} USB drives locked. Enter PIN once to unlock them all."
+            Label(window, text=message, padx=16, pady=12).pack(fill=BOTH)
+            listing = Listbox(window, height=min(len(devices), 8), activestyle="none")
+            for label in devices:
+                listing.insert(END, label)
+            listing.pack(fill=BOTH, padx=16, pady=(0, 8))
+        else:
+            message = f"USB drive {drive_label or ''} locked. Enter PIN.".strip()
+            Label(window, text=message, padx=16, pady=12).pack(fill=BOTH)
         Label(window, text=f"Attempts remaining: {attempts_remaining}", padx=16).pack(fill=BOTH)
 
         pin_var = StringVar()
@@ -99,15 +223,19 @@ class PinPrompt:
         window.after(self.timeout_seconds * 1000, on_timeout)
 
         def poll_external() -> None:
-            if external_pin_provider:
-                external_value = external_pin_provider()
-                if external_value:
-                    pin_var.set(external_value)
-                    submit()
-                    return
+            # Only a caller-supplied provider needs polling; a plain prompt
+            # waits on keyboard and timer events alone.
+            if not external_pin_provider:
+                return
+            WAKEUPS.record("pin_prompt")
+            external_value = external_pin_provider()
+            if external_value:
+                pin_var.set(external_value)
+                submit()
+                return
             window.after(500, poll_external)
 
-        poll_external()
+        window.after(500, poll_external)
 
     def _request_with_parent(
         self,
@@ -116,6 +244,7 @@ class PinPrompt:
         drive_label: str | None,
         attempts_remaining: int,
         external_pin_provider: Callable[[], str | None] | None,
+        devices: Sequence[str] = (),
     ) -> PinPromptResult:
         immediate_pin = self._consume_external_pin(external_pin_provider)
         if immediate_pin:
@@ -137,6 +266,7 @@ class PinPrompt:
             attempts_remaining=attempts_remaining,
             external_pin_provider=external_pin_provider,
             finish=finish,
+            devices=devices,
         )
         parent.wait_window(dialog)
         return result_holder[0] if result_holder else PinPromptResult(pin=None, cancelled=True)
@@ -147,38 +277,49 @@ class PinPrompt:
         drive_label: str | None,
         attempts_remaining: int,
         external_pin_provider: Callable[[], str | None] | None,
+        devices: Sequence[str] = (),
     ) -> PinPromptResult:
         immediate_pin = self._consume_external_pin(external_pin_provider)
         if immediate_pin:
             return PinPromptResult(pin=immediate_pin, cancelled=False)
 
         result_queue: "queue.Queue[PinPromptResult]" = queue.Queue(maxsize=1)
+        dialogs: list[Toplevel] = []
 
-        def _show() -> None:
-            root = Tk()
+        def _show(root: Tk) -> None:
+            dialog = Toplevel(root)
+            dialogs.append(dialog)
 
             def finish(result: PinPromptResult) -> None:
                 if result_queue.empty():
                     result_queue.put(result)
-                root.destroy()
+                dialog.destroy()
 
             self._build_dialog(
-                root,
+                dialog,
                 drive_label=drive_label,
                 attempts_remaining=attempts_remaining,
                 external_pin_provider=external_pin_provider,
                 finish=finish,
+                devices=devices,
             )
-            root.mainloop()
 
-        thread = threading.Thread(target=_show, daemon=True)
-        thread.start()
+        host = self.host or PromptHost.shared()
+        try:
+            host.call(_show)
+        except RuntimeError as exc:
+            LOGGER.error("PIN prompt unavailable: %s", exc)
+            return PinPromptResult(pin=None, cancelled=True)
         try:
             return result_queue.get(timeout=self.timeout_seconds + 5)
         except queue.Empty:
+            # The dialog's own timer should have fired; make sure it is gone.
+            for dialog in dialogs:
+                try:
+                    host.call(lambda _root, dialog=dialog: dialog.winfo_exists() and dialog.destroy())  # type: ignore[misc]
+                except RuntimeError as exc:  # host died or is shutting down
+                    LOGGER.warning("Could not close timed-out PIN prompt: %s", exc)
             return PinPromptResult(pin=None, cancelled=True)
-        finally:
-            thread.join(timeout=1)
 
     @staticmethod
     def _consume_external_pin(
@@ -9,7 +9,9 @@ import time
 from dataclasses import dataclass
 from typing import Any, Dict, cast
 
+from .audit import audit
 from .config import DEFAULT_CONFIG, LockPortConfig
+from .metrics import PIN_FAILURES, PIN_LOCKOUTS
 
 try:
     import hashlib
@@ -108,6 +110,7 @@ class PinManager:
         data = self._read()
         now = time.time()
         if data.get("lock_until", 0) > now:
+            audit("pin_attempt", outcome="locked_out")
             raise PinLockedError("PIN entry temporarily locked")
 
         record = PinStoreRecord(**data["pin"])
@@ -117,10 +120,15 @@ class PinManager:
             data["updated_at"] = now
             self._write(data)
             self._cache_last_pin(candidate)
+            audit("pin_attempt", outcome="success")
             return True
 
+        PIN_FAILURES.inc()
         data["failed_attempts"] = data.get("failed_attempts", 0) + 1
+        audit("pin_attempt", outcome="invalid", failed_attempts=data["failed_attempts"])
         if data["failed_attempts"] >= self.config.pin_attempt_limit:
+            PIN_LOCKOUTS.inc()
+            audit("pin_lockout", seconds=self.config.pin_lockout_seconds)
             data["lock_until"] = now + self.config.pin_lockout_seconds
             data["failed_attempts"] = 0
         self._write(data)
@@ -0,0 +1,83 @@
+"""Presence tracking that decides whether a device action is worth running."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .device_locker import DeviceActionResult
+from .usb_monitor import USBEvent
+
+
+@dataclass(slots=True)
+class DevicePresence:
+    present: Optional[bool] = None  # None until the first event or result
+    lock_on_arrival: bool = False
+    changed_at: float = field(default_factory=time.monotonic)
+
+
+class ActionPlanner:
+    """Remembers which devices are attached, based on monitor events and action results.
+
+    Disabling a device that was just unplugged always fails with
+    DeviceNotFound. It still costs a PowerShell and a pnputil process.
+    When the planner knows a device is absent, it records a
+    "lock on next arrival" intent instead. The next arrival then locks
+    the device even if it would normally be preserved.
+    """
+
+    def __init__(self) -> None:
+        self._devices: Dict[str, DevicePresence] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event: USBEvent) -> None:
+        """Update presence from a monitor event, in the order the monitor saw it."""
+        if not event.instance_id:
+            return
+        if event.event_type == "arrival":
+            self._set(event.instance_id, present=True)
+        elif event.event_type == "removal":
+            self._set(event.instance_id, present=False, lock_on_arrival=True)
+
+    def note_result(self, result: DeviceActionResult) -> None:
+        """Mark the device absent if ``result`` says it was not found."""
+        if result.is_device_missing():
+            self._set(result.instance_id, present=False, lock_on_arrival=True)
+
+    def is_absent(self, instance_id: str) -> bool:
+        """True only when the device is known to be gone; unknown counts as present."""
+        with self._lock:
+            presence = self._devices.get(instance_id)
+            return presence is not None and presence.present is False
+
+    def defer_lock(self, instance_id: str) -> DeviceActionResult:
+        """Record a lock intent for an absent device; returns a device-missing result."""
+        self._set(instance_id, present=False, lock_on_arrival=True)
+        return DeviceActionResult(instance_id, False, "DeviceNotFound: lock deferred until the device reconnects")
+
+    def request_lock(self, instance_id: str) -> None:
+        """Force the next arrival of ``instance_id`` to lock, without changing presence."""
+        with self._lock:
+            self._devices.setdefault(instance_id, DevicePresence()).lock_on_arrival = True
+
+    def take_lock_intent(self, instance_id: str) -> bool:
+        """Consume and return the lock-on-arrival intent for ``instance_id``."""
+        with self._lock:
+            presence = self._devices.get(instance_id)
+            if presence is None or not presence.lock_on_arrival:
+                return False
+            presence.lock_on_arrival = False
+            return True
+
+    def pending_intents(self) -> List[str]:
+        with self._lock:
+            return sorted(key for key, presence in self._devices.items() if presence.lock_on_arrival)
+
+    def _set(self, instance_id: str, *, present: bool, lock_on_arrival: bool | None = None) -> None:
+        with self._lock:
+            presence = self._devices.setdefault(instance_id, DevicePresence())
+            presence.present = present
+            presence.changed_at = time.monotonic()
+            if lock_on_arrival is not None:
+                presence.lock_on_arrival = lock_on_arrival
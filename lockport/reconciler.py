@@ -0,0 +1,117 @@
+"""Periodic sweep that compares actual PnP status with the stored device states."""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Mapping
+
+from .device_locker import DEVICE_ABSENT, DEVICE_DISABLED, DEVICE_ENABLED, DeviceLocker
+from .device_state import DeviceState, DeviceStateStore
+from .metrics import RECONCILE_CORRECTIONS
+from .wakeups import WAKEUPS
+
+logger = logging.getLogger("lockport.reconciler")
+
+
+@dataclass(slots=True)
+class Correction:
+    state: DeviceState
+    action: str  # "lock" re-disables the device, "record" only fixes the stored status
+    status: str
+    reason: str
+
+
+def plan_corrections(
+    states: Iterable[DeviceState], actual: Mapping[str, str]
+) -> List[Correction]:
+    """Diff stored states against ``actual`` (instance id -> enabled/disabled/absent).
+
+    The sweep never enables a device. An unexpectedly enabled device is
+    locked again. Anything else only corrects the stored status. A "failed"
+    device that is still enabled is left to the circuit breaker's retry
+    timer; one found disabled or absent is recorded as such.
+    """
+    corrections: List[Correction] = []
+    for state in states:
+        observed = actual.get(state.instance_id)
+        if observed == DEVICE_ABSENT and state.status != "removed":
+            corrections.append(Correction(state, "record", "removed", "device is not present"))
+        elif observed == DEVICE_DISABLED and state.status != "locked":
+            corrections.append(Correction(state, "record", "locked", "device is disabled"))
+        elif observed == DEVICE_ENABLED and state.status in {"locked", "removed"}:
+            corrections.append(Correction(state, "lock", "locked", f"device is enabled but stored as {state.status}"))
+    return corrections
+
+
+class Reconciler:
+    """Runs a batched status sweep every ``interval_seconds`` on a background thread.
+
+    Each batch of at most ``batch_size`` tracked devices costs one PowerShell
+    process. Corrections are passed to ``apply``, which queues the actual
+    work on the service's normal path.
+    """
+
+    def __init__(
+        self,
+        store: DeviceStateStore,
+        locker: DeviceLocker,
+        apply: Callable[[Correction], None],
+        *,
+        interval_seconds: float,
+        batch_size: int,
+        should_run: Callable[[], bool] = lambda: True,
+    ) -> None:
+        self.store = store
+        self.locker = locker
+        self.apply = apply
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.should_run = should_run
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="LockPortReconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def sweep(self) -> List[Correction]:
+        """Query every tracked device once and apply the resulting corrections."""
+        states = self.store.list_states()
+        applied: List[Correction] = []
+        for offset in range(0, len(states), self.batch_size):
+            batch = states[offset : offset + self.batch_size]
+            actual = self.locker.query_status([state.instance_id for state in batch])
+            if actual is None:
+                continue
+            for correction in plan_corrections(batch, actual):
+                logger.info(
+                    "Reconciling %s: %s -> %s (%s)",
+                    correction.state.instance_id,
+                    correction.state.status,
+                    correction.status,
+                    correction.reason,
+                )
+                RECONCILE_CORRECTIONS.labels(correction.action).inc()
+                self.apply(correction)
+                applied.append(correction)
+        return applied
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            WAKEUPS.record("reconciler")
+            if not self.should_run():
+                continue
+            try:
+                self.sweep()
+            except Exception:  # pragma: no cover - keep the sweep thread alive
+                logger.exception("Reconciliation sweep failed")
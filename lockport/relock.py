@@ -0,0 +1,128 @@
+"""Persisted "unlock for N minutes" deadlines, fired from a TimerQueue."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from .timers import TimerHandle, TimerQueue
+
+logger = logging.getLogger("lockport.relock")
+
+
+class RelockScheduler:
+    """Tracks when each temporarily unlocked device must be locked again.
+
+    Deadlines are wall-clock times, so they survive a restart. load()
+    re-arms them, and any deadline that passed while LockPort was down
+    fires at once. Each deadline is one entry in the shared TimerQueue
+    heap: O(log n) to schedule and O(1) to cancel. With no deadline due,
+    the timer thread stays asleep. ``fire`` runs on the timer thread and
+    should only queue the lock.
+
+    The file is shared by every LockPort process, so only the device owner
+    may touch it: while ``should_run()`` is False nothing is fired or
+    written, and the owner calls load() when it acquires the lease.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        timers: TimerQueue,
+        fire: Callable[[str], None],
+        *,
+        clock: Callable[[], float] = time.time,
+        should_run: Callable[[], bool] = lambda: True,
+    ) -> None:
+        self.path = path
+        self._timers = timers
+        self._fire_callback = fire
+        self._clock = clock
+        self._should_run = should_run
+        self._deadlines: Dict[str, float] = {}
+        self._handles: Dict[str, TimerHandle] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """Re-arm persisted deadlines and return how many were loaded."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return 0
+        if not isinstance(data, dict):
+            return 0
+        loaded = 0
+        with self._lock:
+            for instance_id, deadline in data.items():
+                try:
+                    self._arm(str(instance_id), float(deadline))
+                except (TypeError, ValueError):
+                    continue
+                loaded += 1
+        if loaded:
+            logger.info("Restored %s relock deadlines", loaded)
+        return loaded
+
+    def schedule(self, instance_id: str, seconds: float) -> float:
+        """Relock ``instance_id`` after ``seconds``; replaces any earlier deadline."""
+        deadline = self._clock() + max(0.0, seconds)
+        with self._lock:
+            self._arm(instance_id, deadline)
+            self._persist()
+        logger.info("Device %s will relock in %.0fs", instance_id, seconds)
+        return deadline
+
+    def cancel(self, instance_id: str) -> bool:
+        with self._lock:
+            handle = self._handles.pop(instance_id, None)
+            if handle is None:
+                return False
+            handle.cancel()
+            self._deadlines.pop(instance_id, None)
+            self._persist()
+        return True
+
+    def release(self) -> None:
+        """Forget in-memory deadlines without touching the file (ownership lost)."""
+        with self._lock:
+            for handle in self._handles.values():
+                handle.cancel()
+            self._handles.clear()
+            self._deadlines.clear()
+
+    def deadlines(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._deadlines)
+
+    def _arm(self, instance_id: str, deadline: float) -> None:
+        previous = self._handles.pop(instance_id, None)
+        if previous is not None:
+            previous.cancel()
+        self._deadlines[instance_id] = deadline
+        delay = deadline - self._clock()
+        self._handles[instance_id] = self._timers.call_later(
+            delay, lambda: self._fire(instance_id, deadline)
+        )
+
+    def _fire(self, instance_id: str, deadline: float) -> None:
+        with self._lock:
+            if self._deadlines.get(instance_id) != deadline:
+                return  # rescheduled or cancelled after this timer was armed
+            if not self._should_run():
+                return  # the owner process fires (and persists) this deadline
+            self._deadlines.pop(instance_id, None)
+            self._handles.pop(instance_id, None)
+            self._persist()
+        logger.info("Relock deadline reached for %s", instance_id)
+        self._fire_callback(instance_id)
+
+    def _persist(self) -> None:
+        if not self._should_run():
+            return
+        try:
+            self.path.write_text(json.dumps(self._deadlines, indent=2, sort_keys=True))
+        except OSError as exc:
+            logger.warning("Could not persist relock deadlines: %s", exc)
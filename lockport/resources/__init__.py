@@ -1,23 +1,169 @@
 """LockPort package assets (icons, imagery, etc.)."""
 from __future__ import annotations
 
+import base64
+import functools
+import hashlib
+import logging
+import os
+import threading
 from contextlib import contextmanager
 from importlib import resources
+from io import BytesIO
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger("lockport.resources")
+
+# Bump when a renderer's output changes so stale cache files are not reused.
+CACHE_FORMAT = 1
 
 
 def _resource(name: str) -> resources.abc.Traversable:
     return resources.files(__name__).joinpath(name)
 
 
+@functools.lru_cache(maxsize=None)
 def load_asset_bytes(name: str) -> bytes:
-    """Return the raw bytes for a packaged resource."""
+    """Return the raw bytes for a packaged resource (read once per process)."""
     return _resource(name).read_bytes()
 
 
+@functools.lru_cache(maxsize=None)
+def asset_digest(name: str) -> str:
+    """Content hash of a packaged resource, used to key cached derivatives."""
+    return hashlib.sha256(load_asset_bytes(name)).hexdigest()
+
+
 @contextmanager
 def asset_path(name: str) -> Iterator[Path]:
     """Expose a resource on disk (e.g., for tooling that needs a path)."""
     with resources.as_file(_resource(name)) as path:
         yield Path(path)
+
+
+def resize_png(source: bytes, size: int) -> bytes:
+    """Decode ``source`` and return a ``size``×``size`` RGBA PNG (needs Pillow)."""
+    from PIL import Image
+
+    image = Image.open(BytesIO(source)).convert("RGBA")
+    if image.size != (size, size):
+        image = image.resize((size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class AssetCache:
+    """Memoized, size-keyed asset derivatives with a persistent disk copy.
+
+    Each derivative (a resized PNG, a badge variant, ...) is stored as
+    ``<stem>-<variant>-v<format>-<hash>.<suffix>``. The hash covers the source
+    bytes, so an updated asset never reuses a stale file, and files left
+    over from older assets are pruned when a new one is written. After
+    the first run, start-up only reads small files back. If the directory
+    cannot be written, the cache degrades to in-memory memoization.
+    """
+
+    def __init__(self, directory: Optional[Path]) -> None:
+        self.directory = directory
+        self._memory: Dict[Tuple[str, str], bytes] = {}
+        self._encoded: Dict[Tuple[str, Optional[int]], str] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, name: str, variant: str, render: Callable[[bytes], bytes]) -> bytes:
+        """Return ``render(asset bytes)``, computing it at most once per content hash."""
+        key = (name, variant)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+        path = self._variant_path(name, variant)
+        data = self._read(path)
+        if data is None:
+            data = render(load_asset_bytes(name))
+            self._write(path, data)
+        with self._lock:
+            self._memory[key] = data
+        return data
+
+    def png(self, name: str, size: Optional[int] = None) -> bytes:
+        """PNG bytes of ``name`` at ``size`` px; the original when no size is given.
+
+        Without Pillow the original bytes are returned unchanged.
+        """
+        if size is None:
+            return load_asset_bytes(name)
+        try:
+            return self.variant(name, f"{size}px", lambda source: resize_png(source, size))
+        except ImportError:
+            return load_asset_bytes(name)
+
+    def tk_photo_data(self, name: str, size: Optional[int] = None) -> str:
+        """Base64 text ready for ``tk.PhotoImage(data=...)``."""
+        key = (name, size)
+        with self._lock:
+            encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = base64.b64encode(self.png(name, size)).decode("ascii")
+            with self._lock:
+                self._encoded[key] = encoded
+        return encoded
+
+    def file(self, name: str) -> Path:
+        """Stable on-disk path for ``name``; extracted into the cache only when needed."""
+        resource = _resource(name)
+        if isinstance(resource, Path) and resource.is_file():
+            return resource
+        path = self._variant_path(name, "file")
+        if path is None:
+            raise FileNotFoundError(name)
+        if not path.is_file():
+            self._write(path, load_asset_bytes(name))
+        return path
+
+    def _variant_path(self, name: str, variant: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        stem, _, suffix = name.rpartition(".")
+        digest = asset_digest(name)[:16]
+        return self.directory / f"{stem}-{variant}-v{CACHE_FORMAT}-{digest}.{suffix}"
+
+    @staticmethod
+    def _read(path: Optional[Path]) -> Optional[bytes]:
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, path: Optional[Path], data: bytes) -> None:
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        except OSError as exc:
+            logger.debug("Could not write asset cache %s: %s", path, exc)
+            return
+        self._prune(path)
+
+    @staticmethod
+    def _prune(current: Path) -> None:
+        # Drop files for the same variant that were keyed by an older asset hash.
+        prefix = current.name.rsplit("-", 1)[0] + "-"
+        for stale in current.parent.glob(f"{prefix}*{current.suffix}"):
+            if stale != current:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+
+@functools.lru_cache(maxsize=None)
+def asset_cache(directory: Optional[Path] = None) -> AssetCache:
+    """Shared cache for ``directory`` (one instance per directory per process)."""
+    return AssetCache(directory)
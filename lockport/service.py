@@ -1,17 +1,40 @@
 """Main orchestration logic for the LockPort background service."""
 from __future__ import annotations
 
+import math
+import os
 import queue
 import threading
 import time
 from threading import Event, Lock
-from typing import List, Set
+from typing import Any, Callable, Dict, List, Sequence, Set
 
+from .attachments import AttachmentStore
+from .audit import audit
+from .circuit_breaker import DeviceCircuitBreaker
 from .config import DEFAULT_CONFIG, LockPortConfig
-from .device_locker import DeviceLocker
-from .device_state import DeviceStateStore
-from .logging_setup import configure_logging
-from .usb_monitor import USBEvent, USBMonitor
+from .device_locker import DeviceActionResult, DeviceLocker
+from .device_state import DeviceState, DeviceStateStore
+from .election import OwnershipLease
+from .ipc import IPCServer, service_address
+from .latency import LatencyStats
+from .logging_setup import configure_logging, flush_logging
+from .metrics import (
+    DEVICE_ACTIONS_SKIPPED,
+    EVENTS,
+    EVENTS_DROPPED,
+    QUEUE_DEPTH,
+    WORKER_BUSY_SECONDS,
+    WORKERS,
+    MetricsServer,
+)
+from .pin_store import PinLockedError, PinManager, PinValidationError
+from .planner import ActionPlanner
+from .reconciler import Correction, Reconciler
+from .relock import RelockScheduler
+from .timers import TimerHandle, TimerQueue
+from .usb_monitor import DeviceMonitor, MonitorFactory, USBEvent, USBMonitor
+from .wakeups import WAKEUPS
 
 
 class LockPortService:
@@ -24,25 +47,71 @@ class LockPortService:
         config: LockPortConfig | None = None,
         *,
         console_log: bool | None = None,
+        role: str = "service",
+        device_locker: DeviceLocker | None = None,
+        monitor_factory: MonitorFactory | None = None,
     ) -> None:
         self.config = config or DEFAULT_CONFIG
-        self.logger = configure_logging(force_console=console_log)
-        self.device_locker = DeviceLocker()
+        self.logger = configure_logging(force_console=console_log, config=self.config)
+        self.device_locker = device_locker or DeviceLocker()
+        self._monitor_factory: MonitorFactory = monitor_factory or self._create_usb_monitor
+        self.pin_manager = PinManager(self.config)
         self._active_devices: Set[str] = set()
         self._active_lock = Lock()
-        self._monitor: USBMonitor | None = None
+        self._monitor: DeviceMonitor | None = None
         self._stop_event = Event()
         self._device_state_store = DeviceStateStore(self.config)
-        self._event_queue: "queue.Queue[USBEvent]" = queue.Queue(maxsize=64)
+        self._event_queue: "queue.Queue[USBEvent]" = queue.Queue(
+            maxsize=self.config.event_queue_size
+        )
         self._workers: List[threading.Thread] = []
-        self._worker_count = 2
+        self._worker_count = max(1, self.config.worker_count)
+        self.latency = LatencyStats(
+            self.config.latency_stats_location,
+            window_seconds=self.config.latency_window_seconds,
+            persist_seconds=self.config.latency_persist_seconds,
+        )
+        self._metrics_server: MetricsServer | None = None
+        self._ipc_server: IPCServer | None = None
+        self._started_at: float | None = None
+        self._lease = OwnershipLease(
+            self.config, role=role, on_change=self._on_ownership_change
+        )
+        self._timers = TimerQueue()
+        self._breaker = DeviceCircuitBreaker(
+            base_seconds=self.config.breaker_base_seconds,
+            max_seconds=self.config.breaker_max_seconds,
+            jitter=self.config.breaker_jitter,
+        )
+        self._retry_handles: Dict[str, TimerHandle] = {}
+        self._planner = ActionPlanner()
+        self._relock = RelockScheduler(
+            self.config.relock_state_location,
+            self._timers,
+            self._fire_relock,
+            should_run=lambda: self.is_owner,
+        )
+        self._reconciler = Reconciler(
+            self._device_state_store,
+            self.device_locker,
+            self._apply_correction,
+            interval_seconds=self.config.reconcile_interval_seconds,
+            batch_size=self.config.reconcile_batch_size,
+            should_run=lambda: self.is_owner,
+        )
+        WORKERS.set(self._worker_count)
+        QUEUE_DEPTH.set_function(self._event_queue.qsize)
 
     def start(self) -> None:
+        self._started_at = self._started_at or time.time()
+        self._start_metrics_server()
+        self._lease.start()
         if not self._workers:
             self._start_workers()
+        self._reconciler.start()
         if self._monitor is None:
-            self._monitor = USBMonitor(
-                self._handle_usb_event, self.config.monitor_poll_seconds
+            self._monitor = self._monitor_factory(
+                self._handle_usb_event, self.config.monitor_wait_seconds
             )
         self._monitor.start()
         self.logger.info("LockPort service started")
@@ -58,11 +127,244 @@ class LockPortService:
             self.stop()
 
     def stop(self) -> None:
+        if self._stop_event.is_set():
+            return  # e.g. main()'s finally after a signal already stopped us
         self.logger.info("Stopping LockPort service")
         self._stop_event.set()
         if self._monitor:
             self._monitor.stop()
+        self._reconciler.stop()
+        self._timers.stop()
         self._shutdown_workers()
+        self._release_resources()
+
+    def _release_resources(self) -> None:
+        # Shared tail of stop() for both cores, once no event is in flight.
+        # Observers never record latency; persisting would blank the owner's file.
+        if self.is_owner:
+            self.latency.persist()
+        self._stop_metrics_server()
+        self._lease.stop()
+        flush_logging()
+
+    def _create_usb_monitor(
+        self, callback: Callable[[USBEvent], None], poll_seconds: float | None
+    ) -> DeviceMonitor:
+        # Only the service persists the drive map; the window and tests start cold.
+        attachments = AttachmentStore(self.config.attachment_state_location)
+        return USBMonitor(callback, poll_seconds, attachments=attachments)
+
+    @property
+    def is_owner(self) -> bool:
+        """True when this process holds the lease to act on devices."""
+        return self._lease.is_owner
+
+    def _on_ownership_change(self, owner: bool) -> None:
+        # Only the owner answers IPC so clients always reach the acting process,
+        # and only the owner restores and persists unlock sessions.
+        if owner:
+            self._start_ipc_server()
+            self._relock.load()
+        else:
+            self._stop_ipc_server()
+            self._relock.release()
+
+    def _start_metrics_server(self) -> None:
+        if self._metrics_server is not None:
+            return
+        port = self.config.metrics_port
+        socket_path = self.config.metrics_socket_location
+        if port is None and socket_path is None:
+            return
+        try:
+            self._metrics_server = MetricsServer(port=port, socket_path=socket_path)
+        except (OSError, RuntimeError) as err:
+            self.logger.error("Failed to start metrics endpoint: %s", err)
+            return
+        self._metrics_server.start()
+
+    def _stop_metrics_server(self) -> None:
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+            self._metrics_server = None
+
+    def device_counts(self) -> Dict[str, int]:
+        """Number of tracked devices per status (locked, unlocked, failed, ...)."""
+        if not self.is_owner:
+            # Another process writes the store; pick up its changes first.
+            self._device_state_store.reload()
+        counts: Dict[str, int] = {}
+        for state in self._device_state_store.list_states():
+            counts[state.status] = counts.get(state.status, 0) + 1
+        return counts
+
+    def status(self) -> Dict[str, Any]:
+        """Summarise the running service for the CLI and IPC clients."""
+        counts = self.device_counts()
+        return {
+            "pid": os.getpid(),
+            "core": "threads",
+            "is_owner": self.is_owner,
+            "owner": self._lease.owner_info(),
+            "started_at": self._started_at,
+            "workers": self._worker_count,
+            "queue_depth": self._event_queue.qsize(),
+            "retries_pending": len(self._retry_handles),
+            "lock_on_arrival": len(self._planner.pending_intents()),
+            "relocks_pending": len(self._relock.deadlines()),
+            "wakeups_per_minute": WAKEUPS.per_minute(),
+            "devices": counts,
+            "pin": self.pin_manager.get_status(),
+        }
+
+    def subscribe_states(self, listener: Callable[[DeviceState], None]) -> Callable[[], None]:
+        """Register an in-process listener for device state changes."""
+        return self._device_state_store.subscribe(listener)
+
+    def lock_device(self, instance_id: str) -> DeviceActionResult:
+        """Disable a device on behalf of a client and record the new state."""
+        self._relock.cancel(instance_id)
+        state = self._device_state_store.get(instance_id)
+        if self._planner.is_absent(instance_id):
+            DEVICE_ACTIONS_SKIPPED.labels("disable").inc()
+            return self._planner.defer_lock(instance_id)
+        result = self.device_locker.disable(instance_id)
+        self._planner.note_result(result)
+        if result.success:
+            self._record_device_state(
+                instance_id,
+                drive=state.drive if state else None,
+                volume=state.volume if state else None,
+                status="locked",
+            )
+        return result
+
+    def unlock_device(
+        self, instance_id: str, pin: str, *, relock_minutes: float | None = None
+    ) -> DeviceActionResult:
+        """Verify ``pin`` and enable a device; raises the PinManager errors.
+
+        With ``relock_minutes`` the device is locked again once that time
+        has passed; None uses ``config.default_relock_minutes``.
+        """
+        self.pin_manager.verify_pin(pin)
+        return self._record_unlock(self.device_locker.enable(instance_id), relock_minutes)
+
+    def unlock_devices(
+        self, instance_ids: Sequence[str], pin: str, *, relock_minutes: float | None = None
+    ) -> List[DeviceActionResult]:
+        """Verify ``pin`` once, then enable every device in parallel."""
+        self.pin_manager.verify_pin(pin)
+        results = self.device_locker.enable_many(
+            instance_ids, max_workers=self.config.window_action_workers
+        )
+        return [self._record_unlock(result, relock_minutes) for result in results]
+
+    def _record_unlock(
+        self, result: DeviceActionResult, relock_minutes: float | None
+    ) -> DeviceActionResult:
+        self._planner.note_result(result)
+        if relock_minutes is None:
+            relock_minutes = self.config.default_relock_minutes
+        if result.success and relock_minutes > 0:
+            self._relock.schedule(result.instance_id, relock_minutes * 60.0)
+        else:
+            self._relock.cancel(result.instance_id)
+        if result.success or result.is_device_missing():
+            state = self._device_state_store.get(result.instance_id)
+            self._record_device_state(
+                result.instance_id,
+                drive=state.drive if state else None,
+                volume=state.volume if state else None,
+                status="unlocked" if result.success else "removed",
+            )
+        return result
+
+    def _start_ipc_server(self) -> None:
+        if not self.config.ipc_enabled or self._ipc_server is not None:
+            return
+        server = IPCServer(
+            service_address(self.config),
+            self._handle_ipc_request,
+            self._subscribe_ipc,
+        )
+        try:
+            server.start()
+        except OSError as err:
+            self.logger.warning("IPC channel unavailable: %s", err)
+            return
+        self._ipc_server = server
+
+    def _stop_ipc_server(self) -> None:
+        if self._ipc_server is not None:
+            self._ipc_server.stop()
+            self._ipc_server = None
+
+    def _subscribe_ipc(self, push: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        return self.subscribe_states(
+            lambda state: push({"event": "state", "state": state.to_dict()})
+        )
+
+    def _handle_ipc_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        command = request.get("cmd")
+        if command == "list":
+            states = self._device_state_store.list_states()
+            return {"ok": True, "states": [state.to_dict() for state in states]}
+        if command == "status":
+            return {"ok": True, **self.status()}
+        instance_id = str(request.get("instance_id") or "")
+        if command == "lock":
+            self.logger.info("Lock requested over IPC for %s", instance_id)
+            return self._action_payload(self.lock_device(instance_id))
+        try:
+            relock_minutes = self._parse_relock_minutes(request.get("relock_minutes"))
+        except ValueError as exc:
+            return {"ok": False, "error": "bad_request", "message": str(exc)}
+        if command == "unlock":
+            self.logger.info("Unlock requested over IPC for %s", instance_id)
+            try:
+                result = self.unlock_device(
+                    instance_id, str(request.get("pin") or ""), relock_minutes=relock_minutes
+                )
+            except PinLockedError as exc:
+                return {"ok": False, "error": "pin_locked", "message": str(exc)}
+            except PinValidationError as exc:
+                return {"ok": False, "error": "invalid_pin", "message": str(exc)}
+            return self._action_payload(result)
+        if command == "unlock_many":
+            instance_ids = [str(value) for value in request.get("instance_ids") or []]
+            self.logger.info("Batch unlock requested over IPC for %s devices", len(instance_ids))
+            try:
+                results = self.unlock_devices(
+                    instance_ids, str(request.get("pin") or ""), relock_minutes=relock_minutes
+                )
+            except PinLockedError as exc:
+                return {"ok": False, "error": "pin_locked", "message": str(exc)}
+            except PinValidationError as exc:
+                return {"ok": False, "error": "invalid_pin", "message": str(exc)}
+            return {"ok": True, "results": [self._action_payload(result) for result in results]}
+        return {"ok": False, "error": "unknown_command", "message": f"Unknown command: {command}"}
+
+    @staticmethod
+    def _parse_relock_minutes(value: Any) -> float | None:
+        if value is None:
+            return None
+        try:
+            minutes = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"relock_minutes must be a number, got {value!r}") from None
+        if not math.isfinite(minutes) or minutes < 0:
+            raise ValueError(f"relock_minutes must be zero or more, got {value!r}")
+        return minutes
+
+    @staticmethod
+    def _action_payload(result: DeviceActionResult) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "success": result.success,
+            "message": result.message,
+            "missing": result.is_device_missing(),
+        }
 
     def _start_workers(self) -> None:
         for idx in range(self._worker_count):
@@ -91,17 +393,32 @@ class LockPortService:
         self._workers.clear()
 
     def _handle_usb_event(self, event: USBEvent) -> None:
+        EVENTS.labels(event.event_type).inc()
+        audit(
+            "usb_event",
+            instance_id=event.instance_id,
+            type=event.event_type,
+            drive=event.drive_letter,
+            volume=event.volume_name,
+            synthetic=event.synthetic,
+        )
+        self._planner.observe(event)
+        self._submit(event)
+
+    def _submit(self, event: USBEvent) -> None:
         try:
             self._event_queue.put_nowait(event)
         except queue.Full:
+            EVENTS_DROPPED.inc()
             self.logger.warning("USB event queue full; dropping event: %s", event)
 
     def _worker_loop(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                event = self._event_queue.get(timeout=0.5)
-            except queue.Empty:
-                continue
+        # Block until an event or the __stop__ sentinel arrives; an idle worker
+        # never wakes on its own.
+        while True:
+            event = self._event_queue.get()
+            WAKEUPS.record("worker")
+            event.dequeued_at = time.monotonic()
 
             if event.event_type == "__stop__":
                 self._event_queue.task_done()
@@ -110,70 +427,231 @@ class LockPortService:
             try:
                 self._process_event(event)
             finally:
+                WORKER_BUSY_SECONDS.inc(time.monotonic() - event.dequeued_at)
                 self._event_queue.task_done()
 
     def _process_event(self, event: USBEvent) -> None:
-        if not event.instance_id:
-            self.logger.warning("Skipping device without instance ID: %s", event)
+        if not self._admit(event):
             return
+        try:
+            self._process_usb_event(event)
+        finally:
+            self._release_device(event.instance_id)
+
+    def _admit(self, event: USBEvent) -> bool:
+        """Run the checks both cores share before locking; True means lock now.
+
+        Removals and absent devices are fully handled here. A True result
+        has claimed the device, so the caller must _release_device() it.
+        """
+        if not self._should_act(event):
+            return False
         if event.event_type == "removal":
             self._handle_usb_removal(event)
-            return
+            return False
+        if self._planner.is_absent(event.instance_id):
+            self._defer_lock(event)
+            return False
+        if not self._should_lock(event):
+            return False
+        return self._claim_device(event.instance_id)
+
+    def _should_act(self, event: USBEvent) -> bool:
+        if not event.instance_id:
+            self.logger.warning("Skipping device without instance ID: %s", event)
+            return False
+        if not self.is_owner:
+            self.logger.info(
+                "Observed USB %s for %s; another process owns device actions",
+                event.event_type,
+                event.instance_id,
+            )
+            return False
+        return True
 
+    def _should_lock(self, event: USBEvent) -> bool:
+        if self._planner.take_lock_intent(event.instance_id):
+            self.logger.info("Device %s returned; applying deferred lock", event.instance_id)
+        elif self._should_preserve_unlock(event):
+            return False
+        if not self._breaker.allow(event.instance_id):
+            self.logger.info(
+                "Skipping %s; circuit open after %s failures, retry in %.1fs",
+                event.instance_id,
+                self._breaker.failures(event.instance_id),
+                self._breaker.retry_in(event.instance_id),
+            )
+            return False
+        return True
+
+    def _should_preserve_unlock(self, event: USBEvent) -> bool:
         state = self._device_state_store.get(event.instance_id)
-        if state and state.status == "unlocked":
-            elapsed = time.time() - state.updated_at
-            if elapsed < self.RECENT_UNLOCK_SECONDS:
-                self.logger.info(
-                    "Skipping re-lock for %s; unlocked %.1fs ago",
-                    event.instance_id,
-                    elapsed,
-                )
-                return
-            if event.synthetic:
-                self.logger.info(
-                    "Synthetic arrival for %s detected; preserving unlocked state",
-                    event.instance_id,
-                )
-                return
+        if not state or state.status != "unlocked":
+            return False
+        elapsed = time.time() - state.updated_at
+        if elapsed < self.RECENT_UNLOCK_SECONDS:
+            self.logger.info(
+                "Skipping re-lock for %s; unlocked %.1fs ago",
+                event.instance_id,
+                elapsed,
+            )
+            return True
+        if event.synthetic:
+            self.logger.info(
+                "Synthetic arrival for %s detected; preserving unlocked state",
+                event.instance_id,
+            )
+            return True
+        return False
 
+    def _claim_device(self, instance_id: str) -> bool:
         with self._active_lock:
-            if event.instance_id in self._active_devices:
-                self.logger.info("Device %s already processing", event.instance_id)
-                return
-            self._active_devices.add(event.instance_id)
+            if instance_id in self._active_devices:
+                self.logger.info("Device %s already processing", instance_id)
+                return False
+            self._active_devices.add(instance_id)
+            return True
 
-        try:
-            self._process_usb_event(event)
-        finally:
-            with self._active_lock:
-                self._active_devices.discard(event.instance_id)
+    def _release_device(self, instance_id: str) -> None:
+        with self._active_lock:
+            self._active_devices.discard(instance_id)
 
     def _process_usb_event(self, event: USBEvent) -> None:
         self.logger.info("Locking device %s", event.instance_id)
         lock_result = self.device_locker.disable(event.instance_id)
+        self._finish_lock(event, lock_result)
+
+    def _finish_lock(self, event: USBEvent, lock_result: DeviceActionResult) -> None:
+        event.actioned_at = time.monotonic()
+        self._planner.note_result(lock_result)
+        missing = lock_result.is_device_missing()
+        if lock_result.success:
+            status = "locked"
+        else:
+            status = "removed" if missing else "failed"
         self._record_device_state(
             event.instance_id,
             drive=event.drive_letter,
             volume=event.volume_name,
-            status="locked",
+            status=status,
+        )
+        event.persisted_at = time.monotonic()
+        self.latency.record_event(event)
+        if lock_result.success:
+            self._cancel_retry(event.instance_id)
+            self._relock.cancel(event.instance_id)
+            self._breaker.record_success(event.instance_id)
+            return
+        if missing:
+            self.logger.info(
+                "Device %s disappeared before it could be locked; locking on next arrival",
+                event.instance_id,
+            )
+            return
+        delay = self._breaker.record_failure(event.instance_id)
+        self.logger.error(
+            "Failed to disable device %s: %s (retry %s in %.1fs)",
+            event.instance_id,
+            lock_result.message,
+            self._breaker.failures(event.instance_id),
+            delay,
+        )
+        self._schedule_retry(event, delay)
+
+    def _schedule_retry(self, event: USBEvent, delay: float) -> None:
+        retry = USBEvent(
+            instance_id=event.instance_id,
+            drive_letter=event.drive_letter,
+            volume_name=event.volume_name,
+            event_type="arrival",
         )
-        if not lock_result.success:
-            self.logger.error("Failed to disable device %s: %s", event.instance_id, lock_result.message)
+        handle = self._timers.call_later(delay, lambda: self._fire_retry(retry))
+        with self._active_lock:
+            previous = self._retry_handles.get(event.instance_id)
+            self._retry_handles[event.instance_id] = handle
+        if previous is not None:
+            previous.cancel()
+
+    def _fire_retry(self, event: USBEvent) -> None:
+        with self._active_lock:
+            self._retry_handles.pop(event.instance_id, None)
+        if self._planner.is_absent(event.instance_id):
+            self.logger.info("Dropping retry for %s; device is no longer attached", event.instance_id)
             return
+        self.logger.info("Retrying lock for %s after backoff", event.instance_id)
+        self._submit(event)
 
-    def _handle_usb_removal(self, event: USBEvent) -> None:
+    def _cancel_retry(self, instance_id: str) -> None:
         with self._active_lock:
-            self._active_devices.discard(event.instance_id)
+            handle = self._retry_handles.pop(instance_id, None)
+        if handle is not None:
+            handle.cancel()
 
-        self.logger.info("Device %s removed; locking associated port", event.instance_id)
-        result = self.device_locker.disable(event.instance_id)
-        if not result.success:
-            self.logger.warning(
-                "Failed to disable removed device %s: %s",
-                event.instance_id,
-                result.message,
+    def _handle_usb_removal(self, event: USBEvent) -> None:
+        # Disabling a device that is already gone only fails with DeviceNotFound;
+        # the planner holds a lock intent for the next arrival instead.
+        self._release_device(event.instance_id)
+        DEVICE_ACTIONS_SKIPPED.labels("disable").inc()
+        self.logger.info("Device %s removed; it will be locked when it reconnects", event.instance_id)
+        # A re-inserted device gets a fresh attempt instead of inheriting backoff.
+        self._cancel_retry(event.instance_id)
+        self._breaker.reset(event.instance_id)
+        # The removal already arms a lock for the next arrival.
+        self._relock.cancel(event.instance_id)
+        self._record_device_state(
+            event.instance_id,
+            drive=event.drive_letter,
+            volume=event.volume_name,
+            status="removed",
+        )
+
+    def _fire_relock(self, instance_id: str) -> None:
+        # Runs on the timer thread: only hand the lock to the worker path.
+        self._planner.request_lock(instance_id)
+        if self._planner.is_absent(instance_id):
+            self.logger.info("Relock due for absent %s; locking when it reconnects", instance_id)
+            return
+        state = self._device_state_store.get(instance_id)
+        self.logger.info("Unlock session for %s expired; relocking", instance_id)
+        self._submit(
+            USBEvent(
+                instance_id=instance_id,
+                drive_letter=(state.drive or None) if state else None,
+                volume_name=(state.volume or None) if state else None,
+                event_type="arrival",
+                synthetic=True,
+            )
+        )
+
+    def _apply_correction(self, correction: Correction) -> None:
+        state = correction.state
+        if correction.action == "lock":
+            event = USBEvent(
+                instance_id=state.instance_id,
+                drive_letter=state.drive or None,
+                volume_name=state.volume or None,
+                event_type="arrival",
+                synthetic=True,
             )
+            self._planner.observe(event)
+            self._submit(event)
+            return
+        if correction.status == "removed":
+            self._planner.defer_lock(state.instance_id)
+        self._record_device_state(
+            state.instance_id,
+            drive=state.drive or None,
+            volume=state.volume or None,
+            status=correction.status,
+        )
+
+    def _defer_lock(self, event: USBEvent) -> None:
+        DEVICE_ACTIONS_SKIPPED.labels("disable").inc()
+        self.logger.info(
+            "Device %s left before it could be locked; locking on next arrival",
+            event.instance_id,
+        )
+        self._planner.defer_lock(event.instance_id)
         self._record_device_state(
             event.instance_id,
             drive=event.drive_letter,
@@ -189,6 +667,7 @@ class LockPortService:
         volume: str | None,
         status: str,
     ) -> None:
+        audit("device_state", instance_id=instance_id, status=status, drive=drive, volume=volume)
         try:
             self._device_state_store.upsert(
                 instance_id=instance_id,
@@ -0,0 +1,13 @@
+"""Deterministic fakes and workloads for running LockPortService off Windows."""
+from __future__ import annotations
+
+from .fakes import SimulatedLocker, SimulatedMonitor
+from .workload import Workload, WorkloadEvent, run_workload
+
+__all__ = [
+    "SimulatedLocker",
+    "SimulatedMonitor",
+    "Workload",
+    "WorkloadEvent",
+    "run_workload",
+]
@@ -0,0 +1,116 @@
+"""Throughput benchmark for LockPortService using simulated devices.
+
+Run with ``python -m lockport.simulation.benchmark --workers 1 2 4``.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from ..async_service import AsyncLockPortService
+from ..config import LockPortConfig
+from ..service import LockPortService
+from .fakes import SimulatedLocker, SimulatedMonitor
+from .workload import Workload, run_workload
+
+
+def benchmark_once(
+    workload: Workload,
+    *,
+    workers: int,
+    latency_seconds: float,
+    jitter_seconds: float,
+    failure_rate: float,
+    seed: int,
+    use_asyncio: bool = False,
+) -> Dict[str, float]:
+    """Run ``workload`` against a fresh service and return throughput and latency figures."""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        data_dir = Path(tmp)
+        config = LockPortConfig(
+            pin_store_path=data_dir,
+            log_path=data_dir,
+            worker_count=workers,
+            event_queue_size=max(64, len(workload)),
+            pin_hash_iterations=1_000,
+            ipc_enabled=False,
+        )
+        locker = SimulatedLocker(
+            latency_seconds=latency_seconds,
+            jitter_seconds=jitter_seconds,
+            failure_rate=failure_rate,
+            seed=seed,
+        )
+        monitors: List[SimulatedMonitor] = []
+
+        def monitor_factory(callback, poll_seconds):  # type: ignore[no-untyped-def]
+            monitor = SimulatedMonitor(callback, poll_seconds)
+            monitors.append(monitor)
+            return monitor
+
+        service_cls = AsyncLockPortService if use_asyncio else LockPortService
+        service = service_cls(config, device_locker=locker, monitor_factory=monitor_factory)
+        service.start()
+        try:
+            result = run_workload(service, monitors[0], workload)
+        finally:
+            service.stop()
+        stages = service.latency.snapshot()["stages"]
+        result["workers"] = float(workers)
+        for stage in ("queue_wait", "end_to_end"):
+            summary = stages[stage]  # type: ignore[index]
+            for key in ("p50_ms", "p99_ms", "max_ms"):
+                result[f"{stage}_{key}"] = float(summary[key])
+        return result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark LockPortService with simulated USB devices")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--devices", type=int, default=200, help="Arrivals per run")
+    parser.add_argument("--removal-ratio", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None, help="Arrivals per second (default: one burst)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated device action seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random action seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--asyncio", action="store_true", help="Benchmark the asyncio core")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    workload = Workload.generate(
+        devices=args.devices,
+        removal_ratio=args.removal_ratio,
+        rate_per_second=args.rate,
+        seed=args.seed,
+    )
+    print(
+        f"{'workers':>7}{'events/s':>11}{'wait p50':>10}{'wait p99':>10}"
+        f"{'e2e p50':>10}{'e2e p99':>10}{'e2e max':>10}  (ms)"
+    )
+    for workers in args.workers:
+        result = benchmark_once(
+            workload,
+            workers=workers,
+            latency_seconds=args.latency,
+            jitter_seconds=args.jitter,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+            use_asyncio=args.asyncio,
+        )
+        flag = "" if result["completed"] else "  (timed out)"
+        print(
+            f"{workers:>7}{result['events_per_second']:>11.1f}"
+            f"{result['queue_wait_p50_ms']:>10.1f}{result['queue_wait_p99_ms']:>10.1f}"
+            f"{result['end_to_end_p50_ms']:>10.1f}{result['end_to_end_p99_ms']:>10.1f}"
+            f"{result['end_to_end_max_ms']:>10.1f}{flag}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Stand-ins for the WMI monitor and the PowerShell device locker."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..device_locker import (
+    DEVICE_ABSENT,
+    DEVICE_DISABLED,
+    DEVICE_ENABLED,
+    DeviceActionResult,
+    DeviceLocker,
+)
+from ..usb_monitor import USBEvent
+
+
+class SimulatedLocker(DeviceLocker):
+    """DeviceLocker that sleeps instead of spawning PowerShell.
+
+    Latency and failures are derived from a hash of (seed, instance id,
+    attempt number), so a run produces the same outcomes regardless of
+    which worker thread picks up which event.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_seconds: float = 0.05,
+        jitter_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        super().__init__()
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls: List[tuple[str, str]] = []
+        self.enabled: Dict[str, bool] = {}
+        self.present: Dict[str, bool] = {}
+        self.queries: List[List[str]] = []
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def disable(self, instance_id: str) -> DeviceActionResult:
+        delay, result = self._plan("disable", instance_id)
+        time.sleep(delay)
+        return result
+
+    def enable(self, instance_id: str) -> DeviceActionResult:
+        delay, result = self._plan("enable", instance_id)
+        time.sleep(delay)
+        return result
+
+    def query_status(self, instance_ids: Sequence[str]) -> Optional[Dict[str, str]]:
+        with self._lock:
+            self.queries.append(list(instance_ids))
+            return {
+                instance_id: (
+                    DEVICE_ABSENT
+                    if not self.present.get(instance_id, True)
+                    else DEVICE_ENABLED if self.enabled.get(instance_id, True) else DEVICE_DISABLED
+                )
+                for instance_id in instance_ids
+            }
+
+    async def disable_async(self, instance_id: str) -> DeviceActionResult:
+        delay, result = self._plan("disable", instance_id)
+        await asyncio.sleep(delay)
+        return result
+
+    async def enable_async(self, instance_id: str) -> DeviceActionResult:
+        delay, result = self._plan("enable", instance_id)
+        await asyncio.sleep(delay)
+        return result
+
+    def _draw(self, instance_id: str, attempt: int, salt: str) -> float:
+        digest = hashlib.blake2b(
+            f"{self.seed}:{instance_id}:{attempt}:{salt}".encode("utf-8"), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") / float(1 << 64)
+
+    def _plan(self, action: str, instance_id: str) -> tuple[float, DeviceActionResult]:
+        with self._lock:
+            attempt = self._attempts.get(instance_id, 0) + 1
+            self._attempts[instance_id] = attempt
+            self.calls.append((action, instance_id))
+            present = self.present.get(instance_id, True)
+        delay = self.latency_seconds + self.jitter_seconds * self._draw(instance_id, attempt, "latency")
+        if not instance_id:
+            return 0.0, DeviceActionResult(instance_id, False, "Empty instance id")
+        if not present:
+            return delay, self._count(
+                action, "simulated", DeviceActionResult(instance_id, False, "DeviceNotFound")
+            )
+        if self._draw(instance_id, attempt, "failure") < self.failure_rate:
+            return delay, self._count(
+                action, "simulated", DeviceActionResult(instance_id, False, "Simulated failure")
+            )
+        with self._lock:
+            self.enabled[instance_id] = action == "enable"
+        return delay, self._count(
+            action, "simulated", DeviceActionResult(instance_id, True, "Success")
+        )
+
+
+class SimulatedMonitor:
+    """Event source whose events are injected by the test or benchmark."""
+
+    def __init__(
+        self,
+        callback: Callable[[USBEvent], None],
+        poll_seconds: Optional[float] = None,
+    ) -> None:
+        self.callback = callback
+        self.poll_seconds = poll_seconds
+        self.started = threading.Event()
+
+    def start(self) -> None:
+        self.started.set()
+
+    def stop(self) -> None:
+        self.started.clear()
+
+    def emit(self, event: USBEvent) -> None:
+        self.callback(event)
@@ -0,0 +1,114 @@
+"""Synthetic USB arrival/removal workloads."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ..usb_monitor import USBEvent
+from .fakes import SimulatedMonitor
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from ..service import LockPortService
+
+
+@dataclass(slots=True)
+class WorkloadEvent:
+    offset_seconds: float
+    instance_id: str
+    event_type: str
+    drive_letter: Optional[str] = None
+    volume_name: Optional[str] = None
+
+    def to_usb_event(self) -> USBEvent:
+        return USBEvent(
+            instance_id=self.instance_id,
+            drive_letter=self.drive_letter,
+            volume_name=self.volume_name,
+            event_type=self.event_type,
+        )
+
+
+@dataclass(slots=True)
+class Workload:
+    """Seeded sequence of arrivals (and optional removals) at a fixed rate."""
+
+    events: List[WorkloadEvent] = field(default_factory=list)
+
+    @classmethod
+    def generate(
+        cls,
+        *,
+        devices: int,
+        removal_ratio: float = 0.0,
+        rate_per_second: float | None = None,
+        seed: int = 0,
+    ) -> "Workload":
+        """Build a workload; ``rate_per_second=None`` emits everything as one burst."""
+        rng = random.Random(seed)
+        events: List[WorkloadEvent] = []
+        attached: List[WorkloadEvent] = []
+        offset = 0.0
+        for index in range(devices):
+            drive = f"{chr(ord('D') + index % 22)}:"
+            arrival = WorkloadEvent(offset, f"USBSTOR\\SIM&{seed:04d}&{index:06d}", "arrival", drive, f"SIM{index}")
+            events.append(arrival)
+            attached.append(arrival)
+            if rate_per_second:
+                offset += rng.expovariate(rate_per_second)
+            if attached and rng.random() < removal_ratio:
+                gone = attached.pop(rng.randrange(len(attached)))
+                events.append(
+                    WorkloadEvent(offset, gone.instance_id, "removal", gone.drive_letter, gone.volume_name)
+                )
+        return cls(events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+def run_workload(
+    service: "LockPortService",
+    monitor: SimulatedMonitor,
+    workload: Workload,
+    *,
+    timeout_seconds: float = 60.0,
+) -> Dict[str, float]:
+    """Replay ``workload`` through ``monitor`` and wait until every event is persisted.
+
+    The service must already be started with ``monitor`` as its event source.
+    Returns wall-clock figures; per-stage latency lives in ``service.latency``.
+    """
+    persisted = 0
+    done = threading.Event()
+    lock = threading.Lock()
+    expected = len(workload)
+
+    def on_state(_state: object) -> None:
+        nonlocal persisted
+        with lock:
+            persisted += 1
+            if persisted >= expected:
+                done.set()
+
+    unsubscribe = service.subscribe_states(on_state)
+    started = time.perf_counter()
+    try:
+        for item in workload.events:
+            delay = started + item.offset_seconds - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            monitor.emit(item.to_usb_event())
+        completed = done.wait(timeout_seconds)
+    finally:
+        unsubscribe()
+    elapsed = time.perf_counter() - started
+    return {
+        "events": float(expected),
+        "persisted": float(persisted),
+        "elapsed_seconds": elapsed,
+        "events_per_second": persisted / elapsed if elapsed else 0.0,
+        "completed": 1.0 if completed else 0.0,
+    }
@@ -0,0 +1,101 @@
+"""Single-thread timer queue backed by a binary heap."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from .wakeups import WAKEUPS
+
+logger = logging.getLogger("lockport.timers")
+
+
+class TimerHandle:
+    """Returned by TimerQueue.call_at/call_later; cancel() is O(1)."""
+
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerQueue:
+    """Runs callbacks at monotonic deadlines on one background thread.
+
+    Scheduling is O(log n); cancellation marks the handle and the entry is
+    discarded when it reaches the top of the heap. With no pending timers
+    the thread blocks on its condition variable and never wakes up.
+    Callbacks run on the timer thread and should only hand work off.
+    """
+
+    def __init__(self, name: str = "LockPortTimers") -> None:
+        self.name = name
+        self._heap: List[Tuple[float, int, TimerHandle]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        return self.call_at(time.monotonic() + max(0.0, delay), callback)
+
+    def call_at(self, deadline: float, callback: Callable[[], None]) -> TimerHandle:
+        handle = TimerHandle(deadline, callback)
+        with self._condition:
+            if self._stopped:
+                handle.cancel()
+                return handle
+            heapq.heappush(self._heap, (deadline, next(self._counter), handle))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is handle:
+                self._condition.notify()
+        return handle
+
+    def pending(self) -> int:
+        with self._condition:
+            return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            for _, _, handle in self._heap:
+                handle.cancel()
+            self._heap.clear()
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        WAKEUPS.record("timers")
+                        continue
+                    remaining = self._heap[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                    WAKEUPS.record("timers")
+                if self._stopped:
+                    return
+                _, _, handle = heapq.heappop(self._heap)
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback()
+            except Exception:  # pragma: no cover - defensive logging only
+                logger.exception("Timer callback failed")
@@ -0,0 +1,225 @@
+"""Live device counts for the tray icon, coalesced to a few updates per second."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .ipc import ServiceClient
+from .timers import TimerHandle, TimerQueue
+from .wakeups import WAKEUPS
+
+logger = logging.getLogger("lockport.tray_badge")
+
+BADGE_TONES = ("clear", "locked", "failed")
+MAX_BADGE_NUMBER = 9
+
+
+@dataclass(frozen=True, slots=True)
+class BadgeCounts:
+    locked: int = 0
+    unlocked: int = 0
+    failed: int = 0
+
+    @classmethod
+    def from_mapping(cls, counts: Mapping[str, int]) -> "BadgeCounts":
+        return cls(
+            locked=int(counts.get("locked", 0)),
+            unlocked=int(counts.get("unlocked", 0)),
+            failed=int(counts.get("failed", 0)),
+        )
+
+    def variant(self) -> Tuple[str, str]:
+        """(tone, label) naming the pre-rendered icon that represents these counts."""
+        waiting = self.locked + self.failed
+        tone = "failed" if self.failed else "locked" if self.locked else "clear"
+        return tone, badge_label(waiting)
+
+    def tooltip(self) -> str:
+        return f"LockPort – {self.locked} locked, {self.unlocked} unlocked, {self.failed} failed"
+
+
+def badge_label(count: int) -> str:
+    if count <= 0:
+        return ""
+    return str(count) if count <= MAX_BADGE_NUMBER else f"{MAX_BADGE_NUMBER}+"
+
+
+def all_variants() -> List[Tuple[str, str]]:
+    """Every (tone, label) pair variant() can return, for rendering up front."""
+    labels = [badge_label(count) for count in range(1, MAX_BADGE_NUMBER + 2)]
+    return [("clear", "")] + [(tone, label) for tone in BADGE_TONES[1:] for label in labels]
+
+
+class BadgeUpdater:
+    """Turns a burst of state-change notifications into one badge refresh.
+
+    notify() is cheap and safe to call from a store listener. The first
+    call arms a timer, and later calls are absorbed until it fires. Runs
+    are at least ``min_interval`` seconds apart. ``apply`` runs on the
+    timer thread, and only when the counts actually changed.
+    """
+
+    def __init__(
+        self,
+        counts: Callable[[], Mapping[str, int]],
+        apply: Callable[[BadgeCounts], None],
+        *,
+        min_interval: float = 0.5,
+        timers: TimerQueue | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._counts = counts
+        self._apply = apply
+        self.min_interval = min_interval
+        self._timers = timers or TimerQueue(name="LockPortTrayBadge")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = False
+        self._last_run: Optional[float] = None
+        self._shown: Optional[BadgeCounts] = None
+
+    def notify(self) -> None:
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+            delay = 0.0
+            if self._last_run is not None:
+                delay = max(0.0, self._last_run + self.min_interval - self._clock())
+        self._timers.call_later(delay, self._run)
+
+    @property
+    def timers(self) -> TimerQueue:
+        return self._timers
+
+    def stop(self) -> None:
+        self._timers.stop()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._pending = False
+            self._last_run = self._clock()
+        try:
+            counts = BadgeCounts.from_mapping(self._counts())
+            if counts == self._shown:
+                return
+            self._shown = counts
+            self._apply(counts)
+        except Exception:  # pragma: no cover - keep the timer thread alive
+            logger.exception("Tray badge update failed")
+
+
+class ObserverFeed:
+    """Device counts for a tray that does not own device actions.
+
+    An observer's own store never changes, so in-process subscriptions stay
+    silent. While another process is the owner, the feed mirrors that
+    service's IPC stream (snapshot, then one push per state change). When
+    no service answers, it re-reads device_states.json every
+    ``poll_seconds``. Once this process owns the lease, counts come from the
+    local service again and polling stops.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        changed: Callable[[], None],
+        timers: TimerQueue,
+        *,
+        poll_seconds: float = 5.0,
+        connect: Callable[[], Optional[ServiceClient]] | None = None,
+    ) -> None:
+        self._service = service
+        self._changed = changed
+        self._timers = timers
+        self.poll_seconds = poll_seconds
+        self._connect = connect or (lambda: ServiceClient.connect(service.config))
+        self._lock = threading.Lock()
+        self._remote: Optional[Dict[str, str]] = None  # instance id -> status
+        self._client: Optional[ServiceClient] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._check_handle: Optional[TimerHandle] = None
+        self._stopped = False
+
+    def start(self) -> None:
+        self._schedule_check(0.0)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            handle, self._check_handle = self._check_handle, None
+        if handle is not None:
+            handle.cancel()
+        self._disconnect()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            remote = None if self._service.is_owner else self._remote
+            if remote is not None:
+                counts: Dict[str, int] = {}
+                for status in remote.values():
+                    counts[status] = counts.get(status, 0) + 1
+                return counts
+        # The owner's store is live; an observer's reloads the shared file.
+        return self._service.device_counts()
+
+    def _schedule_check(self, delay: float) -> None:
+        with self._lock:
+            if self._stopped:
+                return
+            self._check_handle = self._timers.call_later(delay, self._check)
+
+    def _check(self) -> None:
+        WAKEUPS.record("tray")
+        if self._service.is_owner:
+            self._disconnect()
+            self._changed()
+            return
+        if self._unsubscribe is None and not self._subscribe():
+            self._changed()
+            self._schedule_check(self.poll_seconds)
+
+    def _subscribe(self) -> bool:
+        client = self._connect()
+        if client is None:
+            return False
+        try:
+            unsubscribe = client.subscribe(self._on_message, on_close=self._on_close)
+        except OSError:
+            client.close()
+            return False
+        with self._lock:
+            self._client, self._unsubscribe = client, unsubscribe
+        return True
+
+    def _on_message(self, message: Mapping[str, Any]) -> None:
+        # IPC reader thread.
+        with self._lock:
+            if message.get("event") == "snapshot":
+                self._remote = {
+                    str(raw.get("instance_id")): str(raw.get("status"))
+                    for raw in message.get("states", [])
+                }
+            elif message.get("event") == "state" and self._remote is not None:
+                raw = message.get("state") or {}
+                self._remote[str(raw.get("instance_id"))] = str(raw.get("status"))
+        self._changed()
+
+    def _on_close(self) -> None:
+        # The service went away: poll (or take over) until another one answers.
+        self._disconnect()
+        self._changed()
+        self._schedule_check(self.poll_seconds)
+
+    def _disconnect(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            unsubscribe, self._unsubscribe = self._unsubscribe, None
+            self._remote = None
+        if unsubscribe is not None:
+            unsubscribe()
+        if client is not None:
+            client.close()
@@ -4,10 +4,12 @@ from __future__ import annotations
 import logging
 import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Callable, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
 
+from .attachments import AttachedDrive, AttachmentStore, diff_attachments
 from .config import DEFAULT_CONFIG
+from .wakeups import WAKEUPS
 
 try:  # pragma: no cover - imported lazily for Windows only
     import wmi  # type: ignore[import]
@@ -30,6 +32,24 @@ class USBEvent:
     volume_name: Optional[str]
     event_type: str  # "arrival" or "removal"
     synthetic: bool = False
+    # Synthetic arrival for a drive attached with the same identity before the restart.
+    unchanged: bool = False
+    # Monotonic pipeline timestamps used for latency statistics.
+    created_at: float = field(default_factory=time.monotonic)
+    dequeued_at: Optional[float] = None
+    actioned_at: Optional[float] = None
+    persisted_at: Optional[float] = None
+
+
+class DeviceMonitor(Protocol):
+    """Event source driven by the service; USBMonitor is the WMI implementation."""
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+MonitorFactory = Callable[[Callable[[USBEvent], None], Optional[float]], DeviceMonitor]
 
 
 class USBMonitor:
@@ -39,6 +59,8 @@ class USBMonitor:
         self,
         callback: Callable[[USBEvent], None],
         poll_seconds: float | None = None,
+        *,
+        attachments: AttachmentStore | None = None,
     ) -> None:
         if wmi is None:
             raise RuntimeError(
@@ -50,16 +72,22 @@ class USBMonitor:
             )
         self._wmi: Any = wmi
         self.callback = callback
-        self.poll_seconds = poll_seconds or DEFAULT_CONFIG.monitor_poll_seconds
+        self.poll_seconds = poll_seconds or DEFAULT_CONFIG.monitor_wait_seconds
         self._thread: threading.Thread | None = None
         self._stop_event = threading.Event()
-        self._drive_map: dict[str, str] = {}
+        self._drive_map: Dict[str, AttachedDrive] = {}
+        self._attachments = attachments
+        self.generation = 0
 
     def start(self) -> None:
-        if self._thread and self._thread.is_alive():
+        if self._thread and self._thread.is_alive() and not self._stop_event.is_set():
             return
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        # A fresh event per run: a stopped thread may still be blocked in a
+        # long WMI wait, and must not be revived by a restart.
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(self._stop_event,), daemon=True
+        )
         self._thread.start()
         logger.info("USB monitor started")
 
@@ -69,7 +97,7 @@ class USBMonitor:
             self._thread.join(timeout=2.0)
             logger.info("USB monitor stopped")
 
-    def _run_loop(self) -> None:
+    def _run_loop(self, stop_event: threading.Event) -> None:
         pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)  # type: ignore[attr-defined]
         try:
             init_start = time.monotonic()
@@ -80,14 +108,20 @@ class USBMonitor:
                 time.monotonic() - init_start,
             )
             self._emit_existing_devices(conn)
-            while not self._stop_event.is_set():
+            while not stop_event.is_set():
+                # NextEvent cannot be interrupted from another thread, so the
+                # timeout only bounds how long a stopped thread lingers.
                 try:
                     event = watcher(timeout_ms=int(self.poll_seconds * 1000))
                 except wmi.x_wmi_timed_out:  # type: ignore[attr-defined]
+                    WAKEUPS.record("usb_monitor")
                     continue
                 except Exception as exc:  # pragma: no cover
                     logger.exception("WMI watcher failure: %s", exc)
                     continue
+                WAKEUPS.record("usb_monitor")
+                if stop_event.is_set():
+                    break
 
                 try:
                     event_type = getattr(event, "EventType", None)
@@ -95,17 +129,19 @@ class USBMonitor:
                         continue
                     drive_letter = getattr(event, "DriveName", None)
                     volume_name = getattr(event, "Label", None)
-                    instance_id = self._resolve_instance_id(drive_letter)
+                    instance_id, serial = self._resolve_drive(drive_letter)
                     drive_key = drive_letter.upper() if drive_letter else None
                     event_name = "arrival" if event_type == 2 else "removal"
                     if event_name == "arrival":
                         if instance_id and drive_key:
-                            self._drive_map[drive_key] = instance_id
+                            self._drive_map[drive_key] = AttachedDrive(instance_id, serial, volume_name or "")
+                            self._save_drive_map()
                     else:
                         if drive_key:
-                            if not instance_id:
-                                instance_id = self._drive_map.get(drive_key, "")
-                            self._drive_map.pop(drive_key, None)
+                            known = self._drive_map.pop(drive_key, None)
+                            if not instance_id and known is not None:
+                                instance_id = known.instance_id
+                            self._save_drive_map()
                     usb_event = USBEvent(
                         instance_id=instance_id or "",
                         drive_letter=drive_letter,
@@ -127,51 +163,106 @@ class USBMonitor:
             pythoncom.CoUninitialize()  # type: ignore[attr-defined]
 
     def _emit_existing_devices(self, conn: Any) -> None:
-        """Fire synthetic events for already-mounted removable drives."""
+        """Fire synthetic events for already-mounted removable drives.
+
+        Drives whose letter and volume serial match the persisted map skip the
+        WMI association walk and are flagged ``unchanged``. Persisted drives
+        that are gone produce synthetic removals.
+        """
+        started = time.monotonic()
         try:
             current = conn.Win32_LogicalDisk(DriveType=2)
         except Exception as exc:  # pragma: no cover - defensive logging only
             logger.warning("Failed to enumerate existing USB devices: %s", exc)
             return
 
+        disks: Dict[str, Tuple[str, Optional[str]]] = {}
+        serials: Dict[str, str] = {}
         for disk in current:
             drive_letter = getattr(disk, "DeviceID", None)
-            volume_name = getattr(disk, "VolumeName", None)
-            instance_id = self._resolve_instance_id(drive_letter)
-            if not instance_id:
+            if not drive_letter:
                 continue
+            disks[drive_letter.upper()] = (drive_letter, getattr(disk, "VolumeName", None))
+            serials[drive_letter.upper()] = str(getattr(disk, "VolumeSerialNumber", "") or "")
+        previous = self._attachments.load().drives if self._attachments else {}
+        diff = diff_attachments(previous, serials)
+
+        self._drive_map = dict(diff.unchanged)
+        for drive_key in diff.added:
+            instance_id, serial = self._resolve_drive(disks[drive_key][0])
+            if instance_id:
+                self._drive_map[drive_key] = AttachedDrive(instance_id, serial, disks[drive_key][1] or "")
+        attached_ids = {info.instance_id for info in self._drive_map.values()}
+        for drive_key, known in diff.removed.items():
+            if known.instance_id in attached_ids:
+                continue  # Same device, new drive letter.
+            logger.info(
+                "USB device removed while LockPort was stopped: device=%s drive=%s",
+                known.instance_id,
+                drive_key,
+            )
+            self.callback(
+                USBEvent(
+                    instance_id=known.instance_id,
+                    drive_letter=drive_key,
+                    volume_name=known.volume or None,
+                    event_type="removal",
+                    synthetic=True,
+                )
+            )
+
+        for drive_key, info in self._drive_map.items():
+            drive_letter, volume_name = disks[drive_key]
             usb_event = USBEvent(
-                instance_id=instance_id,
+                instance_id=info.instance_id,
                 drive_letter=drive_letter,
                 volume_name=volume_name,
                 event_type="arrival",
                 synthetic=True,
+                unchanged=drive_key in diff.unchanged,
             )
             logger.info(
-                "Detected pre-existing USB device: device=%s drive=%s label=%s",
+                "Detected pre-existing USB device: device=%s drive=%s label=%s%s",
                 usb_event.instance_id,
                 usb_event.drive_letter,
                 usb_event.volume_name,
+                " (unchanged)" if usb_event.unchanged else "",
             )
             self.callback(usb_event)
+        self._save_drive_map()
+        logger.info(
+            "Reconciled %s drives in %.2fs (generation %s): %s unchanged, %s new, %s removed",
+            len(disks),
+            time.monotonic() - started,
+            self.generation,
+            len(diff.unchanged),
+            len(diff.added),
+            len(diff.removed),
+        )
+
+    def _save_drive_map(self) -> None:
+        if self._attachments is not None:
+            self.generation = self._attachments.save(self._drive_map)
 
-    def _resolve_instance_id(self, drive_letter: Optional[str]) -> str:
+    def _resolve_drive(self, drive_letter: Optional[str]) -> Tuple[str, str]:
+        """Return ``(instance_id, volume_serial)`` for ``drive_letter``."""
         if not drive_letter:
-            return ""
+            return "", ""
         conn: Any = self._wmi.WMI()
         logical_disk = conn.Win32_LogicalDisk(DeviceID=drive_letter)
         if not logical_disk:
-            return ""
+            return "", ""
+        serial = str(getattr(logical_disk[0], "VolumeSerialNumber", "") or "")
         associations = conn.AssociatorsOf(
             logical_disk[0].Path_,
             strAssocClass="Win32_LogicalDiskToPartition",
         )
         if not associations:
-            return ""
+            return "", serial
         partition = associations[0]
         physical_disks = conn.AssociatorsOf(
             partition.Path_, strAssocClass="Win32_DiskDriveToDiskPartition"
         )
         if not physical_disks:
-            return ""
-        return getattr(physical_disks[0], "PNPDeviceID", "")
+            return "", serial
+        return getattr(physical_disks[0], "PNPDeviceID", ""), serial
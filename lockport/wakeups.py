@@ -0,0 +1,53 @@
+"""Counts how often LockPort's loops wake up, for idle-power diagnostics."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from .metrics import WAKEUPS_TOTAL
+
+
+class WakeupMeter:
+    """Sliding one-minute count of wakeups per source.
+
+    Every blocking loop calls record() each time it returns from a wait,
+    whether an event arrived or a timeout expired. An idle process should
+    report (close to) zero for every source.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._stamps: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, source: str) -> None:
+        WAKEUPS_TOTAL.labels(source).inc()
+        now = self._clock()
+        with self._lock:
+            stamps = self._stamps.setdefault(source, deque())
+            stamps.append(now)
+            self._expire(stamps, now)
+
+    def per_minute(self) -> Dict[str, float]:
+        """Wakeups per minute for each source seen in the last window."""
+        now = self._clock()
+        scale = 60.0 / self.window_seconds
+        with self._lock:
+            for stamps in self._stamps.values():
+                self._expire(stamps, now)
+            return {
+                source: round(len(stamps) * scale, 1)
+                for source, stamps in sorted(self._stamps.items())
+                if stamps
+            }
+
+    def _expire(self, stamps: Deque[float], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while stamps and stamps[0] < cutoff:
+            stamps.popleft()
+
+
+WAKEUPS = WakeupMeter()
@@ -1,32 +1,48 @@
-"""Command-line helper for administering LockPort."""
+"""Command-line helper for administering LockPort.
+
+Subcommand handlers import what they need when they run, so scripted calls
+such as ``status`` never load tkinter, the USB monitor or the asset cache.
+"""
 from __future__ import annotations
 
 import argparse
-import getpass
-import os
-import subprocess
 import sys
-from datetime import datetime
-from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-from lockport.autostart import (
-    autostart_status,
-    disable_autostart,
-    enable_autostart,
-)
-from lockport.device_state import DeviceStateStore
-from lockport.device_window import launch_device_window
-from lockport.pin_store import PinManager, PinValidationError
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from lockport.pin_store import PinManager
 
 
 def cmd_status(_: argparse.Namespace, pin_manager: PinManager) -> int:
+    from lockport.election import describe_owner, read_owner
+    from lockport.ipc import ServiceClient
+
     status = pin_manager.get_status()
     print("Failed attempts:", status["failed_attempts"])
     if status["locked"]:
         print("Locked until:", status["lock_until"])
     else:
         print("Lockout: inactive")
+    print("Device owner:", describe_owner(read_owner(pin_manager.config)))
+    client = ServiceClient.connect(pin_manager.config)
+    if client is None:
+        print("Service: not running")
+        return 0
+    try:
+        service = client.status()
+    except (OSError, EOFError, ValueError):
+        print("Service: not responding")
+        return 0
+    finally:
+        client.close()
+    devices = ", ".join(f"{name}={count}" for name, count in sorted(service.get("devices", {}).items()))
+    print(f"Service: running (PID {service.get('pid')}, {service.get('core')} core, queue depth {service.get('queue_depth')})")
+    print("Devices:", devices or "none")
+    wakeups = service.get("wakeups_per_minute") or {}
+    print(
+        "Wakeups/min:",
+        ", ".join(f"{source}={rate:g}" for source, rate in sorted(wakeups.items())) or "none (idle)",
+    )
     return 0
 
 
@@ -37,8 +53,22 @@ def cmd_reset_lockout(_: argparse.Namespace, pin_manager: PinManager) -> int:
 
 
 def cmd_device_state(_: argparse.Namespace, pin_manager: PinManager) -> int:
-    store = DeviceStateStore(pin_manager.config)
-    states = store.list_states()
+    from datetime import datetime
+
+    from lockport.device_state import DeviceStateStore
+    from lockport.ipc import ServiceClient
+
+    states = None
+    client = ServiceClient.connect(pin_manager.config)
+    if client is not None:
+        try:
+            states = client.list_states()
+        except (OSError, EOFError, ValueError):
+            pass  # service is shutting down; read the store it leaves behind
+        finally:
+            client.close()
+    if states is None:
+        states = DeviceStateStore(pin_manager.config).list_states()
     if not states:
         print("No USB device activity recorded yet.")
         return 0
@@ -50,7 +80,65 @@ def cmd_device_state(_: argparse.Namespace, pin_manager: PinManager) -> int:
     return 0
 
 
+def cmd_stats(_: argparse.Namespace, pin_manager: PinManager) -> int:
+    from datetime import datetime
+
+    from lockport.latency import STAGES, load_latency_snapshot
+
+    snapshot = load_latency_snapshot(pin_manager.config.latency_stats_location)
+    if not snapshot:
+        print("No latency statistics recorded yet.")
+        return 0
+    stamp = datetime.fromtimestamp(float(snapshot.get("updated_at", 0))).isoformat(timespec="seconds")
+    window = float(snapshot.get("window_seconds", 0))
+    print(f"Lock latency over the last {window / 60:.0f} min (updated {stamp})")
+    print(f"{'stage':<14}{'count':>8}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    stages = snapshot.get("stages") or {}
+    for stage in STAGES:
+        row = stages.get(stage) or {}
+        print(
+            f"{stage:<14}{int(row.get('count', 0)):>8}"
+            f"{row.get('p50_ms', 0.0):>11.1f}{row.get('p95_ms', 0.0):>11.1f}"
+            f"{row.get('p99_ms', 0.0):>11.1f}{row.get('max_ms', 0.0):>11.1f}"
+        )
+    return 0
+
+
+def cmd_audit(args: argparse.Namespace, pin_manager: PinManager) -> int:
+    import json
+    from datetime import datetime
+
+    from lockport.audit import parse_time_bound, query_audit
+
+    try:
+        since = parse_time_bound(args.since) if args.since else None
+        until = parse_time_bound(args.until) if args.until else None
+    except ValueError as exc:
+        print(f"Invalid time bound: {exc}")
+        return 1
+    shown = 0
+    for record in query_audit(
+        pin_manager.config.audit_location, device=args.device, since=since, until=until
+    ):
+        shown += 1
+        if args.json:
+            print(json.dumps(record))
+            continue
+        stamp = datetime.fromtimestamp(float(record.pop("ts", 0))).isoformat(timespec="milliseconds")
+        event = record.pop("event", "?")
+        device = record.pop("instance_id", "-")
+        details = " ".join(f"{key}={value}" for key, value in record.items() if value is not None)
+        print(f"{stamp}\t{event}\t{device}\t{details}")
+    if not shown:
+        print("No matching audit records.")
+    return 0
+
+
 def _start_background_monitor(console_log: bool) -> int:
+    import os
+    import subprocess
+    from pathlib import Path
+
     script_path = Path(__file__).resolve().with_name("lockport_tray.py")
     if not script_path.exists():
         print("lockport_service.py not found; cannot start background monitor.")
@@ -84,11 +172,15 @@ def _start_background_monitor(console_log: bool) -> int:
 def cmd_device_window(args: argparse.Namespace, pin_manager: PinManager) -> int:
     if getattr(args, "background_monitor", False):
         return _start_background_monitor(getattr(args, "console_log", False))
+    from lockport.device_window import launch_device_window
+
     launch_device_window(pin_manager)
     return 0
 
 
 def cmd_autostart(args: argparse.Namespace, _: PinManager) -> int:
+    from lockport.autostart import autostart_status, disable_autostart, enable_autostart
+
     if args.action == "enable":
         success = enable_autostart()
         print("Autostart task created." if success else "Failed to create autostart task (see logs).")
@@ -102,6 +194,10 @@ def cmd_autostart(args: argparse.Namespace, _: PinManager) -> int:
 
 
 def cmd_set_pin(args: argparse.Namespace, pin_manager: PinManager) -> int:
+    import getpass
+
+    from lockport.pin_store import PinValidationError
+
     current_pin = args.current_pin
     if current_pin is None and not args.skip_current_check:
         current_pin = getpass.getpass("Current PIN: ")
@@ -126,6 +222,12 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers.add_parser("status", help="Show PIN status")
     subparsers.add_parser("reset-lockout", help="Clear lockout counters")
     subparsers.add_parser("device-state", help="List tracked USB devices")
+    subparsers.add_parser("stats", help="Show arrival-to-lock latency percentiles")
+    audit_parser = subparsers.add_parser("audit", help="Query the structured audit trail")
+    audit_parser.add_argument("--device", help="Only records for this instance ID")
+    audit_parser.add_argument("--since", help="Start bound: ISO time, epoch seconds, or e.g. 30m/2h/1d ago")
+    audit_parser.add_argument("--until", help="End bound, same formats as --since")
+    audit_parser.add_argument("--json", action="store_true", help="Print raw JSON lines")
     device_parser = subparsers.add_parser("device-window", help="Open the live device window or kick off the background monitor")
     device_parser.add_argument(
         "--background-monitor",
@@ -159,6 +261,8 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
+    from lockport.pin_store import PinManager
+
     pin_manager = PinManager()
 
     commands: dict[str, Callable[[argparse.Namespace, PinManager], int]] = {
@@ -166,6 +270,8 @@ def main() -> int:
         "reset-lockout": cmd_reset_lockout,
         "set-pin": cmd_set_pin,
         "device-state": cmd_device_state,
+        "stats": cmd_stats,
+        "audit": cmd_audit,
         "device-window": cmd_device_window,
         "autostart": cmd_autostart,
     }
@@ -5,6 +5,8 @@ import argparse
 import signal
 from typing import Sequence
 
+from lockport.async_service import AsyncLockPortService
+from lockport.config import LockPortConfig
 from lockport.service import LockPortService
 
 
@@ -45,6 +47,17 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Auto-stop the service after N seconds (omit for indefinite run)",
     )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Use the asyncio event-loop core instead of worker threads",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus text-format metrics on 127.0.0.1:PORT",
+    )
     return parser
 
 
@@ -54,7 +67,9 @@ def main(argv: Sequence[str] | None = None) -> None:
 
     _ensure_admin()
 
-    service = LockPortService(console_log=args.console_log)
+    service_cls = AsyncLockPortService if args.asyncio else LockPortService
+    config = LockPortConfig(metrics_port=args.metrics_port)
+    service = service_cls(config, console_log=args.console_log)
 
     def handle_signal(signum: int, _frame: object) -> None:
         service.logger.info("Signal %s received, stopping service", signum)
@@ -7,11 +7,13 @@ import os
 import sys
 import threading
 from io import BytesIO
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
 
 from lockport.device_window import launch_device_window
+from lockport.pin_prompt import PromptHost
 from lockport.service import LockPortService
-from lockport.resources import load_asset_bytes
+from lockport.resources import AssetCache, asset_cache
+from lockport.tray_badge import BadgeCounts, BadgeUpdater, ObserverFeed, all_variants
 
 try:  # pragma: no cover - UI dependency checked at runtime
     import pystray
@@ -25,6 +27,9 @@ if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from PIL import Image as PILImage
 
 LOGGER = logging.getLogger("lockport.tray")
+ICON_SIZE = 64
+TRAY_ASSET = "app-logo-256.png"
+BADGE_COLORS = {"clear": (46, 125, 50, 255), "locked": (198, 40, 40, 255), "failed": (239, 108, 0, 255)}
 
 
 class LockPortTrayApp:
@@ -34,10 +39,30 @@ class LockPortTrayApp:
                 "pystray and Pillow are required for the tray icon.\n"
                 "Install them with 'pip install pystray Pillow'."
             ) from _TRAY_IMPORT_ERROR
-        self.service = LockPortService(console_log=console_log)
+        self.service = LockPortService(console_log=console_log, role="tray")
+        # Every badge variant is drawn once, then read back from the asset
+        # cache on later starts; updates only swap images.
+        assets = asset_cache(self.service.config.asset_cache_location)
+        self._icon_variants: Dict[Tuple[str, str], "PILImage"] = {
+            variant: self._load_badge_image(assets, *variant) for variant in all_variants()
+        }
+        # In-process state changes only reach the owner's store; the feed
+        # covers a tray that observes another process's service.
+        self._badge = BadgeUpdater(
+            lambda: self._feed.counts(),
+            self._apply_badge,
+            min_interval=self.service.config.tray_badge_min_interval_seconds,
+        )
+        self._feed = ObserverFeed(
+            self.service,
+            self._badge.notify,
+            self._badge.timers,
+            poll_seconds=self.service.config.tray_badge_poll_seconds,
+        )
+        self._unsubscribe_states: Optional[Callable[[], None]] = None
         self.icon = pystray.Icon(
             "LockPort",
-            self._load_tray_image(),
+            self._icon_variants[("clear", "")],
             "LockPort Monitor",
             menu=pystray.Menu(
                 pystray.MenuItem("Show Device Window", self._on_open_device_window),
@@ -48,13 +73,46 @@ class LockPortTrayApp:
         self._window_lock = threading.Lock()
         self._window_active = False
 
-    def _load_tray_image(self) -> "PILImage":
+    def _load_badge_image(self, assets: AssetCache, tone: str, label: str) -> "PILImage":
         try:
-            icon_bytes = load_asset_bytes("app-logo-256.png")
-            return Image.open(BytesIO(icon_bytes)).resize((64, 64), Image.LANCZOS)
+            data = assets.variant(
+                TRAY_ASSET,
+                f"tray{ICON_SIZE}-{tone}-{label or 'none'}",
+                # Badges are drawn on the cached 64 px icon, not the 256 px original.
+                lambda _source: self._render_badge(assets.png(TRAY_ASSET, ICON_SIZE), tone, label),
+            )
+            return Image.open(BytesIO(data))
         except Exception:
             return self._build_fallback_image()
 
+    @staticmethod
+    def _render_badge(base_png: bytes, tone: str, label: str) -> bytes:
+        image = Image.open(BytesIO(base_png)).convert("RGBA")
+        draw = ImageDraw.Draw(image)
+        diameter = ICON_SIZE // 2 if label else ICON_SIZE // 4
+        box = (ICON_SIZE - diameter, ICON_SIZE - diameter, ICON_SIZE - 1, ICON_SIZE - 1)
+        draw.ellipse(box, fill=BADGE_COLORS[tone], outline="white")
+        if label:
+            font = ImageFont.load_default()
+            left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+            draw.text(
+                (
+                    box[0] + (diameter - (right - left)) / 2 - left,
+                    box[1] + (diameter - (bottom - top)) / 2 - top,
+                ),
+                label,
+                font=font,
+                fill="white",
+            )
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _apply_badge(self, counts: BadgeCounts) -> None:
+        # Runs on the badge timer thread, at most a few times per second.
+        self.icon.icon = self._icon_variants[counts.variant()]
+        self.icon.title = counts.tooltip()
+
     def _build_fallback_image(self) -> "PILImage":
         size = 64
         image = Image.new("RGBA", (size, size), (38, 50, 56, 255))
@@ -84,9 +142,23 @@ class LockPortTrayApp:
                 self.icon.stop()
 
     def start(self) -> None:
+        self._unsubscribe_states = self.service.subscribe_states(lambda _state: self._badge.notify())
         self._service_thread.start()
+        self._feed.start()
+        # The tray is the interactive process, so standalone PIN prompts are
+        # shown from here; paying Tk start-up now keeps the first one quick.
+        PromptHost.shared().warm_up()
         self.icon.run()
+        self._stop_badge()
         self.service.stop()
+        PromptHost.shared().stop()
+
+    def _stop_badge(self) -> None:
+        if self._unsubscribe_states is not None:
+            self._unsubscribe_states()
+            self._unsubscribe_states = None
+        self._feed.stop()
+        self._badge.stop()
 
     def _on_open_device_window(
         self,
@@ -109,6 +181,7 @@ class LockPortTrayApp:
         threading.Thread(target=_launch, daemon=True).start()
 
     def _on_stop(self, icon, _item) -> None:
+        self._stop_badge()
         self.service.stop()
         icon.stop()
 
@@ -0,0 +1,79 @@
+"""Shared fixtures for tests that drive a service with the simulation fakes."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from lockport.config import LockPortConfig
+from lockport.service import LockPortService
+from lockport.simulation import SimulatedLocker, SimulatedMonitor
+
+
+def poll_until(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def wait_for() -> Callable[..., bool]:
+    """Poll a predicate until it holds or the timeout expires."""
+    return poll_until
+
+
+@pytest.fixture
+def make_config(tmp_path: Path) -> Callable[..., LockPortConfig]:
+    """Config rooted in ``tmp_path`` with cheap PIN hashing and no IPC."""
+
+    def build(**overrides: object) -> LockPortConfig:
+        values = dict(
+            pin_store_path=tmp_path,
+            log_path=tmp_path,
+            pin_hash_iterations=1_000,
+            ipc_enabled=False,
+            event_queue_size=256,
+        )
+        values.update(overrides)
+        return LockPortConfig(**values)  # type: ignore[arg-type]
+
+    return build
+
+
+@pytest.fixture
+def make_service(make_config):
+    """Build a service on a ``SimulatedMonitor``; ``service._monitor`` drives events.
+
+    Pass ``start=False`` to seed the state store before the service starts.
+    Services a test leaves running are stopped at teardown.
+    """
+    services: List[LockPortService] = []
+
+    def build(
+        cfg: LockPortConfig | None = None,
+        *,
+        core=LockPortService,
+        locker: SimulatedLocker | None = None,
+        start: bool = True,
+        **kwargs: object,
+    ):
+        service = core(
+            cfg or make_config(),
+            device_locker=locker or SimulatedLocker(),
+            monitor_factory=lambda callback, poll: SimulatedMonitor(callback, poll),
+            **kwargs,
+        )
+        services.append(service)
+        if start:
+            service.start()
+        return service
+
+    yield build
+    for service in services:
+        if service._started_at is not None and not service._stop_event.is_set():
+            service.stop()
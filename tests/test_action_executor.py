@@ -0,0 +1,85 @@
+"""Tests for the window's background device-action executor."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, List
+
+from lockport.action_executor import DeviceActionExecutor
+
+
+def run_inline(callback: Callable[[], None]) -> None:
+    callback()
+
+
+def test_actions_for_one_device_run_in_order(wait_for) -> None:
+    executor = DeviceActionExecutor(run_inline, max_workers=4)
+    started: List[int] = []
+    done: List[int] = []
+    active = threading.Semaphore(1)
+
+    def action(step: int) -> Callable[[], int]:
+        def run() -> int:
+            assert active.acquire(blocking=False), "actions for one device overlapped"
+            started.append(step)
+            time.sleep(0.01)
+            active.release()
+            return step
+
+        return run
+
+    for step in range(5):
+        executor.submit("USB#1", action(step), lambda future: done.append(future.result()))
+    assert wait_for(lambda: len(done) == 5)
+    assert started == done == [0, 1, 2, 3, 4]
+    assert not executor.busy("USB#1")
+    executor.shutdown()
+
+
+def test_different_devices_run_in_parallel(wait_for) -> None:
+    executor = DeviceActionExecutor(run_inline, max_workers=3)
+    barrier = threading.Barrier(3, timeout=2.0)
+    done: List[str] = []
+    for index in range(3):
+        executor.submit(f"USB#{index}", barrier.wait, lambda future, i=index: done.append(f"USB#{i}"))
+    assert wait_for(lambda: len(done) == 3)
+    executor.shutdown()
+
+
+def test_errors_are_delivered_through_the_future(wait_for) -> None:
+    executor = DeviceActionExecutor(run_inline, max_workers=1)
+    outcomes: List[BaseException | None] = []
+
+    def fail() -> None:
+        raise ValueError("boom")
+
+    executor.submit("USB#1", fail, lambda future: outcomes.append(future.exception()))
+    assert wait_for(lambda: outcomes)
+    assert isinstance(outcomes[0], ValueError)
+    executor.shutdown()
+
+
+def test_batch_waits_for_and_blocks_each_device(wait_for) -> None:
+    executor = DeviceActionExecutor(run_inline, max_workers=4)
+    order: List[str] = []
+    release = threading.Event()
+
+    def step(name: str, wait: bool = False) -> Callable[[], None]:
+        def run() -> None:
+            if wait:
+                release.wait(2.0)
+            order.append(name)
+
+        return run
+
+    done: List[str] = []
+    executor.submit("USB#1", step("lock 1", wait=True), lambda future: done.append("lock 1"))
+    executor.submit_many(["USB#1", "USB#2"], step("batch"), lambda future: done.append("batch"))
+    executor.submit("USB#2", step("lock 2"), lambda future: done.append("lock 2"))
+    time.sleep(0.05)
+    assert order == [] and executor.busy("USB#2")
+    release.set()
+    assert wait_for(lambda: len(done) == 3)
+    assert order == ["lock 1", "batch", "lock 2"]
+    assert not executor.busy("USB#1") and not executor.busy("USB#2")
+    executor.shutdown()
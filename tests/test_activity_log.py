@@ -0,0 +1,46 @@
+"""Tests for the activity pane's ring buffer."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from lockport.activity_log import ActivityLog
+
+
+def test_pending_lines_are_batched_and_trimmed_in_blocks() -> None:
+    log = ActivityLog(capacity=10, trim_batch=5)
+    assert log.append("first")
+    assert not log.append("second")
+    lines, trim = log.take_pending()
+    assert [line.split("] ", 1)[1] for line in lines] == ["first\n", "second\n"]
+    assert trim == 0
+
+    for index in range(13):
+        log.append(f"line {index}")
+    lines, trim = log.take_pending()
+    # 15 lines would be shown: within capacity + batch, so nothing is deleted yet.
+    assert (len(lines), trim) == (13, 0)
+
+    log.append("overflow")
+    lines, trim = log.take_pending()
+    assert (len(lines), trim) == (1, 6)
+    assert len(log.lines()) == 10
+
+
+def test_oversized_batch_skips_lines_that_would_be_trimmed() -> None:
+    log = ActivityLog(capacity=4, trim_batch=1)
+    log.append("old")
+    log.take_pending()
+    for index in range(10):
+        log.append(f"burst {index}")
+    lines, trim = log.take_pending()
+    assert trim == 1
+    assert [line.split("] ", 1)[1] for line in lines] == [f"burst {i}\n" for i in range(6, 10)]
+
+
+def test_export_writes_buffered_history(tmp_path: Path) -> None:
+    log = ActivityLog(capacity=3)
+    for index in range(5):
+        log.append(f"event {index}")
+    target = tmp_path / "activity.log"
+    assert log.export(target) == 3
+    assert target.read_text(encoding="utf-8").splitlines()[0].endswith("event 2")
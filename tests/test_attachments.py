@@ -0,0 +1,50 @@
+"""Tests for the persisted attachment map and warm-start reconciliation."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from lockport.attachments import AttachedDrive, AttachmentStore, diff_attachments
+from lockport.simulation import SimulatedLocker
+from lockport.usb_monitor import USBEvent
+
+
+def test_diff_requires_matching_serial() -> None:
+    previous = {
+        "E:": AttachedDrive("USB#1", "AAAA"),
+        "F:": AttachedDrive("USB#2", "BBBB"),
+        "G:": AttachedDrive("USB#3", "CCCC"),
+    }
+    diff = diff_attachments(previous, {"E:": "AAAA", "F:": "ZZZZ", "H:": "DDDD"})
+    assert list(diff.unchanged) == ["E:"]
+    assert sorted(diff.added) == ["F:", "H:"]
+    assert sorted(diff.removed) == ["F:", "G:"]
+
+
+def test_store_round_trip_bumps_generation(tmp_path: Path) -> None:
+    store = AttachmentStore(tmp_path / "attachments.json")
+    assert store.load().generation == 0
+    assert store.save({"e:": AttachedDrive("USB#1", "AAAA", "STICK")}) == 1
+    reopened = AttachmentStore(tmp_path / "attachments.json")
+    snapshot = reopened.load()
+    assert snapshot.generation == 1
+    assert snapshot.drives == {"E:": AttachedDrive("USB#1", "AAAA", "STICK")}
+    assert reopened.save(snapshot.drives) == 2
+
+
+def test_unchanged_drive_that_is_still_mounted_is_locked_again(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker(latency_seconds=0.0)
+    service = make_service(make_config(worker_count=1), locker=locker, start=False)
+    store = service._device_state_store
+    store.upsert(instance_id="USB#1", drive="E:", volume="A", status="locked")
+    store.upsert(instance_id="USB#2", drive="F:", volume="B", status="removed")
+    service.start()
+    try:
+        for instance_id, drive in (("USB#1", "E:"), ("USB#2", "F:")):
+            service._monitor.emit(
+                USBEvent(instance_id, drive, None, "arrival", synthetic=True, unchanged=True)
+            )
+        wait_for(lambda: len(locker.calls) == 2 and store.get("USB#2").status == "locked")
+    finally:
+        service.stop()
+    # A stored "locked" is stale while the drive is mounted: its device is enabled.
+    assert locker.calls == [("disable", "USB#1"), ("disable", "USB#2")]
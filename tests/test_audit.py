@@ -0,0 +1,122 @@
+"""Tests for the JSONL audit trail and its sidecar indexes."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from lockport.audit import AuditHandler, _load_index, _ranges_for, parse_time_bound, query_audit
+
+
+@pytest.fixture
+def audit_logger(tmp_path: Path):
+    handler = AuditHandler(tmp_path, max_bytes=400, backup_count=10)
+    logger = logging.getLogger("lockport.tests.audit")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger, handler
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def emit(logger: logging.Logger, instance_id: str, ts: float) -> None:
+    record = logger.makeRecord(
+        logger.name, logging.INFO, __file__, 0, "usb_event", None, None,
+        extra={"audit": {"event": "usb_event", "instance_id": instance_id}},
+    )
+    record.created = ts
+    logger.handle(record)
+
+
+def test_segments_are_indexed_and_queried_by_device(tmp_path: Path, audit_logger) -> None:
+    logger, handler = audit_logger
+    for i in range(12):
+        emit(logger, "USB#A" if i % 3 == 0 else "USB#B", 1000.0 + i)
+    handler.flush()
+    segments = sorted(tmp_path.glob("audit-*.jsonl"))
+    assert len(segments) > 1
+    assert all(seg.with_name(seg.name.replace(".jsonl", ".idx.json")).exists() for seg in segments)
+
+    records = list(query_audit(tmp_path, device="USB#A"))
+    assert [r["ts"] for r in records] == [1000.0, 1003.0, 1006.0, 1009.0]
+    windowed = list(query_audit(tmp_path, since=1004.0, until=1007.0))
+    assert [r["ts"] for r in windowed] == [1004.0, 1005.0, 1006.0, 1007.0]
+
+    first = segments[0]
+    index = _load_index(first)
+    assert index is not None
+    # Segments outside the window are not read at all.
+    assert _ranges_for(index, first.stat().st_size, None, 5000.0, None) == []
+    ranges = _ranges_for(index, first.stat().st_size, "USB#A", None, None)
+    assert sum(length for _, length in ranges) < index.size
+
+
+def test_unindexed_tail_is_scanned(tmp_path: Path, audit_logger) -> None:
+    logger, handler = audit_logger
+    emit(logger, "USB#A", 10.0)
+    handler.flush()
+    emit(logger, "USB#A", 11.0)
+    handler._stream.flush()  # written but not yet indexed
+    assert [r["ts"] for r in query_audit(tmp_path, device="USB#A")] == [10.0, 11.0]
+    line = handler._path.read_text().splitlines()[0]
+    assert json.loads(line) == {"ts": 10.0, "event": "usb_event", "instance_id": "USB#A"}
+
+
+def test_parse_time_bound() -> None:
+    assert parse_time_bound("30m", now=10_000.0) == 8_200.0
+    assert parse_time_bound("1700000000") == 1_700_000_000.0
+    assert parse_time_bound("2024-01-02T03:04:05+00:00") == 1_704_164_645.0
+    with pytest.raises(ValueError):
+        parse_time_bound("yesterday")
+
+
+def test_flush_survives_a_removed_directory(tmp_path: Path, monkeypatch) -> None:
+    directory = tmp_path / "audit"
+    handler = AuditHandler(directory, max_bytes=400, backup_count=1)
+    errors = []
+    monkeypatch.setattr(handler, "handleError", errors.append)
+    logger = logging.getLogger("lockport.tests.audit.removed")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        emit(logger, "USB#A", 1.0)
+        for path in directory.iterdir():
+            path.unlink()
+        directory.rmdir()
+        handler.flush()
+        assert len(errors) == 1
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_rotation_keeps_segments_other_live_processes_are_writing(tmp_path: Path) -> None:
+    live = tmp_path / f"audit-000001-p{os.getppid()}.jsonl"
+    gone = tmp_path / "audit-000002-p999999.jsonl"
+    for path in (live, gone):
+        path.write_bytes(b"")
+    handler = AuditHandler(tmp_path, max_bytes=100, backup_count=0)
+    logger = logging.getLogger("lockport.tests.audit.shared")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(4):
+            emit(logger, "USB#A", 1.0 + i)
+        names = {path.name for path in tmp_path.glob("audit-*.jsonl")}
+        assert live.name in names and gone.name not in names
+        assert handler._path.name in names and handler._path.name.endswith(f"-p{os.getpid()}.jsonl")
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_records_from_several_processes_come_back_in_time_order(tmp_path: Path) -> None:
+    for name, stamps in (("audit-000001-p100.jsonl", [1.0, 3.0]), ("audit-000002-p200.jsonl", [2.0, 4.0])):
+        lines = [json.dumps({"ts": ts, "event": "usb_event", "instance_id": "USB#A"}) for ts in stamps]
+        (tmp_path / name).write_text("\n".join(lines) + "\n")
+    assert [r["ts"] for r in query_audit(tmp_path)] == [1.0, 2.0, 3.0, 4.0]
+    assert [r["ts"] for r in query_audit(tmp_path, device="USB#A", since=2.5)] == [3.0, 4.0]
@@ -0,0 +1,69 @@
+"""Tests for the per-device circuit breaker and the timer queue."""
+from __future__ import annotations
+
+import random
+import threading
+
+from lockport.circuit_breaker import DeviceCircuitBreaker
+from lockport.simulation import SimulatedLocker
+from lockport.timers import TimerQueue
+from lockport.usb_monitor import USBEvent
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_backoff_doubles_until_capped() -> None:
+    breaker = DeviceCircuitBreaker(base_seconds=1.0, max_seconds=5.0, jitter=0.0, clock=FakeClock())
+    delays = [breaker.record_failure("USB#1") for _ in range(5)]
+    assert delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+    assert breaker.failures("USB#1") == 5
+
+
+def test_breaker_reopens_after_window_and_closes_on_success() -> None:
+    clock = FakeClock()
+    breaker = DeviceCircuitBreaker(base_seconds=2.0, jitter=0.1, rng=random.Random(1), clock=clock)
+    assert breaker.allow("USB#1")
+    delay = breaker.record_failure("USB#1")
+    assert 1.8 <= delay <= 2.2
+    assert not breaker.allow("USB#1")
+    assert breaker.allow("USB#2")
+    clock.now += delay
+    assert breaker.allow("USB#1")
+    breaker.record_success("USB#1")
+    assert breaker.failures("USB#1") == 0
+
+
+def test_timer_queue_fires_in_order_and_skips_cancelled() -> None:
+    timers = TimerQueue("TestTimers")
+    fired = []
+    done = threading.Event()
+    timers.call_later(0.03, lambda: (fired.append("late"), done.set()))
+    cancelled = timers.call_later(0.01, lambda: fired.append("cancelled"))
+    timers.call_later(0.0, lambda: fired.append("early"))
+    cancelled.cancel()
+    try:
+        assert done.wait(2.0)
+    finally:
+        timers.stop()
+    assert fired == ["early", "late"]
+    assert timers.call_later(0.0, lambda: None).cancelled
+
+
+def test_service_retries_failing_device_on_timer(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker(latency_seconds=0.0, failure_rate=1.0)
+    cfg = make_config(breaker_base_seconds=0.02, breaker_jitter=0.0)
+    service = make_service(cfg, locker=locker)
+    try:
+        event = USBEvent(instance_id="USB#BAD", drive_letter="E:", volume_name="BAD", event_type="arrival")
+        service._monitor.emit(event)
+        wait_for(lambda: len(locker.calls) >= 3)
+    finally:
+        service.stop()
+    assert len(locker.calls) >= 3
+    assert service._device_state_store.get("USB#BAD").status == "failed"
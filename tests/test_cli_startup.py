@@ -0,0 +1,44 @@
+"""Import-cost checks for scripted lockport_cli calls."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# Everything `lockport_cli.py status` needs, after parsing its arguments.
+STATUS_IMPORTS = "import lockport_cli; lockport_cli.build_parser(); import lockport.pin_store, lockport.ipc, lockport.election"
+HEAVY_MODULES = ("tkinter", "lockport.device_window", "lockport.usb_monitor", "lockport.resources", "lockport.service", "http.server", "asyncio")
+# Generous next to the ~100 ms measured locally; the eager CLI took well over 200 ms.
+IMPORT_BUDGET_MS = 250
+
+
+def _python(code: str, *flags: str, cwd: Path = REPO_ROOT) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    env.pop("PROGRAMDATA", None)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def test_status_path_skips_gui_and_monitor_modules() -> None:
+    result = _python(f"{STATUS_IMPORTS}; import sys; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    assert result.stdout.strip() == ""
+
+
+def test_status_path_imports_within_budget() -> None:
+    result = _python(STATUS_IMPORTS, "-X", "importtime")
+    # Top-level rows (no indentation) carry the cumulative cost of everything imported.
+    total_us = sum(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2 and not line.split("|")[2].startswith("  ")
+        and line.split("|")[1].strip().isdigit()
+    )
+    assert total_us / 1000 < IMPORT_BUDGET_MS
+
+
+def test_importing_config_creates_no_directories(tmp_path: Path) -> None:
+    _python("import lockport.config", cwd=tmp_path)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,59 @@
+"""Tests for the device window's list model."""
+from __future__ import annotations
+
+from lockport.device_list import DeviceListModel, viewport
+from lockport.device_state import DeviceState
+
+
+def make_states(count: int) -> list[DeviceState]:
+    return [
+        DeviceState(
+            instance_id=f"USB#{index:04d}",
+            drive=f"{chr(ord('D') + index % 20)}:",
+            volume="BACKUP" if index % 10 == 0 else f"STICK{index}",
+            status="unlocked" if index % 3 == 0 else "locked",
+            updated_at=float(index),
+        )
+        for index in range(count)
+    ]
+
+
+def test_filter_sort_and_paging() -> None:
+    model = DeviceListModel()
+    assert model.update(make_states(1000))
+    assert not model.update(make_states(1000))
+    assert len(model) == 1000
+    assert [state.instance_id for state in model.rows(0, 2)] == ["USB#0999", "USB#0998"]
+
+    model.set_filter("backup")
+    assert len(model) == 100
+    model.set_filter("backup", "unlocked")
+    assert {state.status for state in model.rows()} == {"unlocked"}
+    assert len(model) == 34
+
+    model.set_filter("stick12")
+    assert [state.instance_id for state in model.rows()][-1] == "USB#0012"
+
+    model.set_filter("")
+    model.sort_by("Device")
+    assert model.rows(0, 1)[0].instance_id == "USB#0000"
+    model.sort_by("Device")
+    assert model.descending
+    assert model.rows(0, 1)[0].instance_id == "USB#0999"
+    assert model.position("USB#0998") == 1
+
+
+def test_update_reindexes_changed_states() -> None:
+    model = DeviceListModel()
+    states = make_states(5)
+    model.update(states)
+    model.set_filter("renamed")
+    assert len(model) == 0
+    states[2] = DeviceState("USB#0002", "F:", "RENAMED", "locked", 50.0)
+    assert model.update(states)
+    assert [state.instance_id for state in model.rows()] == ["USB#0002"]
+
+
+def test_viewport_clamps_to_last_page() -> None:
+    assert viewport(0.5, 5, 10) == (0, 0.0, 1.0)
+    assert viewport(0.99, 100, 10) == (90, 0.9, 1.0)
@@ -36,3 +36,18 @@ def test_store_persists(tmp_path: Path) -> None:
     states = new_store.list_states()
     assert states and states[0].instance_id == "USB#002"
     assert states[0].status == "unlocked"
+
+
+def test_version_tracks_local_and_external_changes(tmp_path: Path) -> None:
+    writer = build_store(tmp_path)
+    reader = build_store(tmp_path)
+    assert not reader.reload()
+    start = writer.version
+    writer.upsert(instance_id="USB#003", drive="F:", volume=None, status="locked")
+    assert writer.version == start + 1
+    before = reader.version
+    assert reader.reload()
+    assert reader.version == before + 1
+    assert reader.get("USB#003") is not None
+    assert not reader.reload()
+    assert reader.version == before + 1
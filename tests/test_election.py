@@ -0,0 +1,41 @@
+"""Tests for the cross-process ownership lease."""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from lockport.config import LockPortConfig
+from lockport.election import OwnershipLease, read_owner
+
+
+def build_config(tmp_path: Path) -> LockPortConfig:
+    return LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path, election_retry_seconds=0.05)
+
+
+def test_single_owner_and_failover(tmp_path: Path) -> None:
+    cfg = build_config(tmp_path)
+    changes: List[bool] = []
+    first = OwnershipLease(cfg, role="service")
+    second = OwnershipLease(cfg, role="tray", on_change=changes.append)
+    first.start()
+    second.start()
+    try:
+        assert first.is_owner
+        assert not second.is_owner
+        owner = read_owner(cfg)
+        assert owner is not None and owner["role"] == "service" and owner["pid"] == os.getpid()
+
+        first.stop()
+        deadline = time.monotonic() + 2.0
+        while not (second.is_owner and changes) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert second.is_owner
+        assert changes == [True]
+        assert read_owner(cfg)["role"] == "tray"
+    finally:
+        first.stop()
+        second.stop()
+    assert changes == [True, False]
+    assert read_owner(cfg) is None
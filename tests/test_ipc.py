@@ -0,0 +1,121 @@
+"""Tests for the local IPC channel."""
+from __future__ import annotations
+
+import queue
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import pytest
+
+from lockport.config import LockPortConfig
+from lockport.device_state import DeviceStateStore
+from lockport.ipc import IPCServer, ServiceClient, service_address
+from lockport.pin_store import PinValidationError
+
+
+@pytest.fixture()
+def store_and_server(tmp_path: Path):
+    cfg = LockPortConfig(
+        pin_store_path=tmp_path,
+        log_path=tmp_path,
+        device_state_file="devices.json",
+        ipc_pipe_name=f"LockPortTest-{tmp_path.name}",
+    )
+    store = DeviceStateStore(cfg)
+
+    def handler(request: Dict[str, Any]) -> Dict[str, Any]:
+        if request["cmd"] == "list":
+            return {"ok": True, "states": [s.to_dict() for s in store.list_states()]}
+        if request["cmd"] == "unlock":
+            if request.get("pin") != "0000":
+                return {"ok": False, "error": "invalid_pin", "message": "Invalid PIN"}
+            store.upsert(instance_id=request["instance_id"], drive=None, volume=None, status="unlocked")
+            return {"ok": True, "success": True, "message": "Success"}
+        return {"ok": False, "error": "unknown_command"}
+
+    def subscribe(push):
+        return store.subscribe(lambda state: push({"event": "state", "state": state.to_dict()}))
+
+    server = IPCServer(service_address(cfg), handler, subscribe)
+    server.start()
+    yield cfg, store
+    server.stop()
+
+
+def test_client_lists_states(store_and_server) -> None:
+    cfg, store = store_and_server
+    store.upsert(instance_id="USB#1", drive="E:", volume="STICK", status="locked")
+    client = ServiceClient.connect(cfg)
+    assert client is not None
+    try:
+        states = client.list_states()
+    finally:
+        client.close()
+    assert [(s.instance_id, s.status) for s in states] == [("USB#1", "locked")]
+
+
+def test_unlock_maps_pin_errors(store_and_server) -> None:
+    cfg, _ = store_and_server
+    client = ServiceClient.connect(cfg)
+    assert client is not None
+    try:
+        with pytest.raises(PinValidationError):
+            client.unlock("USB#1", "9999")
+        assert client.unlock("USB#1", "0000").success
+    finally:
+        client.close()
+
+
+def test_subscription_receives_snapshot_and_updates(store_and_server) -> None:
+    cfg, store = store_and_server
+    client = ServiceClient.connect(cfg)
+    assert client is not None
+    received: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    unsubscribe = client.subscribe(received.put)
+    try:
+        assert received.get(timeout=5)["event"] == "snapshot"
+        store.upsert(instance_id="USB#2", drive="F:", volume=None, status="locked")
+        update = received.get(timeout=5)
+        assert update["event"] == "state"
+        assert update["state"]["instance_id"] == "USB#2"
+    finally:
+        unsubscribe()
+        client.close()
+
+
+def test_connect_without_service_returns_none(tmp_path: Path) -> None:
+    cfg = LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path, ipc_pipe_name="LockPortMissing")
+    assert ServiceClient.connect(cfg) is None
+
+
+def test_device_state_falls_back_to_the_store_when_the_service_stops_answering(
+    tmp_path: Path, monkeypatch, capsys
+) -> None:
+    import lockport_cli
+
+    cfg = LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path)
+    DeviceStateStore(cfg).upsert(instance_id="USB#1", drive="E:", volume="STICK", status="locked")
+    closed = []
+
+    class ClosingClient:
+        def list_states(self):
+            raise EOFError
+
+        def close(self) -> None:
+            closed.append(True)
+
+    monkeypatch.setattr(ServiceClient, "connect", classmethod(lambda cls, config=None: ClosingClient()))
+    assert lockport_cli.cmd_device_state(None, SimpleNamespace(config=cfg)) == 0
+    assert closed == [True]
+    assert capsys.readouterr().out.startswith("USB#1\tlocked\tdrive=E:")
+
+
+@pytest.mark.parametrize("relock_minutes", ["soon", -5, "nan", [1]])
+def test_service_rejects_bad_relock_minutes(make_service, relock_minutes) -> None:
+    service = make_service()
+    response = service._handle_ipc_request(
+        {"cmd": "unlock", "instance_id": "USB#1", "pin": "0000", "relock_minutes": relock_minutes}
+    )
+    assert response["ok"] is False and response["error"] == "bad_request"
+    assert service.pin_manager.get_status()["failed_attempts"] == 0
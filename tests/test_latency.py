@@ -0,0 +1,57 @@
+"""Tests for the latency histograms."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from lockport.election import OwnershipLease
+from lockport.latency import LatencyHistogram, LatencyStats, RollingHistogram
+from lockport.usb_monitor import USBEvent
+
+
+def test_histogram_percentiles_within_precision() -> None:
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000.0)
+    assert histogram.count == 1000
+    assert abs(histogram.percentile(50) - 500) / 500 < 0.04
+    assert abs(histogram.percentile(99) - 990) / 990 < 0.04
+    assert histogram.summary()["max_ms"] == 1000.0
+
+
+def test_rolling_histogram_expires_old_slices() -> None:
+    rolling = RollingHistogram(60.0, slices=6)
+    rolling.record(0.5, now=0.0)
+    rolling.record(0.1, now=30.0)
+    assert rolling.merged(now=30.0).count == 2
+    assert rolling.merged(now=65.0).count == 1
+
+
+def test_stats_record_event_stages(tmp_path: Path) -> None:
+    stats = LatencyStats(tmp_path / "latency.json", persist_seconds=0)
+    event = USBEvent(instance_id="USB#1", drive_letter="E:", volume_name=None, event_type="arrival")
+    event.created_at = 10.0
+    event.dequeued_at = 10.1
+    event.actioned_at = 12.1
+    event.persisted_at = 12.2
+    stats.record_event(event)
+    data = json.loads((tmp_path / "latency.json").read_text())
+    stages = data["stages"]
+    assert stages["queue_wait"]["count"] == 1
+    assert abs(stages["device_action"]["max_ms"] - 2000) < 1
+    assert abs(stages["end_to_end"]["max_ms"] - 2200) < 1
+
+
+def test_observer_does_not_overwrite_the_owners_stats(make_config, make_service) -> None:
+    cfg = make_config()
+    saved = {"updated_at": 1.0, "window_seconds": 3600, "stages": {"end_to_end": {"count": 3}}}
+    cfg.latency_stats_location.write_text(json.dumps(saved))
+    owner = OwnershipLease(cfg, role="service")
+    owner.start()
+    try:
+        observer = make_service(cfg, role="tray")
+        assert not observer.is_owner
+        observer.stop()
+        assert json.loads(cfg.latency_stats_location.read_text()) == saved
+    finally:
+        owner.stop()
@@ -0,0 +1,91 @@
+"""Tests for the queue-backed logging pipeline."""
+from __future__ import annotations
+
+import logging
+import queue
+from pathlib import Path
+
+from lockport.audit import audit, query_audit
+from lockport.config import LockPortConfig
+from lockport.logging_setup import (
+    BoundedQueueHandler,
+    RateLimitFilter,
+    configure_logging,
+    flush_logging,
+    shutdown_logging,
+)
+
+
+def test_bounded_handler_drops_and_reports_overflow() -> None:
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue)
+    logger = logging.getLogger("lockport.tests.overflow")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for index in range(5):
+            logger.warning("record %s", index)
+        assert handler.dropped == 3
+        assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+        logger.warning("after")
+        messages = [log_queue.get_nowait().getMessage() for _ in range(2)]
+        assert messages == ["Log queue overflowed; dropped 3 records", "after"]
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_records_reach_file_after_flush(tmp_path: Path) -> None:
+    shutdown_logging()
+    try:
+        logger = configure_logging(config=LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path))
+        logger.info("queued hello")
+        assert flush_logging()
+        assert "queued hello" in (tmp_path / "lockport.log").read_text()
+    finally:
+        shutdown_logging()
+
+
+def test_rate_limit_suppresses_and_summarises() -> None:
+    now = [0.0]
+    limiter = RateLimitFilter(rate_per_second=1.0, burst=2, clock=lambda: now[0])
+
+    def record(level: int = logging.INFO, msg: str = "Device %s already processing") -> logging.LogRecord:
+        return logging.LogRecord("lockport.service", level, __file__, 0, msg, ("USB#1",), None)
+
+    assert [limiter.filter(record()) for _ in range(5)] == [True, True, False, False, False]
+    assert limiter.filter(record(msg="Other %s"))
+    assert limiter.filter(record(level=logging.ERROR))
+    now[0] = 1.0
+    passed = record()
+    assert limiter.filter(passed)
+    assert passed.getMessage() == "Device USB#1 already processing (suppressed 3 similar messages)"
+    assert not limiter.filter(record())
+    assert limiter.drain_suppressed() == [("lockport.service", logging.INFO, "Device %s already processing", 1)]
+    assert limiter.drain_suppressed() == []
+
+
+def test_config_with_new_paths_moves_the_writers(tmp_path: Path) -> None:
+    shutdown_logging()
+    first, second = tmp_path / "first", tmp_path / "second"
+    try:
+        configure_logging(config=LockPortConfig(pin_store_path=first, log_path=first))
+        logger = configure_logging(config=LockPortConfig(pin_store_path=second, log_path=second))
+        logger.info("after the move")
+        assert flush_logging()
+        assert "after the move" in (second / "lockport.log").read_text()
+        assert "after the move" not in (first / "lockport.log").read_text()
+    finally:
+        shutdown_logging()
+
+
+def test_audit_records_are_readable_without_an_explicit_flush(tmp_path: Path, wait_for) -> None:
+    shutdown_logging()
+    cfg = LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path)
+    try:
+        configure_logging(config=cfg)
+        for index in range(20):
+            audit("usb_event", instance_id=f"USB#{index}")
+        assert wait_for(lambda: len(list(query_audit(cfg.audit_location))) == 20)
+        assert wait_for(lambda: list(cfg.audit_location.glob("audit-*.idx.json")))
+    finally:
+        shutdown_logging()
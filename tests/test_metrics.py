@@ -0,0 +1,60 @@
+"""Tests for the metrics registry and endpoint."""
+from __future__ import annotations
+
+import threading
+import urllib.request
+
+from lockport.metrics import MetricsRegistry, MetricsServer
+
+
+def test_counter_sums_thread_cells() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter")
+
+    def bump() -> None:
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.samples() == [((), 4000.0)]
+
+
+def test_counter_folds_cells_of_finished_threads() -> None:
+    counter = MetricsRegistry().counter("test_total", "Test counter")
+    for _ in range(50):
+        thread = threading.Thread(target=counter.inc)
+        thread.start()
+        thread.join()
+    assert len(counter._children[()]._cells) <= 1
+    assert counter.samples() == [((), 50.0)]
+    assert counter._children[()]._cells == []
+
+
+def test_render_labels_and_gauge_callback() -> None:
+    registry = MetricsRegistry()
+    actions = registry.counter("actions_total", "Actions", ("backend", "outcome"))
+    actions.labels("pnputil", "failure").inc(2)
+    depth = registry.gauge("depth", "Queue depth")
+    depth.set_function(lambda: 3)
+    text = registry.render()
+    assert '# TYPE actions_total counter' in text
+    assert 'actions_total{backend="pnputil",outcome="failure"} 2' in text
+    assert "depth 3" in text
+
+
+def test_metrics_server_serves_text_exposition() -> None:
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served").inc()
+    server = MetricsServer(port=0, registry=registry)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.stop()
+    assert "served_total 1" in body
@@ -0,0 +1,119 @@
+"""Tests for the shared PIN prompt host, driven by a fake Tk root."""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+import pytest
+
+from lockport import pin_prompt
+from lockport.pin_prompt import PinPrompt, PinPromptResult, PromptHost
+
+
+class FakeRoot:
+    """Runs after() callbacks in order on whichever thread calls mainloop()."""
+
+    def __init__(self) -> None:
+        self._calls: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self.withdrawn = False
+
+    def withdraw(self) -> None:
+        self.withdrawn = True
+
+    def after(self, _ms: int, callback: Callable[[], None]) -> None:
+        self._calls.put(callback)
+
+    def mainloop(self) -> None:
+        while (callback := self._calls.get()) is not None:
+            callback()
+
+    def quit(self) -> None:
+        self._calls.put(None)
+
+    def destroy(self) -> None:
+        pass
+
+
+class FakeDialog:
+    def __init__(self, master: FakeRoot) -> None:
+        self.master = master
+        self.destroyed = False
+
+    def destroy(self) -> None:
+        self.destroyed = True
+
+
+@pytest.fixture
+def fake_tk(monkeypatch):
+    monkeypatch.setattr(pin_prompt, "Tk", FakeRoot)
+    monkeypatch.setattr(pin_prompt, "Toplevel", FakeDialog)
+
+
+def test_host_runs_queued_calls_in_order_on_one_thread(fake_tk, wait_for) -> None:
+    host = PromptHost(name="TestPromptHost")
+    host.warm_up()
+    seen: List[tuple[int, str, Any]] = []
+    try:
+        for index in range(3):
+            host.call(lambda root, index=index: seen.append((index, threading.current_thread().name, root)))
+        assert wait_for(lambda: len(seen) == 3)
+    finally:
+        host.stop()
+    assert [index for index, _, _ in seen] == [0, 1, 2]
+    assert {name for _, name, _ in seen} == {"TestPromptHost"}
+    roots = {id(root) for _, _, root in seen}
+    assert len(roots) == 1 and seen[0][2].withdrawn
+    assert host._root is None
+
+
+def test_standalone_prompts_hand_results_back_through_the_host(fake_tk, monkeypatch) -> None:
+    shown: List[tuple[str, tuple[str, ...]]] = []
+    dialogs: List[FakeDialog] = []
+
+    def build_dialog(self, window, *, finish, devices=(), **_kwargs) -> None:
+        shown.append((threading.current_thread().name, tuple(devices)))
+        dialogs.append(window)
+        finish(PinPromptResult(pin=f"{len(shown)}234", cancelled=False))
+
+    monkeypatch.setattr(PinPrompt, "_build_dialog", build_dialog)
+    host = PromptHost(name="TestPromptHost")
+    prompt = PinPrompt(5, host=host)
+    try:
+        single = prompt.request_pin(drive_label="E:", attempts_remaining=3)
+        batch = prompt.request_batch_pin(devices=["STICK (E:)", "DISK (F:)"], attempts_remaining=3)
+    finally:
+        host.stop()
+    assert single == PinPromptResult(pin="1234", cancelled=False)
+    assert batch == PinPromptResult(pin="2234", cancelled=False)
+    assert shown == [("TestPromptHost", ()), ("TestPromptHost", ("STICK (E:)", "DISK (F:)"))]
+    assert all(dialog.destroyed for dialog in dialogs)
+
+
+def test_prompt_is_cancelled_when_the_host_cannot_start(monkeypatch) -> None:
+    def no_display() -> FakeRoot:
+        raise pin_prompt.TclError("no display name")
+
+    monkeypatch.setattr(pin_prompt, "Tk", no_display)
+    result = PinPrompt(5, host=PromptHost()).request_pin(drive_label="E:", attempts_remaining=3)
+    assert result == PinPromptResult(pin=None, cancelled=True)
+
+
+def test_timed_out_prompt_is_cancelled_when_the_host_is_gone(fake_tk, monkeypatch) -> None:
+    calls: List[Callable[[Any], None]] = []
+
+    def call(callback: Callable[[Any], None]) -> None:
+        # The dialog opens, then the host dies before the timeout cleanup.
+        calls.append(callback)
+        if len(calls) > 1:
+            raise RuntimeError("PIN prompt host is not running")
+        callback(FakeRoot())
+
+    host = PromptHost()
+    monkeypatch.setattr(host, "call", call)
+    monkeypatch.setattr(PinPrompt, "_build_dialog", lambda self, window, **_kwargs: None)
+    prompt = PinPrompt(5, host=host)
+    prompt.timeout_seconds = -5  # the result wait (timeout + 5s) expires at once
+    result = prompt.request_pin(drive_label="E:", attempts_remaining=3)
+    assert result == PinPromptResult(pin=None, cancelled=True)
+    assert len(calls) == 2
@@ -0,0 +1,46 @@
+"""Tests for presence-aware action planning."""
+from __future__ import annotations
+
+from lockport.device_locker import DeviceActionResult
+from lockport.planner import ActionPlanner
+from lockport.simulation import SimulatedLocker
+from lockport.usb_monitor import USBEvent
+
+
+def usb_event(event_type: str, instance_id: str = "USB#1") -> USBEvent:
+    return USBEvent(instance_id=instance_id, drive_letter="E:", volume_name="STICK", event_type=event_type)
+
+
+def test_planner_tracks_presence_and_intents() -> None:
+    planner = ActionPlanner()
+    assert not planner.is_absent("USB#1")
+    planner.observe(usb_event("removal"))
+    assert planner.is_absent("USB#1")
+    assert planner.pending_intents() == ["USB#1"]
+    planner.observe(usb_event("arrival"))
+    assert not planner.is_absent("USB#1")
+    assert planner.take_lock_intent("USB#1")
+    assert not planner.take_lock_intent("USB#1")
+    planner.note_result(DeviceActionResult("USB#2", False, "DeviceNotFound"))
+    assert planner.is_absent("USB#2")
+    assert planner.defer_lock("USB#3").is_device_missing()
+
+
+def test_removal_spawns_no_action_and_next_arrival_locks(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker(latency_seconds=0.0)
+    service = make_service(make_config(worker_count=1), locker=locker, start=False)
+    store = service._device_state_store
+    store.upsert(instance_id="USB#1", drive="E:", volume="STICK", status="unlocked")
+    service.start()
+    try:
+        service._monitor.emit(usb_event("removal"))
+        assert wait_for(lambda: store.get("USB#1").status == "removed")
+        assert locker.calls == []
+        assert service.lock_device("USB#1").is_device_missing()
+        assert locker.calls == []
+        service._monitor.emit(usb_event("arrival"))
+        assert wait_for(lambda: store.get("USB#1").status == "locked")
+    finally:
+        service.stop()
+    assert locker.calls == [("disable", "USB#1")]
+    assert service.status()["lock_on_arrival"] == 0
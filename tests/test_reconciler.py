@@ -0,0 +1,85 @@
+"""Tests for the batched PnP reconciliation sweep."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from lockport.config import LockPortConfig
+from lockport.device_locker import DEVICE_ABSENT, DEVICE_DISABLED, DEVICE_ENABLED, _parse_status
+from lockport.device_state import DeviceState, DeviceStateStore
+from lockport.reconciler import Reconciler, plan_corrections
+from lockport.simulation import SimulatedLocker
+
+
+def state(instance_id: str, status: str) -> DeviceState:
+    return DeviceState(instance_id=instance_id, drive="E:", volume="V", status=status, updated_at=0.0)
+
+
+def test_plan_corrections_only_touches_drift() -> None:
+    states = [
+        state("A", "locked"),
+        state("B", "locked"),
+        state("C", "unlocked"),
+        state("D", "removed"),
+        state("E", "unlocked"),
+        state("F", "failed"),
+        state("G", "failed"),
+        state("H", "failed"),
+    ]
+    actual = {
+        "A": DEVICE_DISABLED,
+        "B": DEVICE_ENABLED,
+        "C": DEVICE_DISABLED,
+        "D": DEVICE_ENABLED,
+        "E": DEVICE_ABSENT,
+        "F": DEVICE_ENABLED,
+        "G": DEVICE_DISABLED,
+        "H": DEVICE_ABSENT,
+    }
+    plan = {c.state.instance_id: (c.action, c.status) for c in plan_corrections(states, actual)}
+    assert plan == {
+        "B": ("lock", "locked"),
+        "C": ("record", "locked"),
+        "D": ("lock", "locked"),
+        "E": ("record", "removed"),
+        # A failed lock that took effect after all, and one whose device left.
+        "G": ("record", "locked"),
+        "H": ("record", "removed"),
+    }
+
+
+def test_parse_status_handles_single_object_and_missing_ids() -> None:
+    output = '{"InstanceId":"usb\\\\a","Present":true,"ConfigManagerErrorCode":22}'
+    assert _parse_status(output, ["USB\\A", "USB\\B"]) == {"USB\\A": DEVICE_DISABLED, "USB\\B": DEVICE_ABSENT}
+    assert _parse_status("", ["USB\\A"]) == {"USB\\A": DEVICE_ABSENT}
+
+
+def test_sweep_batches_queries(tmp_path: Path) -> None:
+    cfg = LockPortConfig(pin_store_path=tmp_path, log_path=tmp_path)
+    store = DeviceStateStore(cfg)
+    for name in ("A", "B", "C"):
+        store.upsert(instance_id=name, drive=None, volume=None, status="locked")
+    locker = SimulatedLocker(latency_seconds=0.0)
+    locker.enabled.update({"A": False, "B": False})
+    applied = []
+    reconciler = Reconciler(store, locker, applied.append, interval_seconds=0, batch_size=2)
+    reconciler.sweep()
+    assert [len(batch) for batch in locker.queries] == [2, 1]
+    assert [(c.state.instance_id, c.action) for c in applied] == [("C", "lock")]
+
+
+def test_service_relocks_device_enabled_behind_its_back(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker(latency_seconds=0.0)
+    service = make_service(make_config(reconcile_interval_seconds=0), locker=locker, start=False)
+    store = service._device_state_store
+    store.upsert(instance_id="USB#1", drive="E:", volume="A", status="locked")
+    store.upsert(instance_id="USB#2", drive="F:", volume="B", status="unlocked")
+    locker.present["USB#2"] = False
+    service.start()
+    try:
+        service._reconciler.sweep()
+        wait_for(lambda: locker.calls)
+    finally:
+        service.stop()
+    assert locker.calls == [("disable", "USB#1")]
+    assert locker.enabled["USB#1"] is False
+    assert store.get("USB#2").status == "removed"
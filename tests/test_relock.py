@@ -0,0 +1,99 @@
+"""Tests for persisted auto-relock deadlines."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from lockport.async_service import AsyncLockPortService
+from lockport.relock import RelockScheduler
+from lockport.service import LockPortService
+from lockport.simulation import SimulatedLocker
+from lockport.timers import TimerQueue
+
+
+def test_deadlines_persist_reschedule_and_fire(tmp_path: Path) -> None:
+    path = tmp_path / "relock.json"
+    timers = TimerQueue()
+    fired: List[str] = []
+    done = threading.Event()
+
+    def fire(instance_id: str) -> None:
+        fired.append(instance_id)
+        done.set()
+
+    scheduler = RelockScheduler(path, timers, fire)
+    try:
+        scheduler.schedule("USB#1", 60.0)
+        scheduler.schedule("USB#2", 60.0)
+        assert set(json.loads(path.read_text())) == {"USB#1", "USB#2"}
+        assert scheduler.cancel("USB#2")
+        scheduler.schedule("USB#1", 0.05)  # replaces the 60 s deadline
+        assert done.wait(2.0)
+        assert fired == ["USB#1"]
+        assert scheduler.deadlines() == {}
+        assert json.loads(path.read_text()) == {}
+    finally:
+        timers.stop()
+
+
+def test_overdue_deadline_fires_after_restart(tmp_path: Path, wait_for) -> None:
+    path = tmp_path / "relock.json"
+    path.write_text(json.dumps({"USB#9": time.time() - 5, "USB#10": time.time() + 3600}))
+    timers = TimerQueue()
+    fired: List[str] = []
+    scheduler = RelockScheduler(path, timers, fired.append)
+    try:
+        assert scheduler.load() == 2
+        assert wait_for(lambda: fired == ["USB#9"])
+        assert list(scheduler.deadlines()) == ["USB#10"]
+    finally:
+        timers.stop()
+
+
+def test_service_relocks_through_the_worker_path(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker()
+    service = make_service(make_config(reconcile_interval_seconds=0), locker=locker)
+    try:
+        service._device_state_store.upsert(instance_id="USB#1", drive="E:", volume="STICK", status="locked")
+        assert service.unlock_device("USB#1", "0000", relock_minutes=0.001).success
+        assert service.status()["relocks_pending"] == 1
+        assert wait_for(lambda: service._device_state_store.get("USB#1").status == "locked")
+        assert locker.calls == [("enable", "USB#1"), ("disable", "USB#1")]
+        assert service.status()["relocks_pending"] == 0
+    finally:
+        service.stop()
+
+
+def test_observer_neither_fires_nor_rewrites_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "relock.json"
+    saved = {"USB#OLD": time.time() - 5, "USB#NEW": time.time() + 3600}
+    path.write_text(json.dumps(saved))
+    timers = TimerQueue()
+    fired: List[str] = []
+    scheduler = RelockScheduler(path, timers, fired.append, should_run=lambda: False)
+    try:
+        scheduler.load()
+        scheduler.schedule("USB#MINE", 60.0)
+        time.sleep(0.1)
+        assert fired == []
+        assert json.loads(path.read_text()) == saved
+    finally:
+        timers.stop()
+
+
+@pytest.mark.parametrize("core", [LockPortService, AsyncLockPortService])
+def test_owner_restores_overdue_deadlines_on_start(make_config, make_service, wait_for, core) -> None:
+    cfg = make_config(reconcile_interval_seconds=0)
+    cfg.relock_state_location.write_text(json.dumps({"USB#9": time.time() - 5}))
+    locker = SimulatedLocker()
+    service = make_service(cfg, core=core, locker=locker)
+    try:
+        assert wait_for(lambda: locker.calls == [("disable", "USB#9")])
+        assert json.loads(cfg.relock_state_location.read_text()) == {}
+    finally:
+        service.stop()
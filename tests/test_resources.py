@@ -0,0 +1,45 @@
+"""Tests for the on-disk asset cache."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+from lockport.resources import AssetCache, asset_digest, load_asset_bytes
+
+
+def test_variants_are_rendered_once_and_reused_from_disk(tmp_path: Path) -> None:
+    renders: List[int] = []
+
+    def render(source: bytes) -> bytes:
+        renders.append(len(source))
+        return b"derived:" + source[:8]
+
+    first = AssetCache(tmp_path)
+    data = first.variant("app-logo-256.png", "test", render)
+    assert data == b"derived:" + load_asset_bytes("app-logo-256.png")[:8]
+    assert first.variant("app-logo-256.png", "test", render) == data
+    assert len(renders) == 1
+
+    # A new process (fresh cache object) reads the stored file instead of rendering.
+    second = AssetCache(tmp_path)
+    assert second.variant("app-logo-256.png", "test", render) == data
+    assert len(renders) == 1
+    (stored,) = tmp_path.glob("app-logo-256-test-*.png")
+    assert asset_digest("app-logo-256.png")[:16] in stored.name
+
+
+def test_stale_hash_files_are_pruned_and_tk_data_is_encoded(tmp_path: Path) -> None:
+    stale = tmp_path / "app-logo-256-test-v1-0000000000000000.png"
+    stale.write_bytes(b"old")
+    cache = AssetCache(tmp_path)
+    cache.variant("app-logo-256.png", "test", lambda source: b"new")
+    assert not stale.exists()
+    assert cache.tk_photo_data("app-logo-256.png") == cache.tk_photo_data("app-logo-256.png")
+    assert cache.file("app-icon.ico").read_bytes() == load_asset_bytes("app-icon.ico")
+
+
+def test_unwritable_directory_falls_back_to_memory(tmp_path: Path) -> None:
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = AssetCache(blocker / "cache")
+    assert cache.variant("app-logo-256.png", "test", lambda source: b"x") == b"x"
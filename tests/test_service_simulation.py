@@ -0,0 +1,100 @@
+"""LockPortService tests driven by the simulation fakes."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from lockport.async_service import AsyncLockPortService
+from lockport.pin_store import PinValidationError
+from lockport.service import LockPortService
+from lockport.simulation import SimulatedLocker, Workload, run_workload
+from lockport.usb_monitor import USBEvent
+
+
+@pytest.mark.parametrize("service_cls", [LockPortService, AsyncLockPortService])
+def test_workload_locks_and_records_every_event(make_config, make_service, service_cls) -> None:
+    locker = SimulatedLocker(latency_seconds=0.001, seed=7)
+    # One worker keeps arrival/removal pairs in order so final states are exact.
+    service = make_service(make_config(worker_count=1), core=service_cls, locker=locker)
+    workload = Workload.generate(devices=40, removal_ratio=0.25, seed=7)
+    try:
+        result = run_workload(service, service._monitor, workload, timeout_seconds=10)
+    finally:
+        service.stop()
+    assert result["completed"] == 1.0
+    statuses = {s.instance_id: s.status for s in service._device_state_store.list_states()}
+    removed = {e.instance_id for e in workload.events if e.event_type == "removal"}
+    assert len(statuses) == 40
+    assert all(statuses[i] == "removed" for i in removed)
+    assert all(status == "locked" for i, status in statuses.items() if i not in removed)
+    # Removals never spawn an action; arrivals already known to be gone are skipped.
+    assert {action for action, _ in locker.calls} <= {"disable"}
+    assert 40 - len(removed) <= len(locker.calls) <= 40
+    assert service.latency.snapshot()["stages"]["end_to_end"]["count"] == len(locker.calls)
+
+
+def test_simulated_failures_are_deterministic() -> None:
+    outcomes = []
+    for _ in range(2):
+        locker = SimulatedLocker(latency_seconds=0.0, failure_rate=0.5, seed=3)
+        outcomes.append([locker.disable(f"USB#{i}").success for i in range(20)])
+    assert outcomes[0] == outcomes[1]
+    assert 0 < sum(outcomes[0]) < 20
+
+
+def test_batch_unlock_verifies_the_pin_once(make_service) -> None:
+    locker = SimulatedLocker(latency_seconds=0.001, seed=3)
+    service = make_service(locker=locker)
+    ids = [f"USB#{index}" for index in range(3)]
+    try:
+        for instance_id in ids:
+            service._device_state_store.upsert(instance_id=instance_id, drive="E:", volume="STICK", status="locked")
+        with pytest.raises(PinValidationError):
+            service.unlock_devices(ids, "9999")
+        assert service.pin_manager.get_status()["failed_attempts"] == 1
+        results = service.unlock_devices(ids, "0000")
+    finally:
+        service.stop()
+    assert [result.instance_id for result in results] == ids
+    assert all(result.success for result in results)
+    assert sorted(locker.calls) == sorted(("enable", instance_id) for instance_id in ids)
+    assert {service._device_state_store.get(i).status for i in ids} == {"unlocked"}
+
+
+@pytest.mark.parametrize("service_cls", [LockPortService, AsyncLockPortService])
+def test_timed_run_releases_everything(make_config, make_service, service_cls) -> None:
+    cfg = make_config(ipc_enabled=True, ipc_socket_file="t.sock", metrics_port=0)
+    service = make_service(cfg, core=service_cls, start=False)
+    service.run(duration_seconds=0.2)
+    assert not service.is_owner
+    assert service._metrics_server is None and service._ipc_server is None
+    lingering = {"LockPortIPC", "LockPortMetrics", "LockPortReconciler"}
+    assert not [t.name for t in threading.enumerate() if t.name in lingering]
+
+
+def test_stop_on_the_loop_thread_releases_after_in_flight_locks(make_config, make_service, wait_for) -> None:
+    locker = SimulatedLocker(latency_seconds=0.3)
+    service = make_service(
+        make_config(reconcile_interval_seconds=0), core=AsyncLockPortService, locker=locker, start=False
+    )
+    owner_when_locked = []
+    finish_lock = service._finish_lock
+
+    def record_owner(event, result) -> None:
+        owner_when_locked.append(service.is_owner)
+        finish_lock(event, result)
+
+    service._finish_lock = record_owner
+    runner = threading.Thread(target=service.run)
+    runner.start()
+    assert wait_for(lambda: service._loop is not None and service.is_owner)
+    service._monitor.emit(USBEvent("USB#1", "E:", "STICK", "arrival"))
+    assert wait_for(lambda: locker.calls)
+    # As lockport_service's signal handler does: stop() on the loop thread mid-lock.
+    service._loop.call_soon_threadsafe(service.stop)
+    runner.join(timeout=5.0)
+    assert not runner.is_alive()
+    assert owner_when_locked == [True]
+    assert not service.is_owner
+    service.stop()  # main()'s finally: already stopped, nothing left to do
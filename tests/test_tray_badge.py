@@ -0,0 +1,118 @@
+"""Tests for the tray badge counts and update coalescing."""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+from lockport.timers import TimerHandle
+from lockport.tray_badge import BadgeCounts, BadgeUpdater, ObserverFeed, all_variants
+
+
+class ManualTimers:
+    """Collects call_later requests so a test decides when they fire."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[float, TimerHandle]] = []
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        handle = TimerHandle(delay, callback)
+        self.calls.append((delay, handle))
+        return handle
+
+    def fire(self) -> None:
+        calls, self.calls = self.calls, []
+        for _, handle in calls:
+            if not handle.cancelled:
+                handle.callback()
+
+    def stop(self) -> None:
+        self.calls.clear()
+
+
+def test_variants_cover_every_badge_state() -> None:
+    assert BadgeCounts(unlocked=3).variant() == ("clear", "")
+    assert BadgeCounts(locked=2, unlocked=1).variant() == ("locked", "2")
+    assert BadgeCounts(locked=8, failed=4).variant() == ("failed", "9+")
+    variants = set(all_variants())
+    for locked in range(12):
+        for failed in range(3):
+            assert BadgeCounts(locked=locked, failed=failed).variant() in variants
+
+
+def test_bursts_are_coalesced_and_unchanged_counts_skipped() -> None:
+    now = [0.0]
+    counts = {"locked": 1}
+    applied: List[BadgeCounts] = []
+    timers = ManualTimers()
+    updater = BadgeUpdater(
+        lambda: counts, applied.append, min_interval=0.5, timers=timers, clock=lambda: now[0]
+    )
+    for _ in range(50):
+        updater.notify()
+    assert [delay for delay, _ in timers.calls] == [0.0]
+    timers.fire()
+    assert applied == [BadgeCounts(locked=1)]
+
+    now[0] = 0.2
+    updater.notify()
+    assert timers.calls[0][0] == pytest.approx(0.3)
+    timers.fire()
+    assert len(applied) == 1  # counts did not change, so the icon is left alone
+
+    counts["failed"] = 1
+    now[0] = 1.0
+    updater.notify()
+    timers.fire()
+    assert applied[-1] == BadgeCounts(locked=1, failed=1)
+    assert "1 failed" in applied[-1].tooltip()
+
+
+class FakeService:
+    def __init__(self) -> None:
+        self.is_owner = False
+        self.local: Dict[str, int] = {"locked": 7}
+
+    def device_counts(self) -> Dict[str, int]:
+        return dict(self.local)
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.on_close: Optional[Callable[[], None]] = None
+        self.closed = False
+
+    def subscribe(self, callback, *, on_close=None):
+        self.callback, self.on_close = callback, on_close
+        return lambda: None
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_observer_feed_mirrors_the_owner_and_falls_back_to_polling() -> None:
+    service, timers, changes = FakeService(), ManualTimers(), []
+    clients: List[Optional[FakeClient]] = [None, FakeClient()]
+    feed = ObserverFeed(
+        service, lambda: changes.append(1), timers, poll_seconds=5.0, connect=lambda: clients.pop(0)
+    )
+    feed.start()
+    timers.fire()  # no service answers yet: poll the shared store
+    assert feed.counts() == {"locked": 7}
+    assert [delay for delay, _ in timers.calls] == [5.0]
+
+    timers.fire()  # the service is up: subscribe instead of polling
+    client = feed._client
+    assert isinstance(client, FakeClient) and timers.calls == []
+    client.callback({"event": "snapshot", "states": [{"instance_id": "A", "status": "locked"}]})
+    client.callback({"event": "state", "state": {"instance_id": "B", "status": "failed"}})
+    assert feed.counts() == {"locked": 1, "failed": 1}
+
+    client.on_close()  # service stopped and this tray took over
+    assert client.closed and [delay for delay, _ in timers.calls] == [5.0]
+    service.is_owner = True
+    timers.fire()
+    assert feed.counts() == {"locked": 7} and timers.calls == []
+    assert len(changes) == 5
+    feed.stop()
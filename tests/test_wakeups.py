@@ -0,0 +1,32 @@
+"""Tests for idle-mode wakeup accounting."""
+from __future__ import annotations
+
+import time
+
+from lockport.metrics import WAKEUPS_TOTAL
+from lockport.wakeups import WakeupMeter
+
+
+def test_meter_reports_a_sliding_per_minute_rate() -> None:
+    now = [0.0]
+    meter = WakeupMeter(window_seconds=30.0, clock=lambda: now[0])
+    for _ in range(3):
+        meter.record("test-source")
+    now[0] = 10.0
+    meter.record("test-source")
+    assert meter.per_minute() == {"test-source": 8.0}
+    now[0] = 35.0
+    assert meter.per_minute() == {"test-source": 2.0}
+    now[0] = 100.0
+    assert meter.per_minute() == {}
+
+
+def test_idle_service_workers_do_not_wake(make_config, make_service) -> None:
+    service = make_service(make_config(reconcile_interval_seconds=0))
+    try:
+        before = WAKEUPS_TOTAL.labels("worker").value()
+        time.sleep(1.2)
+        assert WAKEUPS_TOTAL.labels("worker").value() == before
+        assert "wakeups_per_minute" in service.status()
+    finally:
+        service.stop()